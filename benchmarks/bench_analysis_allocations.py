@@ -0,0 +1,78 @@
+# bench_analysis_allocations.py
+# Memory cost of move classification on middlegame positions of synthetic games
+# (random play hangs pieces all the time, so the sacrifice checks, danger levels
+# and trapped-piece searches run on most moves). Every move is classified as the
+# engine's top move, like bench_analysis_context.
+#
+# Counts the chess.Board objects created and, with tracemalloc, the peak memory
+# of each classification.
+#
+#   python -m benchmarks.bench_analysis_allocations [games] [safety mode]
+
+import contextlib
+import io
+import sys
+import tracemalloc
+
+import chess
+from benchmarks.common import synthetic_game, time_call, report
+from src.analysis import analysis_config
+from src.analysis.analysis_context import AnalysisContext
+from src.analysis.move_classifier import AdvancedMoveClassifier
+
+GAMES = 4
+PLIES = 60
+MIDDLEGAME = 20 # First ply classified
+
+class CountingBoard(chess.Board):
+    """chess.Board counting every instance, copies included (Board.copy goes through __init__)."""
+    created = 0
+
+    def __init__(self, *args, **kwargs):
+        CountingBoard.created += 1
+        super().__init__(*args, **kwargs)
+
+def game_moves(games):
+    """(board before, move) for the middlegame moves of the games, boards with their move stack."""
+    items = []
+    for seed in range(games):
+        board = CountingBoard()
+        for ply, move in enumerate(synthetic_game(PLIES, seed)):
+            if ply >= MIDDLEGAME:
+                items.append((board.copy(), move))
+            board.push(move)
+    return items
+
+def classify(classifier, board, move):
+    top_moves = {1: {'pv_move': move.uci(), 'cp': 30}, 2: {'cp': -200}}
+    return classifier.classify_move(board, move, top_moves, is_book=False, context=AnalysisContext())
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    if len(sys.argv) > 2:
+        analysis_config.PIECE_SAFETY_MODE = sys.argv[2]
+    items = game_moves(games)
+    classifier = AdvancedMoveClassifier()
+
+    boards, peaks = [], []
+    with contextlib.redirect_stdout(io.StringIO()): # Classifier debug traces
+        tracemalloc.start()
+        for board, move in items:
+            CountingBoard.created = 0
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            classify(classifier, board, move)
+            peaks.append(tracemalloc.get_traced_memory()[1] - start)
+            boards.append(CountingBoard.created)
+        tracemalloc.stop()
+        seconds = time_call(lambda: [classify(classifier, b, m) for b, m in items], repeat=3)
+
+    print(f"{len(items)} middlegame moves ({PLIES}-ply games from ply {MIDDLEGAME}), "
+          f"piece safety mode '{analysis_config.PIECE_SAFETY_MODE}'")
+    print(f"boards created per classification: mean {sum(boards) / len(boards):.1f}, max {max(boards)}")
+    print(f"peak memory per classification:    mean {sum(peaks) / len(peaks) / 1024:.1f} KiB, "
+          f"max {max(peaks) / 1024:.1f} KiB")
+    report("classify_move", seconds, len(items), "move")
+
+if __name__ == "__main__":
+    main()
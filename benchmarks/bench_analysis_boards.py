@@ -0,0 +1,40 @@
+# bench_analysis_boards.py
+# Board reconstruction cost of the post-game analysis loop on a 300-ply game:
+# replaying from move 0 three times per ply (old) vs one cursor board (GameController now).
+
+import chess
+from benchmarks.common import synthetic_game, time_call, report
+
+def replay(moves, count):
+    board = chess.Board()
+    for i in range(count):
+        board.push(moves[i])
+    return board
+
+def rebuild_per_ply(moves):
+    for index in range(len(moves) + 1):
+        board = replay(moves, index)            # analyze_next_step
+        board.is_game_over()
+        check_board = replay(moves, index)      # handle_analysis_complete sync check
+        if index > 0:
+            prev_board = replay(moves, index - 1) # classification
+
+def cursor(moves):
+    board = chess.Board()
+    prev_board = None
+    for index in range(len(moves) + 1):
+        while len(board.move_stack) < index:
+            prev_board = board.copy(stack=False)
+            board.push(moves[len(board.move_stack)])
+        board.is_game_over()
+
+def main():
+    moves = synthetic_game(300)
+    before = time_call(lambda: rebuild_per_ply(moves), repeat=3)
+    after = time_call(lambda: cursor(moves), repeat=3)
+    print(f"{len(moves)}-ply game")
+    report("replay from move 0 (before)", before, len(moves), "ply")
+    report("cursor board (after)", after, len(moves), "ply")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# bench_analysis_context.py
+# Move classification with the board-query memo (AnalysisContext): none, one
+# per classify_move call (the default, and what the review drivers do), and one
+# kept for the whole game. Every move is classified as the engine's top
+# move, so the critical and brilliant checks (piece safety, danger levels,
+# trapped pieces) run on all of them. Checks the classifications are identical.
+#
+#   python -m benchmarks.bench_analysis_context [games] [safety mode]
+
+import contextlib
+import io
+import sys
+
+import chess
+from benchmarks.common import synthetic_game, time_call, report
+from src.analysis import analysis_config
+from src.analysis.analysis_context import AnalysisContext
+from src.analysis.move_classifier import AdvancedMoveClassifier
+
+GAMES = 4
+PLIES = 60
+
+class NoMemo(AnalysisContext):
+    """Answers nothing from memory: the classifier before the memo."""
+    def get(self, table, key):
+        return None
+
+    def put(self, table, key, value):
+        pass
+
+def game_moves(games):
+    """(board before, move) for every move of the games."""
+    items = []
+    for seed in range(games):
+        board = chess.Board()
+        for move in synthetic_game(PLIES, seed):
+            items.append((board.copy(stack=False), move))
+            board.push(move)
+    return items
+
+def classify_all(classifier, items, make_context, per_game):
+    context = make_context() if per_game else None
+    results = []
+    with contextlib.redirect_stdout(io.StringIO()): # Classifier debug traces
+        for board, move in items:
+            top_moves = {1: {'pv_move': move.uci(), 'cp': 30}, 2: {'cp': -200}}
+            results.append(classifier.classify_move(board, move, top_moves, is_book=False,
+                                                    context=context or make_context()))
+    return results, context
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    if len(sys.argv) > 2:
+        analysis_config.PIECE_SAFETY_MODE = sys.argv[2]
+    items = game_moves(games)
+    classifier = AdvancedMoveClassifier()
+    print(f"{len(items)} moves, piece safety mode '{analysis_config.PIECE_SAFETY_MODE}'")
+
+    baseline, _ = classify_all(classifier, items, NoMemo, per_game=False)
+    per_move, _ = classify_all(classifier, items, AnalysisContext, per_game=False)
+    per_game, context = classify_all(classifier, items, AnalysisContext, per_game=True)
+    assert per_move == baseline and per_game == baseline, "memoized classifications differ"
+    print(f"identical classifications ({baseline.count('brilliant')} brilliant)")
+    print(context.report())
+
+    for label, make_context, shared in (("no memo", NoMemo, False),
+                                        ("context per classification", AnalysisContext, False),
+                                        ("context per game", AnalysisContext, True)):
+        seconds = time_call(lambda: classify_all(classifier, items, make_context, shared), repeat=3)
+        report(label, seconds, len(items), "move")
+
+if __name__ == "__main__":
+    main()
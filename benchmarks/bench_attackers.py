@@ -0,0 +1,91 @@
+# bench_attackers.py
+# Attacker detection used by the move classifier (piece safety, danger levels,
+# brilliant moves): the former FEN round-trip (turn edited in the FEN string,
+# new Board parsed, every legal move generated) vs direct_attacking_moves now
+# (side to move switched on the board, legal moves only from attacking squares).
+#
+# First checks that both give the same attackers, in the same order, for every
+# square and colour of a corpus of positions, then times them.
+#
+#   python -m benchmarks.bench_attackers [games]
+
+import sys
+
+import chess
+from benchmarks.common import synthetic_game, time_call, report
+from src.analysis.attackers import RawMove, direct_attacking_moves, get_attacking_moves, get_turn_fen
+
+GAMES = 20
+PLIES = 80
+# Captures with promotion, en passant, pins, checks and a battery
+EXTRA_FENS = [
+    "r3k2r/1P4P1/8/3pP3/8/8/5p2/R3K1NR w KQkq d6 0 1",
+    "4k3/8/8/4n3/8/8/4R3/4R1K1 w - - 0 1",
+    "4k3/4r3/8/8/4B3/8/8/4K3 w - - 0 1",
+    "rnb1kbnr/pppp1ppp/8/4p3/5PPq/8/PPPPP2P/RNBQKBNR w KQkq - 1 3",
+    "8/8/3k4/2pP4/8/8/8/4K3 w - c6 0 2",
+]
+
+def fen_direct_attacking_moves(board, piece_square, piece_color):
+    """direct_attacking_moves before: FEN round-trip and the full legal move list."""
+    attacker_color = not piece_color
+    attacker_board = chess.Board(get_turn_fen(board.fen(), attacker_color))
+    attacking_moves = []
+    for move in attacker_board.legal_moves:
+        if move.to_square == piece_square:
+            attacker_piece = attacker_board.piece_at(move.from_square)
+            if attacker_piece:
+                attacking_moves.append(RawMove(attacker_piece.piece_type, attacker_piece.color,
+                                               move.from_square, move.to_square))
+    king_sq = None
+    for sq in attacker_board.attackers(attacker_color, piece_square):
+        p = attacker_board.piece_at(sq)
+        if p and p.piece_type == chess.KING:
+            king_sq = sq
+            break
+    if king_sq is not None and not any(m.piece == chess.KING for m in attacking_moves):
+        attacking_moves.append(RawMove(chess.KING, attacker_color, king_sq, piece_square))
+    return attacking_moves
+
+def corpus(games):
+    boards = [chess.Board(fen) for fen in EXTRA_FENS]
+    for seed in range(games):
+        board = chess.Board()
+        for move in synthetic_game(PLIES, seed):
+            board.push(move)
+            boards.append(board.copy(stack=False))
+    return boards
+
+def occupied_queries(boards):
+    """(board, square, colour of the piece on it): the classifier's own calls."""
+    return [(board, square, board.color_at(square)) for board in boards for square in chess.scan_forward(board.occupied)]
+
+def check_equal(boards):
+    checked = 0
+    for board in boards:
+        fen = board.fen()
+        for square in chess.SQUARES:
+            for color in chess.COLORS:
+                expected = fen_direct_attacking_moves(board, square, color)
+                if direct_attacking_moves(board, square, color) != expected \
+                        or get_attacking_moves(board, square, color, True) != expected:
+                    raise AssertionError(f"Mismatch on {fen} {chess.square_name(square)} {color}")
+                checked += 1
+        assert board.fen() == fen # The board is left untouched
+    return checked
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    boards = corpus(games)
+    checked = check_equal(boards)
+    print(f"{len(boards)} positions, {checked} (square, colour) queries: identical results")
+
+    queries = occupied_queries(boards)
+    before = time_call(lambda: [fen_direct_attacking_moves(b, sq, c) for b, sq, c in queries], repeat=3)
+    after = time_call(lambda: [direct_attacking_moves(b, sq, c) for b, sq, c in queries], repeat=3)
+    report("FEN round-trip (before)", before, len(queries), "query")
+    report("board attack masks (after)", after, len(queries), "query")
+    print(f"speedup x{before / after:.1f}")
+
+if __name__ == "__main__":
+    main()
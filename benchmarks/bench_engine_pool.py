@@ -0,0 +1,71 @@
+# bench_engine_pool.py
+# Wall time of analysing every position of an 80-ply game through EnginePool
+# with 1, 2 and 4 engine processes. Uses the scripted fake engine (fixed search
+# time per position), so the numbers show scheduling overhead and scaling only.
+
+import sys
+import time
+import chess
+from PyQt6.QtCore import QCoreApplication, QEventLoop
+from benchmarks.common import synthetic_game, report
+from src.model.engine_pool import EnginePool
+
+SEARCH_MS = 40
+FAKE_ENGINE = [sys.executable, "-m", "benchmarks.fake_uci_engine", str(SEARCH_MS)]
+
+def positions_of(moves):
+    board = chess.Board()
+    fens = [board.fen()]
+    for move in moves:
+        board.push(move)
+        fens.append(board.fen())
+    return fens
+
+def run_pool(size, fens):
+    pool = EnginePool(engine_path=FAKE_ENGINE, size=size)
+    pool.start()
+    loop = QEventLoop()
+    results = {}
+    job_steps = {}
+
+    def on_finished(job_id, pvs):
+        results[job_steps[job_id]] = pvs
+        if len(results) == len(fens):
+            loop.quit()
+
+    # Warm-up: wait until every engine process has answered once
+    warm = {pool.submit(fens[0]) for _ in range(size)}
+    warm_loop = QEventLoop()
+
+    def on_warm(job_id, pvs):
+        warm.discard(job_id)
+        if not warm:
+            warm_loop.quit()
+
+    pool.job_finished.connect(on_warm)
+    warm_loop.exec()
+    pool.job_finished.disconnect()
+
+    pool.job_finished.connect(on_finished)
+    start = time.perf_counter()
+    for step, fen in enumerate(fens):
+        job_steps[pool.submit(fen, depth=20, multipv=3)] = step
+    loop.exec()
+    elapsed = time.perf_counter() - start
+    pool.shutdown()
+
+    # Results arrive out of order but must map back to their own position
+    for step, fen in enumerate(fens):
+        board = chess.Board(fen)
+        assert chess.Move.from_uci(results[step][1].pv_move) in board.legal_moves
+    return elapsed
+
+def main():
+    app = QCoreApplication(sys.argv)
+    fens = positions_of(synthetic_game(80))
+    print(f"{len(fens)} positions, {SEARCH_MS} ms per search")
+    for size in (1, 2, 4):
+        report(f"pool of {size} engine(s)", run_pool(size, fens), len(fens), "position")
+
+if __name__ == "__main__":
+    main()
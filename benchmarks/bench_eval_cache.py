@@ -0,0 +1,59 @@
+# bench_eval_cache.py
+# EvalCache throughput on the positions of 50 random 80-ply games (4050 positions):
+# storing MultiPV 3 results, then looking them up again (all hits) and
+# looking up unseen positions (all misses). A cache hit replaces a full
+# engine search (hundreds of ms at depth 20).
+
+import os
+import tempfile
+import chess
+from benchmarks.common import synthetic_game, time_call, report
+from src.model.eval_cache import EvalCache
+from src.model.uci_protocol import InfoRecord
+
+ENGINE_ID = "bench"
+
+def positions(games, seed):
+    boards = []
+    for g in range(games):
+        board = chess.Board()
+        boards.append(board.copy(stack=False))
+        for move in synthetic_game(80, seed + g):
+            board.push(move)
+            boards.append(board.copy(stack=False))
+    return boards
+
+def fake_pvs(board):
+    pvs = {}
+    for rank, move in enumerate(list(board.legal_moves)[:3], start=1):
+        pvs[rank] = InfoRecord(cp=10 * rank, pv=[move], depth=20, multipv=rank)
+    return pvs
+
+def main():
+    boards = positions(50, 1)
+    unseen = positions(50, 5000)
+    results = [fake_pvs(board) for board in boards]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EvalCache(os.path.join(tmp, "evals.sqlite"))
+
+        def store():
+            for board, pvs in zip(boards, results):
+                cache.put(board, 3, pvs, ENGINE_ID)
+
+        def hits():
+            for board in boards:
+                assert cache.get(board, 20, 3, ENGINE_ID) is not None
+
+        def misses():
+            for board in unseen:
+                cache.get(board, 20, 3, ENGINE_ID)
+
+        print(f"{len(boards)} positions")
+        report("put (commit per result)", time_call(store, repeat=1), len(boards), "position")
+        report("get, hit", time_call(hits, repeat=3), len(boards), "position")
+        report("get, miss", time_call(misses, repeat=3), len(unseen), "position")
+        cache.close()
+
+if __name__ == "__main__":
+    main()
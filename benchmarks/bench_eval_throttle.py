@@ -0,0 +1,51 @@
+# bench_eval_throttle.py
+# Number of eval_updated events reaching the GUI thread during a 2 s search that
+# streams 4000 MultiPV-1 info lines (a scripted engine standing in for Stockfish's
+# output at depth 20), unthrottled vs coalesced at EVAL_UPDATE_HZ.
+
+import sys
+import time
+import chess
+from PyQt6.QtCore import QCoreApplication, QEventLoop
+import src.model.engine_thread as engine_thread
+from src.model.engine_thread import EngineThread
+
+SEARCH_MS = 2000
+INFO_LINES = 4000
+FAKE_ENGINE = [sys.executable, "-m", "benchmarks.fake_uci_engine", str(SEARCH_MS), str(INFO_LINES)]
+
+def run_search(hz):
+    engine_thread.EVAL_UPDATE_HZ = hz
+    engine = EngineThread(FAKE_ENGINE)
+    engine.start_engine()
+    events = []
+    handler_time = [0.0]
+    loop = QEventLoop()
+
+    def on_eval(score, best_move):
+        start = time.perf_counter()
+        # Stand-in for GameController.handle_eval_update's board checks
+        board = chess.Board()
+        board.is_checkmate()
+        events.append(score)
+        handler_time[0] += time.perf_counter() - start
+
+    engine.eval_updated.connect(on_eval)
+    engine.search_finished.connect(lambda search: loop.quit())
+    engine.set_position(chess.STARTING_FEN)
+    engine.go(depth=20)
+    loop.exec()
+    engine.stop_engine()
+    return events, handler_time[0]
+
+def main():
+    app = QCoreApplication(sys.argv)
+    print(f"{INFO_LINES} info lines over {SEARCH_MS} ms")
+    for hz in (0, engine_thread.EVAL_UPDATE_HZ):
+        events, handler = run_search(hz)
+        label = "unthrottled" if hz == 0 else f"coalesced at {hz} Hz"
+        # The last delivered eval must be the engine's final one
+        print(f"{label:<24} {len(events):6d} events   handler {handler * 1000:8.2f} ms   last {events[-1]}")
+
+if __name__ == "__main__":
+    main()
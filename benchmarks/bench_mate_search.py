@@ -0,0 +1,55 @@
+# bench_mate_search.py
+# Mate-in-one detection on the positions of random games that favour checks
+# (so some positions have a mate): every legal move pushed and tested with
+# is_checkmate (the old danger-level check) vs mate_search.find_mate_in_one.
+# Checks both agree on every position.
+#
+#   python -m benchmarks.bench_mate_search [games]
+
+import random
+import sys
+
+import chess
+from benchmarks.common import time_call, report
+from src.analysis.mate_search import find_mate_in_one
+
+GAMES = 60
+CHECK_BIAS = 0.3 # Chance of playing a checking move when there is one
+
+def corpus(games):
+    boards = []
+    for seed in range(games):
+        rng = random.Random(seed)
+        board = chess.Board()
+        while not board.is_game_over():
+            boards.append(board.copy(stack=False))
+            moves = list(board.legal_moves)
+            checks = [move for move in moves if board.gives_check(move)]
+            board.push(rng.choice(checks if checks and rng.random() < CHECK_BIAS else moves))
+    return boards
+
+def push_every_move(board):
+    for move in board.legal_moves:
+        board.push(move)
+        if board.is_checkmate():
+            board.pop()
+            return move
+        board.pop()
+    return None
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    boards = corpus(games)
+    expected = [push_every_move(board) is not None for board in boards]
+    found = [find_mate_in_one(board) is not None for board in boards]
+    assert found == expected, "mate-in-one results differ"
+    print(f"{len(boards)} positions, {sum(found)} with a mate in one: identical results")
+
+    before = time_call(lambda: [push_every_move(board) for board in boards], repeat=3)
+    after = time_call(lambda: [find_mate_in_one(board) for board in boards], repeat=3)
+    report("push every legal move (before)", before, len(boards), "position")
+    report("find_mate_in_one (after)", after, len(boards), "position")
+    print(f"speedup x{before / after:.1f}")
+
+if __name__ == "__main__":
+    main()
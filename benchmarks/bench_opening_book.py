@@ -0,0 +1,90 @@
+# bench_opening_book.py
+# Per-lookup cost of get_opening_name over a 200-ply game:
+# reparsing openings.json on every call (old behaviour) vs the shared index,
+# plus the Python heap cost of the JSON index vs the memory-mapped openings.bin.
+
+import json
+import os
+import tracemalloc
+import chess
+from benchmarks.common import synthetic_game, time_call, report
+from src.analysis import opening_book
+
+def legacy_get_opening_name(fen: str):
+    with open(opening_book.OPENINGS_PATH, 'r', encoding='utf-8') as f:
+        openings_db = json.load(f)
+    return openings_db.get(fen.split(" ")[0])
+
+def main():
+    moves = synthetic_game(200)
+    fens = []
+    board = chess.Board()
+    for move in moves:
+        board.push(move)
+        fens.append(board.fen())
+
+    def run(lookup):
+        for fen in fens:
+            lookup(fen)
+
+    legacy = time_call(lambda: run(legacy_get_opening_name), repeat=3)
+    opening_book.reload_openings(opening_book.OPENINGS_PATH)
+    indexed = time_call(lambda: run(opening_book.get_opening_name))
+
+    print(f"200-ply game, {len(opening_book.get_opening_index())} openings")
+    report("json.load per call (before)", legacy, len(fens), "lookup")
+    report("shared JSON index (after)", indexed, len(fens), "lookup")
+
+    if not os.path.exists(opening_book.OPENINGS_BIN_PATH):
+        opening_book.compile_opening_book()
+    opening_book.reload_openings(opening_book.OPENINGS_BIN_PATH)
+    mapped = time_call(lambda: run(opening_book.get_opening_name))
+    report("mmap openings.bin", mapped, len(fens), "lookup")
+
+    # Python heap allocated by loading each index
+    for label, path in (("JSON index", opening_book.OPENINGS_PATH), ("mmap index", opening_book.OPENINGS_BIN_PATH)):
+        tracemalloc.start()
+        index = opening_book.reload_openings(path)
+        heap, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label + ' heap after load':<40} {heap / 1024:10.1f} KiB")
+
+def bench_trie():
+    """Per-ply FEN lookups vs one trie walk on a Najdorf game that leaves book early."""
+    opening = "e4 c5 Nf3 d6 d4 cxd4 Nxd4 Nf6 Nc3 a6 Be3 e5 Nb3 Be6 f3 Be7 Qd2 O-O O-O-O Nbd7".split()
+    board = chess.Board()
+    for san in opening:
+        board.push_san(san)
+    moves = list(board.move_stack)
+    rng = __import__('random').Random(7)
+    while len(moves) < 200 and not board.is_game_over():
+        move = rng.choice(list(board.legal_moves))
+        board.push(move)
+        moves.append(move)
+
+    def per_ply():
+        b = chess.Board()
+        for move in moves:
+            b.push(move)
+            opening_book.get_opening_name(b.fen())
+
+    opening_book.reload_openings(opening_book.OPENINGS_PATH)
+    cold = time_call(lambda: opening_book.reload_openings(opening_book.OPENINGS_PATH) and opening_book.get_opening_trie().walk(moves), repeat=1)
+    line = opening_book.get_opening_trie().walk(moves)
+    lookups = time_call(per_ply)
+    warm = time_call(lambda: opening_book.get_opening_trie().walk(moves))
+
+    # Out-of-book moves must not grow the trie: only prefixes of named lines are kept
+    trie = opening_book.get_opening_trie()
+    for seed in range(100):
+        trie.walk(synthetic_game(60, seed))
+
+    print(f"{len(moves)}-ply game, book depth {line.book_depth}: {line.last_opening}")
+    print(f"trie nodes after 100 random games: {trie.nodes}")
+    report("per-ply FEN lookup", lookups, len(moves), "ply")
+    report("trie walk (cold, incl. index load)", cold, len(moves), "ply")
+    report("trie walk (warm)", warm, len(moves), "ply")
+
+if __name__ == "__main__":
+    main()
+    bench_trie()
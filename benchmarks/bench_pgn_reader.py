@@ -0,0 +1,143 @@
+# bench_pgn_reader.py
+# PGN import throughput on a generated 100k-game file: chess.pgn.read_game
+# (full game trees) vs the streaming reader (tags + mainline SAN), alone,
+# with SAN -> move conversion, and split into byte ranges over worker processes.
+# First checks the streaming reader against chess.pgn on a small file with
+# awkward comments ("{" inside a comment, a tag line inside one, ";" comments).
+#
+#   python -m benchmarks.bench_pgn_reader [games] [workers]
+
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import chess
+import chess.pgn
+from benchmarks.common import synthetic_game
+from src.model.pgn_reader import read_games, split_chunks
+
+GAMES = 100000
+DISTINCT_GAMES = 300 # Movetexts generated, then repeated with new tags
+SUBSET = 5000 # Games timed for the slow full parsers
+
+def movetext(moves, rng):
+    """Lichess-style movetext: clock comments, some NAGs and one-move variations."""
+    board = chess.Board()
+    parts = []
+    for ply, move in enumerate(moves):
+        if ply % 2 == 0:
+            parts.append(f"{ply // 2 + 1}.")
+        parts.append(board.san(move))
+        parts.append(f"{{ [%clk 0:{rng.randint(0, 9)}:{rng.randint(10, 59)}] }}")
+        if rng.random() < 0.05:
+            parts.append(f"${rng.randint(1, 6)}")
+        if rng.random() < 0.05:
+            alternative = next(iter(board.legal_moves))
+            number = f"{ply // 2 + 1}." if ply % 2 == 0 else f"{ply // 2 + 1}..."
+            parts.append(f"( {number} {board.san(alternative)} {{ also possible }} )")
+        board.push(move)
+    parts.append("*")
+    # Wrap at 80 columns like most exporters
+    lines, line = [], ""
+    for part in parts:
+        if len(line) + len(part) + 1 > 80:
+            lines.append(line)
+            line = part
+        else:
+            line = f"{line} {part}" if line else part
+    lines.append(line)
+    return "\n".join(lines)
+
+def generate_file(path, games):
+    rng = random.Random(7)
+    texts = [movetext(synthetic_game(rng.randint(40, 120), seed), rng) for seed in range(DISTINCT_GAMES)]
+    with open(path, "w", encoding="utf-8") as f:
+        for n in range(games):
+            f.write(f'[Event "Bench {n}"]\n[Site "?"]\n[Date "2024.01.01"]\n[Round "{n}"]\n'
+                    f'[White "Player {n % 997}"]\n[Black "Player {n % 991}"]\n[Result "*"]\n'
+                    f'[WhiteElo "{1500 + n % 700}"]\n[BlackElo "{1500 + n % 701}"]\n\n')
+            f.write(texts[n % DISTINCT_GAMES])
+            f.write("\n\n")
+
+# Comments the tag splitter must see through; comments don't nest, the first "}" closes them
+TRICKY_COMMENTS = ["{ great {idea }", "{ see\n[Event \"not a tag\"]\n}", "; note {\n", "{ a } { b {{ }"]
+CHECK_GAMES = 300
+
+def check_reader(games=CHECK_GAMES, workers=4):
+    """read_games (whole file and in byte ranges) agrees with chess.pgn on every game."""
+    rng = random.Random(11)
+    texts = [movetext(synthetic_game(rng.randint(20, 60), seed), rng) for seed in range(20)]
+    path = os.path.join(tempfile.gettempdir(), "bench_pgn_check.pgn")
+    with open(path, "w", encoding="utf-8") as f:
+        for n in range(games):
+            text = texts[n % len(texts)]
+            if n % 7 == 0:
+                # After the first move's clock comment
+                cut = text.index("}") + 1
+                text = f"{text[:cut]} {TRICKY_COMMENTS[n // 7 % len(TRICKY_COMMENTS)]} {text[cut:].lstrip()}"
+            f.write(f'[Event "Check {n}"]\n[Result "*"]\n\n{text}\n\n')
+
+    expected = []
+    with open(path, encoding="utf-8") as handle:
+        while (game := chess.pgn.read_game(handle)) is not None:
+            expected.append((game.headers["Event"], list(game.mainline_moves())))
+    streamed = [(game.headers.get("Event"), game.moves()) for game in read_games(path)]
+    chunked = [(game.headers.get("Event"), game.moves())
+               for start, end in split_chunks(path, workers) for game in read_games(path, start, end)]
+    assert len(expected) == games, f"chess.pgn read {len(expected)} games"
+    assert streamed == expected, f"read_games: {len(streamed)} games, differs from chess.pgn"
+    assert chunked == expected, f"split_chunks + read_games: {len(chunked)} games, differs from chess.pgn"
+    os.remove(path)
+    print(f"{games} games with awkward comments: read_games and split_chunks match chess.pgn")
+
+def read_chess_pgn(path, limit):
+    count = 0
+    with open(path, encoding="utf-8") as handle:
+        while count < limit and chess.pgn.read_game(handle) is not None:
+            count += 1
+    return count
+
+def read_stream(path, limit=None, moves=False):
+    count = 0
+    for game in islice(read_games(path), limit):
+        if moves:
+            game.moves()
+        count += 1
+    return count
+
+def count_chunk(args):
+    path, start, end = args
+    return sum(1 for _ in read_games(path, start, end))
+
+def read_parallel(path, workers):
+    chunks = split_chunks(path, workers)
+    with ProcessPoolExecutor(workers) as pool:
+        return sum(pool.map(count_chunk, [(path, start, end) for start, end in chunks]))
+
+def timed(label, fn):
+    start = time.perf_counter()
+    count = fn()
+    seconds = time.perf_counter() - start
+    print(f"{label:<44} {count:8d} games {seconds:8.2f} s {count / seconds:12.0f} games/s")
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else min(4, os.cpu_count() or 1)
+    check_reader()
+    path = os.path.join(tempfile.gettempdir(), f"bench_pgn_{games}.pgn")
+    if not os.path.exists(path):
+        print(f"Generating {path} ...")
+        generate_file(path, games)
+    print(f"{games} games, {os.path.getsize(path) / 1e6:.1f} MB")
+
+    timed(f"chess.pgn.read_game (first {SUBSET})", lambda: read_chess_pgn(path, SUBSET))
+    timed(f"read_games + moves() (first {SUBSET})", lambda: read_stream(path, SUBSET, moves=True))
+    timed("read_games (tags + SAN)", lambda: read_stream(path))
+    timed(f"read_games, {workers} byte-range workers", lambda: read_parallel(path, workers))
+
+if __name__ == "__main__":
+    main()
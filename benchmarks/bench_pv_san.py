@@ -0,0 +1,55 @@
+# bench_pv_san.py
+# SAN rendering cost of the engine-lines panel: 3 MultiPV lines of 12 plies
+# redrawn 20 times per second for a 30 s search (600 redraws). PVs change
+# the way a deepening search changes them: mostly identical between updates,
+# with the tail (and sometimes the whole line) replaced at each new depth.
+
+import random
+import chess
+from benchmarks.common import synthetic_game, time_call, report
+from src.view.pv_lines import SanLineCache, PV_DISPLAY_PLIES
+
+REDRAWS = 600
+
+def search_updates(seed=1):
+    rng = random.Random(seed)
+    fen = chess.Board().fen()
+    lines = [synthetic_game(PV_DISPLAY_PLIES, seed + n) for n in range(3)]
+    updates = []
+    for redraw in range(REDRAWS):
+        if redraw % 20 == 0:
+            # New depth: each line keeps a random prefix and gets a new tail
+            for n, line in enumerate(lines):
+                keep = rng.randint(0, PV_DISPLAY_PLIES)
+                board = chess.Board()
+                for move in line[:keep]:
+                    board.push(move)
+                tail = []
+                while keep + len(tail) < PV_DISPLAY_PLIES and not board.is_game_over():
+                    move = rng.choice(list(board.legal_moves))
+                    board.push(move)
+                    tail.append(move)
+                lines[n] = line[:keep] + tail
+        updates.append([list(line) for line in lines])
+    return fen, updates
+
+def render_uncached(fen, updates):
+    for lines in updates:
+        for line in lines:
+            chess.Board(fen).variation_san(line)
+
+def render_cached(fen, updates):
+    cache = SanLineCache()
+    for lines in updates:
+        for line in lines:
+            cache.line_text(fen, line)
+
+def main():
+    fen, updates = search_updates()
+    count = len(updates) * 3
+    print(f"{len(updates)} redraws x 3 lines x {PV_DISPLAY_PLIES} plies")
+    report("board.variation_san per redraw", time_call(lambda: render_uncached(fen, updates), repeat=3), count, "line")
+    report("SanLineCache (prefix tree)", time_call(lambda: render_cached(fen, updates), repeat=3), count, "line")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# bench_see.py
+# Piece safety on the positions of synthetic games, in both modes of
+# piece_safety.is_piece_safe: "reference" (wintrchess attacker/defender rules,
+# recursive defender simulations) vs "see" (static exchange on attack bitboards).
+#
+# Differential check: every disagreement between the two modes must fall in one
+# of the known classes listed with analysis_config.PIECE_SAFETY_MODE, and the
+# recorded positions of each class must still give the expected verdicts.
+# Then times is_piece_safe and is_piece_trapped per mode.
+#
+#   python -m benchmarks.bench_see [games]
+
+import sys
+
+import chess
+from benchmarks.common import synthetic_game, time_call, report
+from src.analysis.attackers import get_attacking_moves
+from src.analysis.defenders import get_defending_moves
+from src.analysis.piece_safety import get_piece_value, is_piece_safe
+from src.analysis.piece_trapped import is_piece_trapped
+from src.analysis.see import static_exchange
+
+GAMES = 20
+PLIES = 80
+
+# Known reasons for the modes to disagree
+ATTACKER_IN_CHECK = "attacker in check" # No legal capture yet: reference safe, see unsafe
+PAWN_DEFENDER = "pawn defender" # Reference: any pawn-defended piece is safe; the exchange loses
+COUNT_LOSES = "count loses" # Attackers <= defenders, but the exchange loses material
+COUNT_EVEN = "count even" # Attackers > defenders, but no capture wins material: reference unsafe, see safe
+
+# Disagreements found on the synthetic games, as expected outcomes: (fen, square, class)
+DIVERGENCES = [
+    ("rnb1N3/p2p2k1/1np4r/1p3ppp/2P2P2/P1NPP3/1b3R1P/R1B2KQ1 b - - 2 24", "a1", ATTACKER_IN_CHECK),
+    ("rnb1N3/p2p2k1/1np4r/1p3ppp/2P2P2/P1NPP3/1b3R1P/R1B2KQ1 b - - 2 24", "c3", ATTACKER_IN_CHECK),
+    ("3qkn1r/r1pp2p1/b2b4/pp2pP1p/N1P1P1p1/PP3n1P/2QPK3/R1B2BNR w - - 3 20", "f3", PAWN_DEFENDER),
+    ("3qkn1r/r1pp2p1/b2b1P2/pp2p2p/N1P1P1p1/PP3n1P/2QPK3/R1B2BNR b - - 0 20", "f3", PAWN_DEFENDER),
+    ("4kbnr/3bN3/5p2/2p2pp1/p3P3/P3B2P/qr4BR/R2K4 w k - 4 37", "g2", COUNT_LOSES),
+    ("4kbnr/3bN3/5p2/2p2pp1/p3P3/P3B2P/qr4BR/R3K3 b k - 5 37", "g2", COUNT_LOSES),
+    ("r4b1r/3nk2p/qP3p2/p2Np3/2pP3P/P2bP3/6PR/RN3BK1 b - - 1 32", "d3", COUNT_EVEN),
+    ("2bqkbnr/1r1PN1pp/5p2/pPpQ2P1/4PP2/n6P/1P4B1/R1BK3R b k - 0 24", "b7", COUNT_EVEN),
+]
+
+def corpus(games):
+    boards = []
+    for seed in range(games):
+        board = chess.Board()
+        for move in synthetic_game(PLIES, seed):
+            board.push(move)
+            boards.append(board.copy(stack=False))
+    return boards
+
+def pieces(boards):
+    """(board, square, colour) for every piece get_unsafe_pieces looks at (no pawns, no kings)."""
+    return [(board, square, board.color_at(square)) for board in boards
+            for square in chess.scan_forward(board.occupied & ~board.pawns & ~board.kings)]
+
+def divergence(board, square, color, reference_safe):
+    """Known class of a disagreement between the modes (reference verdict given), or None."""
+    attackers = get_attacking_moves(board, square, color, transitive=False)
+    defenders = get_defending_moves(board, square, color)
+    if reference_safe:
+        if board.turn != color and board.is_check():
+            return ATTACKER_IN_CHECK
+        if len(attackers) <= len(defenders):
+            return COUNT_LOSES
+        if any(defender.piece == chess.PAWN for defender in defenders):
+            return PAWN_DEFENDER
+    else:
+        value = get_piece_value(board.piece_type_at(square))
+        if len(attackers) > len(defenders) and static_exchange(board, square) == 0 \
+                and all(get_piece_value(attacker.piece) >= value for attacker in attackers):
+            return COUNT_EVEN
+    return None
+
+def check_divergences():
+    for fen, name, expected in DIVERGENCES:
+        board = chess.Board(fen)
+        square = chess.parse_square(name)
+        color = board.color_at(square)
+        reference = is_piece_safe(board, square, color, mode="reference")
+        see = is_piece_safe(board, square, color, mode="see")
+        assert reference == (expected != COUNT_EVEN) and see == (not reference), f"{fen} {name}: verdicts changed"
+        assert divergence(board, square, color, reference) == expected, f"{fen} {name}: not {expected}"
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    check_divergences()
+    queries = pieces(corpus(games))
+
+    reference = [is_piece_safe(b, sq, c, mode="reference") for b, sq, c in queries]
+    see = [is_piece_safe(b, sq, c, mode="see") for b, sq, c in queries]
+    classes = {}
+    for (board, square, color), safe in ((q, r) for q, r, s in zip(queries, reference, see) if r != s):
+        kind = divergence(board, square, color, safe)
+        assert kind is not None, f"unexplained disagreement: {board.fen()} {chess.square_name(square)}"
+        classes[kind] = classes.get(kind, 0) + 1
+    unsafe = sum(1 for r in reference if not r)
+    differences = sum(classes.values())
+    print(f"{len(queries)} pieces, {unsafe} unsafe by reference; modes disagree on {differences} "
+          f"({differences / len(queries):.1%}), all in known classes:")
+    for kind, count in sorted(classes.items(), key=lambda item: -item[1]):
+        print(f"  {kind:<18} {count}")
+
+    for mode in ("reference", "see"):
+        seconds = time_call(lambda: [is_piece_safe(b, sq, c, mode=mode) for b, sq, c in queries], repeat=3)
+        report(f"is_piece_safe ({mode})", seconds, len(queries), "piece")
+
+    # Trapped-piece detection runs on the pieces found unsafe before a move
+    unsafe_queries = [q for q, r in zip(queries, reference) if not r]
+    for mode in ("reference", "see"):
+        seconds = time_call(lambda: [is_piece_trapped(b, sq, mode=mode) for b, sq, _ in unsafe_queries], repeat=1)
+        report(f"is_piece_trapped ({mode})", seconds, len(unsafe_queries), "piece")
+
+if __name__ == "__main__":
+    main()
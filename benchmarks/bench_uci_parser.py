@@ -0,0 +1,86 @@
+# bench_uci_parser.py
+# Cost of parsing engine output: the old substring/index parser (kept below for
+# reference) vs uci_protocol.parse_info_line. The log is generated to mirror
+# Stockfish's "go depth 30" MultiPV 3 output (info lines with full PVs,
+# currmove chatter and bound lines), since no engine binary ships with the repo.
+
+import random
+from benchmarks.common import synthetic_game, time_call, report
+from src.model.uci_protocol import parse_info_line
+
+def engine_log(seed=1):
+    rng = random.Random(seed)
+    pv_pool = [move.uci() for move in synthetic_game(60, seed)]
+    lines = ["info string NNUE evaluation using nn-5af11540bbfe.nnue enabled"]
+    nodes = 0
+    for depth in range(1, 31):
+        for multipv in range(1, 4):
+            nodes += rng.randint(2000, 400000)
+            cp = rng.randint(-60, 60)
+            pv = " ".join(pv_pool[:min(depth + rng.randint(0, 6), len(pv_pool))])
+            # Fail-high / fail-low lines are printed during aspiration re-searches
+            if depth > 10 and multipv == 1 and rng.random() < 0.3:
+                bound = rng.choice(("lowerbound", "upperbound"))
+                lines.append(f"info depth {depth} seldepth {depth + 8} multipv 1 score cp {cp} {bound} "
+                             f"nodes {nodes} nps 1450000 hashfull {depth * 10} tbhits 0 time {nodes // 1450} pv {pv_pool[0]}")
+            lines.append(f"info depth {depth} seldepth {depth + 8} multipv {multipv} score cp {cp} "
+                         f"nodes {nodes} nps 1450000 hashfull {depth * 10} tbhits 0 time {nodes // 1450} pv {pv}")
+        if depth > 20:
+            for number, move in enumerate(pv_pool[:20], start=1):
+                lines.append(f"info depth {depth} currmove {move} currmovenumber {number}")
+    lines.append(f"bestmove {pv_pool[0]} ponder {pv_pool[1]}")
+    return lines
+
+def parse_info_line_old(line):
+    # Parser used by EngineThread.run before this benchmark was added
+    if not ("info" in line and "score" in line):
+        return None
+    parts = line.split()
+    score_val = ""
+    pv_move = ""
+    multipv_id = 1
+    depth = 0
+    if "multipv" in parts:
+        idx = parts.index("multipv")
+        multipv_id = int(parts[idx+1])
+    if "depth" in parts:
+        idx = parts.index("depth")
+        depth = int(parts[idx+1])
+    cp = 0
+    mate = None
+    if "score cp" in line:
+        try:
+            idx = parts.index("cp")
+            val = int(parts[idx+1])
+            cp = val
+            score_val = f"{val/100.0:+.2f}"
+        except: pass
+    elif "score mate" in line:
+        try:
+            idx = parts.index("mate")
+            val = int(parts[idx+1])
+            mate = val
+            score_val = f"#{val}"
+        except: pass
+    if " pv " in line:
+        try:
+            idx = parts.index("pv")
+            if idx + 1 < len(parts):
+                pv_move = parts[idx+1]
+        except: pass
+    return multipv_id, {"score_str": score_val, "cp": cp, "mate": mate,
+                        "pv_move": pv_move, "depth": depth, "full_line": line}
+
+def run(parser, lines):
+    for line in lines:
+        parser(line)
+
+def main():
+    lines = engine_log() * 20
+    scored = sum(1 for line in lines if parse_info_line(line) is not None)
+    print(f"{len(lines)} lines ({scored} with a score)")
+    report("substring parser (before)", time_call(lambda: run(parse_info_line_old, lines)), len(lines), "line")
+    report("single-pass parser (after)", time_call(lambda: run(parse_info_line, lines)), len(lines), "line")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# check_move_list.py
+# Correctness check for the incremental move list: MoveListModel.sync is fed
+# move-by-move play, undos, a changed early ply and a different game sharing
+# SANs with the one shown, and must always end up with exactly the given
+# history (QAbstractItemModelTester checks the row signals on the way).
+# Also times replaying a long game one move at a time.
+#
+#   QT_QPA_PLATFORM=offscreen python -m benchmarks.check_move_list
+
+import sys
+
+import chess
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtTest import QAbstractItemModelTester
+from benchmarks.common import synthetic_game, time_call, report
+from src.view.move_list import MoveListModel
+
+def san_history(moves):
+    board = chess.Board()
+    sans = []
+    for move in moves:
+        sans.append(board.san(move))
+        board.push(move)
+    return sans
+
+def rows(model):
+    return [model.data(model.index(row)) for row in range(model.rowCount())]
+
+def expected_rows(sans):
+    return [f"{n + 1}. {' '.join(sans[2 * n:2 * n + 2])}" for n in range((len(sans) + 1) // 2)]
+
+def check(model, sans, what):
+    model.sync(sans)
+    assert model.sans == sans, f"{what}: {model.sans} != {sans}"
+    assert rows(model) == expected_rows(sans), f"{what}: rows {rows(model)}"
+
+def main():
+    app = QCoreApplication(sys.argv) # Item models need an application instance
+    model = MoveListModel()
+    tester = QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+
+    game = san_history(synthetic_game(40, 3))
+    for ply in range(len(game) + 1):
+        check(model, game[:ply], f"play to ply {ply}")
+    check(model, game[:37], "undo one move")
+    check(model, game[:34], "undo three moves")
+
+    # Same SAN at the same index further on, different game before it
+    check(model, ["e4", "e5", "Nf3", "Nc6"], "new game")
+    check(model, ["d4", "d5", "Nf3"], "different game sharing Nf3")
+    check(model, ["d4", "d5", "Nf3", "Nf6", "c4"], "extend")
+    check(model, ["d4", "Nf6", "Nf3", "Nf6", "c4"], "changed early ply")
+    check(model, ["c4", "Nf6", "Nf3"], "changed first ply, shorter")
+    check(model, [], "cleared")
+    print("move list sync: play, undo, changed early plies and shared SANs OK")
+
+    del tester # Its checks would dominate the timing
+    long_game = san_history(synthetic_game(320))
+    def replay():
+        model.sync([])
+        for ply in range(1, len(long_game) + 1):
+            model.sync(long_game[:ply])
+    report("replay one move at a time", time_call(replay, repeat=3), len(long_game), "ply")
+
+if __name__ == "__main__":
+    main()
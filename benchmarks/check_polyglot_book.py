@@ -0,0 +1,90 @@
+# check_polyglot_book.py
+# Correctness check for the Polyglot theory source: writes a small .bin book
+# (Italian Game main line, with two weighted first moves and a castling entry),
+# opens it through analysis_config.THEORY_BOOK_PATH and checks weights(),
+# is_theory() and walk().book_depth against the moves written.
+#
+#   python -m benchmarks.check_polyglot_book
+
+import os
+import struct
+import tempfile
+
+import chess
+import chess.polyglot
+from src.analysis import analysis_config, opening_book
+
+# (moves played before, book move, weight)
+BOOK = [
+    ([], "e2e4", 10),
+    ([], "d2d4", 5),
+    (["e2e4"], "e7e5", 1),
+    (["e2e4", "e7e5"], "g1f3", 1),
+    (["e2e4", "e7e5", "g1f3"], "b8c6", 1),
+    (["e2e4", "e7e5", "g1f3", "b8c6"], "f1c4", 1),
+    (["e2e4", "e7e5", "g1f3", "b8c6", "f1c4"], "f8c5", 1),
+    (["e2e4", "e7e5", "g1f3", "b8c6", "f1c4", "f8c5"], "e1g1", 1),
+]
+# Leaves the book after 7 plies
+GAME = ["e2e4", "e7e5", "g1f3", "b8c6", "f1c4", "f8c5", "e1g1", "g8f6", "d2d3", "d7d6"]
+
+def polyglot_move(board: chess.Board, move: chess.Move) -> int:
+    # Polyglot encodes castling as the king capturing its own rook
+    to_square = move.to_square
+    if board.is_castling(move):
+        to_square = chess.square(7 if chess.square_file(move.to_square) > 4 else 0,
+                                 chess.square_rank(move.from_square))
+    promotion = move.promotion - 1 if move.promotion else 0
+    return (chess.square_file(to_square) | chess.square_rank(to_square) << 3 |
+            chess.square_file(move.from_square) << 6 | chess.square_rank(move.from_square) << 9 |
+            promotion << 12)
+
+def write_book(path: str):
+    entries = []
+    for played, uci, weight in BOOK:
+        board = chess.Board()
+        for move in played:
+            board.push_uci(move)
+        move = chess.Move.from_uci(uci)
+        entries.append((chess.polyglot.zobrist_hash(board), polyglot_move(board, move), weight))
+    # Readers binary-search on the key, so entries are sorted by it
+    with open(path, "wb") as f:
+        for key, move, weight in sorted(entries, key=lambda entry: entry[0]):
+            f.write(struct.pack(">QHHI", key, move, weight, 0))
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "check_book.bin")
+    write_book(path)
+
+    saved_path = analysis_config.THEORY_BOOK_PATH
+    analysis_config.THEORY_BOOK_PATH = path
+    opening_book.set_theory_source(None)
+    try:
+        book = opening_book.get_theory_source()
+        assert isinstance(book, opening_book.PolyglotBook), "THEORY_BOOK_PATH did not open a PolyglotBook"
+
+        start = chess.Board()
+        weights = {move.uci(): weight for move, weight in book.weights(start).items()}
+        assert weights == {"e2e4": 10, "d2d4": 5}, f"weights at the start: {weights}"
+
+        board = chess.Board()
+        for ply, uci in enumerate(GAME):
+            move = chess.Move.from_uci(uci)
+            expected = ply < len(BOOK) - 1
+            assert book.is_theory(board, move) == expected, f"is_theory({uci}) at ply {ply}"
+            board.push(move)
+        assert not book.is_theory(start, chess.Move.from_uci("a2a3")), "a2a3 is not in the book"
+
+        line = book.walk([chess.Move.from_uci(uci) for uci in GAME])
+        assert line.book_depth == len(BOOK) - 1, f"book depth {line.book_depth}"
+        assert all(line.is_book(ply) for ply in range(line.book_depth))
+        assert book.walk([chess.Move.from_uci("a2a3")]).book_depth == 0
+        print(f"{len(BOOK)} book entries: weights, is_theory and walk (book depth {line.book_depth}) OK")
+        book.close()
+    finally:
+        opening_book.set_theory_source(None)
+        analysis_config.THEORY_BOOK_PATH = saved_path
+        os.remove(path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# common.py
+# Shared helpers for the benchmark scripts.
+# Run benchmarks from the project root, e.g. `python -m benchmarks.bench_opening_book`
+
+import random
+import time
+import chess
+from typing import Callable, List
+
+def synthetic_game(plies: int, seed: int = 1) -> List[chess.Move]:
+    """
+    Returns a reproducible game of exactly 'plies' random legal moves.
+    Random games that end early are discarded and replayed with the next seed.
+    """
+    while True:
+        rng = random.Random(seed)
+        board = chess.Board()
+        moves = []
+        while len(moves) < plies and not board.is_game_over(claim_draw=False):
+            move = rng.choice(list(board.legal_moves))
+            board.push(move)
+            moves.append(move)
+        if len(moves) == plies:
+            return moves
+        seed += 1000
+
+def time_call(fn: Callable[[], object], repeat: int = 5) -> float:
+    """Best wall time (seconds) of 'repeat' runs of fn."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def report(label: str, seconds: float, count: int = 0, unit: str = "op"):
+    line = f"{label:<40} {seconds * 1000:10.2f} ms"
+    if count:
+        line += f"   {seconds / count * 1e6:10.2f} us/{unit}"
+    print(line)
@@ -0,0 +1,68 @@
+# fake_uci_engine.py
+# Minimal scripted UCI engine for benchmarks: "searches" for a fixed time, then
+# reports the first legal moves of the position as its MultiPV lines.
+# With info_lines > 0 it also streams that many intermediate MultiPV-1 lines
+# during the search, like a real engine deepening its search.
+# Usage: python -m benchmarks.fake_uci_engine [search_ms] [info_lines]
+
+import sys
+import threading
+import chess
+
+def main():
+    search_ms = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    info_lines = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    board = chess.Board()
+    multipv = 1
+    stop = threading.Event()
+    search = None
+    out_lock = threading.Lock()
+
+    def send(line):
+        with out_lock:
+            sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+
+    def think(position, lines):
+        moves = list(position.legal_moves)
+        if info_lines:
+            pv = moves[0].uci() if moves else ""
+            for n in range(info_lines):
+                if stop.wait(search_ms / 1000.0 / info_lines): # Interrupted early by "stop"
+                    break
+                send(f"info depth {1 + n * 20 // info_lines} seldepth 30 multipv 1 score cp {-n} nodes {n * 1000} nps 1000000 pv {pv}")
+        else:
+            stop.wait(search_ms / 1000.0) # Interrupted early by "stop"
+        for rank, move in enumerate(moves[:lines], start=1):
+            send(f"info depth 20 multipv {rank} score cp {10 * rank} nodes 1000 pv {move.uci()}")
+        send(f"bestmove {moves[0].uci() if moves else '(none)'}")
+
+    for line in sys.stdin:
+        parts = line.split()
+        if not parts:
+            continue
+        cmd = parts[0]
+        if cmd == "uci":
+            send("id name FakeEngine")
+            send("uciok")
+        elif cmd == "isready":
+            send("readyok")
+        elif cmd == "setoption" and parts[2:3] == ["MultiPV"]:
+            multipv = int(parts[4])
+        elif cmd == "position" and parts[1:2] == ["fen"]:
+            board = chess.Board(" ".join(parts[2:8]))
+        elif cmd == "go":
+            stop.clear()
+            search = threading.Thread(target=think, args=(board.copy(), multipv))
+            search.start()
+        elif cmd == "stop":
+            stop.set()
+        elif cmd == "quit":
+            break
+
+    stop.set()
+    if search is not None:
+        search.join()
+
+if __name__ == "__main__":
+    main()
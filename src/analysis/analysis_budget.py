@@ -0,0 +1,208 @@
+# analysis_budget.py
+# How much engine time each position of a post-game review gets.
+#
+# Plies differ a lot in what they need:
+#   - book:     opening theory on both sides of the position -> no search at all
+#   - terminal: mate / draw on the board -> scored without the engine
+#   - forced:   a single legal move -> shallow search only
+#   - decided:  the shallow eval is already far beyond a win -> shallow result kept
+#   - critical: the shallow eval swings across a move next to it -> extra depth
+#   - normal:   everything else -> the usual review depth
+# All candidates are searched shallow first; the deep pass then runs critical
+# positions before normal ones and stops once the game's engine-time budget is
+# spent (the remaining positions keep their shallow result).
+#
+# Qt-free; driven the same way by GameController (engine pool) and batch_analysis:
+#
+#   budget = AnalysisBudget(boards, book_line)
+#   while not budget.done():
+#       for step, depth, timeout in budget.next_jobs(free_engines): ...search...
+#       budget.add_result(step, pvs, seconds)
+#       for step, pvs in budget.pop_final(): ...store the position (pvs None: book, no eval)...
+#   print(budget.report())
+
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import chess
+
+from src.analysis.game_review import position_entry, terminal_pvs, validate_pvs
+
+REVIEW_SHALLOW_DEPTH = 10
+REVIEW_DEPTH = 20
+REVIEW_EXTRA_DEPTH = 4 # Added on critical positions
+REVIEW_DECIDED_CP = 600 # Shallow eval (either side) beyond which a position is decided
+REVIEW_SWING_CP = 150 # Shallow eval change across one move that makes both positions critical
+REVIEW_SWING_CLAMP = 1000 # Mate scores count as this much when measuring a swing
+REVIEW_GAME_BUDGET = 120.0 # Engine seconds per game (summed over engines); no deep search starts after
+# Watchdog per search (replaces one blanket timeout for every depth)
+REVIEW_SHALLOW_TIMEOUT = 2.0
+REVIEW_TIMEOUT = 10.0
+REVIEW_CRITICAL_TIMEOUT = 20.0
+
+BOOK, TERMINAL, KNOWN, FORCED, DECIDED, CRITICAL, NORMAL = (
+    "book", "terminal", "known", "forced", "decided", "critical", "normal"
+)
+
+class PlyBudget:
+    """What one position got: its category, the depths searched and the time they took."""
+    __slots__ = ("step", "kind", "depths", "seconds", "pvs", "over_budget", "final")
+
+    def __init__(self, step: int, kind: Optional[str]):
+        self.step = step
+        self.kind = kind # None until the shallow pass has decided
+        self.depths: List[Optional[int]] = []
+        self.seconds = 0.0
+        self.pvs: Dict = {}
+        self.over_budget = False # Deep search skipped: game budget spent
+        self.final = False
+
+
+class AnalysisBudget:
+    """
+    Plans the searches of one game review. 'positions[i]' is the board after i
+    moves, 'book_line' a BookLine of the same moves and 'known' the entries of
+    positions that need no search (checkpoints). Pass depth=None for
+    movetime-only searches (the caller's movetime then bounds every search).
+    """
+    def __init__(self, positions: List[chess.Board], book_line, known: Optional[Dict[int, Dict]] = None,
+                 game_budget: float = REVIEW_GAME_BUDGET, depth: Optional[int] = REVIEW_DEPTH,
+                 shallow_depth: int = REVIEW_SHALLOW_DEPTH):
+        self.positions = positions
+        self.known = known or {}
+        self.game_budget = game_budget
+        self.depth = depth
+        self.shallow_depth = shallow_depth if depth is None else min(shallow_depth, depth)
+        self.critical_depth = depth + REVIEW_EXTRA_DEPTH if depth is not None else None
+        self.spent = 0.0 # Engine seconds used so far
+        self.running = 0
+        self.deep_planned = False
+        self.queue = deque() # (step, depth, timeout) not started yet
+        self.finished = deque() # Steps whose search is over, not yet popped
+        self.plies: List[PlyBudget] = []
+
+        last = len(positions) - 1
+        for step, board in enumerate(positions):
+            if step in self.known:
+                ply = PlyBudget(step, KNOWN)
+            elif board.is_game_over():
+                ply = PlyBudget(step, TERMINAL)
+                ply.pvs = terminal_pvs(board)
+                self.finish(ply)
+            # Move 'step - 1' leads here and move 'step' leaves: with both in
+            # theory, the position's eval is never used for a classification
+            elif (step == 0 or book_line.is_book(step - 1)) and (step == last or book_line.is_book(step)):
+                ply = PlyBudget(step, BOOK)
+                self.finish(ply)
+            else:
+                ply = PlyBudget(step, FORCED if board.legal_moves.count() == 1 else None)
+                self.queue.append((step, self.shallow_depth, REVIEW_SHALLOW_TIMEOUT))
+            self.plies.append(ply)
+
+    def finish(self, ply: PlyBudget):
+        ply.final = True
+        self.finished.append(ply.step)
+
+    def needs_engine(self) -> bool:
+        return bool(self.queue) or self.running > 0
+
+    def done(self) -> bool:
+        return not self.queue and self.running == 0 and self.deep_planned and not self.finished
+
+    def next_jobs(self, free: int) -> List[Tuple[int, Optional[int], float]]:
+        """Up to 'free' searches to start now, as (step, depth, timeout)."""
+        if not self.queue and self.running == 0 and not self.deep_planned:
+            self.plan_deep()
+        if self.deep_planned and self.spent >= self.game_budget:
+            # Out of time: the rest keeps its shallow evaluation
+            while self.queue:
+                ply = self.plies[self.queue.popleft()[0]]
+                ply.over_budget = True
+                self.finish(ply)
+        jobs = []
+        while self.queue and len(jobs) < free:
+            jobs.append(self.queue.popleft())
+        self.running += len(jobs)
+        return jobs
+
+    def add_result(self, step: int, pvs: Dict, seconds: float, depth: Optional[int] = None):
+        """Result of a search started by next_jobs (or served from the evaluation cache)."""
+        self.running -= 1
+        self.spent += seconds
+        ply = self.plies[step]
+        ply.depths.append(depth)
+        ply.seconds += seconds
+        pvs = validate_pvs(self.positions[step], pvs)
+        if pvs or not ply.pvs:
+            ply.pvs = pvs # A failed deep search keeps the shallow result
+        if self.deep_planned:
+            self.finish(ply)
+
+    def pop_final(self) -> List[Tuple[int, Optional[Dict]]]:
+        """
+        Positions whose search is over since the last call, with their final engine
+        result; None for book positions, which are never searched (no eval).
+        """
+        final = []
+        while self.finished:
+            ply = self.plies[self.finished.popleft()]
+            final.append((ply.step, None if ply.kind == BOOK else ply.pvs))
+        return final
+
+    def white_cp(self, step: int) -> Optional[int]:
+        """White-centric eval of a position for swing detection, if it has a real one."""
+        ply = self.plies[step]
+        if ply.kind == KNOWN:
+            cp = self.known[step]['cp']
+        elif ply.kind == BOOK or not ply.pvs:
+            return None
+        else:
+            cp = position_entry(self.positions[step], ply.pvs)['cp']
+        return max(-REVIEW_SWING_CLAMP, min(REVIEW_SWING_CLAMP, cp))
+
+    def plan_deep(self):
+        """After the shallow pass: decides each position's category and queues the deep searches."""
+        self.deep_planned = True
+        cps = [self.white_cp(step) for step in range(len(self.plies))]
+        swings = set()
+        for step in range(len(cps) - 1):
+            if cps[step] is not None and cps[step + 1] is not None \
+                    and abs(cps[step + 1] - cps[step]) >= REVIEW_SWING_CP:
+                swings.update((step, step + 1))
+
+        critical, normal = [], []
+        for ply in self.plies:
+            if ply.final or ply.kind == KNOWN:
+                continue
+            if ply.kind == FORCED:
+                self.finish(ply)
+            elif cps[ply.step] is not None and abs(cps[ply.step]) >= REVIEW_DECIDED_CP:
+                ply.kind = DECIDED
+                self.finish(ply)
+            elif ply.step in swings:
+                ply.kind = CRITICAL
+                critical.append((ply.step, self.critical_depth, REVIEW_CRITICAL_TIMEOUT))
+            else:
+                ply.kind = NORMAL
+                normal.append((ply.step, self.depth, REVIEW_TIMEOUT))
+        self.queue.extend(critical)
+        self.queue.extend(normal)
+
+    def summary(self) -> str:
+        """One line: engine time spent against the budget, and plies per kind."""
+        counts: Dict[str, int] = {}
+        for ply in self.plies:
+            kind = ply.kind or NORMAL
+            counts[kind] = counts.get(kind, 0) + 1
+        kinds = ", ".join(f"{count} {kind}" for kind, count in sorted(counts.items()))
+        return f"Engine time {self.spent:.1f} s of {self.game_budget:.0f} s budget ({kinds})"
+
+    def report(self) -> str:
+        """Time spent per ply, as a plain-text table."""
+        lines = [f"{'ply':>4} {'kind':<9} {'depths':<10} {'seconds':>8}"]
+        for ply in self.plies:
+            depths = "/".join("-" if d is None else str(d) for d in ply.depths) or "-"
+            note = " (over budget)" if ply.over_budget else ""
+            lines.append(f"{ply.step:>4} {ply.kind or NORMAL:<9} {depths:<10} {ply.seconds:8.2f}{note}")
+        lines.append(self.summary())
+        return "\n".join(lines)
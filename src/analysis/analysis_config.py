@@ -27,3 +27,19 @@ PIECE_VALUES = {
     5: 9,    # Queen
     6: float('inf') # King
 }
+
+# Theory (book move) source for classification.
+# Path to a Polyglot .bin book, or None to use the named openings in openings.json.
+THEORY_BOOK_PATH = None
+
+# Piece safety (hanging pieces, trapped pieces, danger levels).
+# "see": static exchange evaluation on attack bitboards (see.py).
+# "reference": the wintrchess attacker/defender counting rules, used before "see" became
+# the default. Set it to get the earlier hanging / trapped / brilliant verdicts back.
+# The modes disagree on ~0.4% of pieces (benchmarks/bench_see.py checks each case falls in
+# one of these classes):
+# - attacker in check: the opponent has no legal capture yet, "reference" says safe
+# - pawn defender: "reference" calls any pawn-defended piece safe, even if it loses the exchange
+# - count loses: as many defenders as attackers, but the exchange still loses material
+# - count even: more attackers than defenders, but no capture wins material ("see" says safe)
+PIECE_SAFETY_MODE = "see"
@@ -1,11 +1,17 @@
 # attackers_defenders.py
 import chess
-from typing import List
+from typing import List, Optional
 
 def get_attacking_moves(board: chess.Board, target_square: chess.Square, 
-                       attacking_color: chess.Color, transitive: bool = True) -> List[chess.Square]:
+                       attacking_color: chess.Color, transitive: bool = True,
+                       occupied: Optional[chess.Bitboard] = None) -> List[chess.Square]:
+    # 'occupied' stands in for a board with pieces removed (simulated captures),
+    # so no board copies are needed. Pieces are read from 'board'.
+    if occupied is None:
+        occupied = board.occupied
+    
     # Direct attackers
-    direct_attackers = list(board.attackers(attacking_color, target_square))
+    direct_attackers = list(chess.scan_forward(board.attackers_mask(attacking_color, target_square, occupied) & occupied))
     
     if not transitive:
         return direct_attackers
@@ -20,10 +26,9 @@ def get_attacking_moves(board: chess.Board, target_square: chess.Square,
         if not attacker_piece or attacker_piece.piece_type == chess.KING:
             continue
         
-        temp_board = board.copy()
-        temp_board.remove_piece_at(current_attacker)
-        
-        new_attackers = list(temp_board.attackers(attacking_color, target_square))
+        # Attackers once the current one is out of the way
+        without_attacker = occupied & ~chess.BB_SQUARES[current_attacker]
+        new_attackers = chess.scan_forward(board.attackers_mask(attacking_color, target_square, without_attacker) & without_attacker)
         revealed_attackers = [sq for sq in new_attackers if sq not in all_attackers]
         
         all_attackers.extend(revealed_attackers)
@@ -40,11 +45,9 @@ def get_defending_moves(board: chess.Board, target_square: chess.Square,
     attackers = get_attacking_moves(board, target_square, not defending_color, transitive=False)
     
     if not attackers:
-        # Flip color to find potential defenders
-        temp_board = board.copy()
-        temp_board.remove_piece_at(target_square)
-        temp_board.set_piece_at(target_square, chess.Piece(piece.piece_type, not piece.color))
-        return list(temp_board.attackers(defending_color, target_square))
+        # Potential defenders: the pieces that would attack the square if the
+        # piece there changed colour (attack masks don't depend on the target piece)
+        return list(board.attackers(defending_color, target_square))
     
     # Find smallest recapture set
     smallest_recapture_set = None
@@ -55,13 +58,11 @@ def get_defending_moves(board: chess.Board, target_square: chess.Square,
         if not attacker_piece:
             continue
         
-        # Simulate capture
-        temp_board = board.copy()
-        temp_board.remove_piece_at(target_square)
-        temp_board.set_piece_at(target_square, attacker_piece)
-        temp_board.remove_piece_at(attacker_square)
+        # Simulate capture: the attacker leaves its square for the target square,
+        # which stays occupied
+        occupied = board.occupied & ~chess.BB_SQUARES[attacker_square]
         
-        recapturers = get_attacking_moves(temp_board, target_square, defending_color, transitive)
+        recapturers = get_attacking_moves(board, target_square, defending_color, transitive, occupied)
         
         if len(recapturers) < min_recapturers:
             min_recapturers = len(recapturers)
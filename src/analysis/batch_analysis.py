@@ -0,0 +1,266 @@
+# batch_analysis.py
+# Headless post-game analysis of PGN files (no Qt needed):
+#
+#   python -m src.analysis.batch_analysis games.pgn -o review.jsonl --workers 4 --depth 18
+#
+# Games are streamed from the PGN one at a time (pgn_reader) and reviewed exactly like the
+# GUI's "Analyze Game" (same engine settings, search budget, classifier and accuracy). Output is
+# JSON Lines: one "move" record per ply and one "game" record per game, written
+# as each game finishes (records carry the game's index in the file).
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import shlex
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import chess
+
+from src.analysis.analysis_budget import REVIEW_DEPTH, REVIEW_GAME_BUDGET, AnalysisBudget
+from src.analysis.analysis_context import AnalysisContext
+from src.analysis.game_review import classify_move, game_accuracy, position_entry
+from src.analysis.move_classifier import AdvancedMoveClassifier
+from src.analysis.opening_book import get_opening_trie, get_theory_source
+from src.model.eval_cache import get_eval_cache
+from src.model.game_store import get_game_store
+from src.model.pgn_reader import PgnGame, read_games
+from src.model.uci_client import EngineError, UciClient
+from src.model.uci_protocol import ENGINE_PATH, engine_identity
+
+# Defaults match the GUI's post-game analysis
+BATCH_DEPTH = REVIEW_DEPTH # Depth of normal positions (see analysis_budget)
+BATCH_MULTIPV = 3 # Second line is needed for "Great Move" detection
+BATCH_WORKERS = max(1, (os.cpu_count() or 2) // 2) # Engine processes
+BATCH_ENGINE_OPTIONS = {"Threads": 1, "Hash": 64} # Per engine
+
+class BatchAnalyzer:
+    """Reviews games on one engine process; several run side by side as workers."""
+    def __init__(self, engine: UciClient, engine_id: str, depth: Optional[int], movetime: Optional[int],
+                 use_cache: bool = True, verbose: bool = False, store: bool = False,
+                 game_budget: float = REVIEW_GAME_BUDGET):
+        self.engine = engine
+        self.engine_id = engine_id
+        self.depth = depth
+        self.movetime = movetime
+        self.game_budget = game_budget
+        self.cache = get_eval_cache() if use_cache else None
+        self.verbose = verbose
+        self.store = get_game_store() if store else None
+        self.classifier = AdvancedMoveClassifier()
+
+    async def evaluate(self, board: chess.Board, depth: Optional[int], timeout: float) -> Tuple[Dict, float]:
+        """
+        Engine result for one position, from the evaluation cache when possible.
+        Returns (pvs, engine seconds). 'movetime' caps every search.
+        """
+        # Cached entries are keyed by depth; movetime-only searches always run
+        if self.cache is not None and depth is not None:
+            cached = self.cache.get(board, depth, BATCH_MULTIPV, self.engine_id)
+            if cached:
+                return cached, 0.0
+        started = time.perf_counter()
+        result = await self.engine.search(board.fen(), depth, self.movetime, BATCH_MULTIPV, timeout=timeout)
+        seconds = time.perf_counter() - started
+        if self.cache is not None and result.pvs:
+            self.cache.put(board, BATCH_MULTIPV, result.pvs, self.engine_id)
+        return result.pvs, seconds
+
+    async def review(self, index: int, game: PgnGame) -> List[Dict]:
+        """Output records of one game: its moves, then the game summary."""
+        started = time.perf_counter()
+        board = game.board()
+        start_fen = board.fen()
+        moves = game.moves()
+
+        # Every position of the game, before and after each move
+        positions = [board.copy(stack=False)]
+        sans = []
+        for move in moves:
+            sans.append(board.san(move))
+            board.push(move)
+            positions.append(board.copy(stack=False))
+
+        # Searches one at a time, as deep as the game's budget allows
+        book_line = get_theory_source().walk(moves, start_fen)
+        budget = AnalysisBudget(positions, book_line, game_budget=self.game_budget,
+                                depth=self.depth)
+        entries: List[Optional[Dict]] = [None] * len(positions)
+        while not budget.done():
+            for step, depth, timeout in budget.next_jobs(1):
+                pvs, seconds = await self.evaluate(positions[step], depth, timeout)
+                budget.add_result(step, pvs, seconds, depth)
+            for step, pvs in budget.pop_final():
+                entries[step] = position_entry(positions[step], pvs)
+        if self.verbose:
+            print(budget.report(), file=sys.stderr)
+
+        records = []
+        reviewed = []
+        context = AnalysisContext() # Counters for the game; tables cleared after each move
+        # The classifier prints debug traces; keep them out of the output
+        with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sys.stderr if self.verbose else sink):
+            for ply, move in enumerate(moves):
+                classification = classify_move(
+                    self.classifier, positions[ply], move, entries[ply], entries[ply + 1],
+                    is_book=book_line.is_book(ply), context=context
+                )
+                context.clear()
+                entries[ply]['type'] = classification
+                is_white = positions[ply].turn == chess.WHITE
+                reviewed.append((classification, is_white))
+                records.append({
+                    "type": "move",
+                    "game": index,
+                    "ply": ply,
+                    "color": "white" if is_white else "black",
+                    "san": sans[ply],
+                    "uci": move.uci(),
+                    "classification": classification,
+                    "best_move": entries[ply]['best_move'],
+                    "eval_before": entries[ply]['cp'], # White's perspective; null for book positions
+                    "eval_after": entries[ply + 1]['cp'],
+                    "search": budget.plies[ply].kind, # See analysis_budget
+                    "seconds": round(budget.plies[ply].seconds, 2)
+                })
+
+        if self.verbose:
+            print(context.report(), file=sys.stderr)
+
+        counts, accuracy = game_accuracy(reviewed)
+        headers = game.headers
+        opening = get_opening_trie().walk(moves, start_fen).last_opening
+        if self.store is not None:
+            self.store.save_game(moves, dict(enumerate(entries)), headers, start_fen, opening, accuracy)
+        records.append({
+            "type": "game",
+            "game": index,
+            "event": headers.get("Event", "?"),
+            "white": headers.get("White", "?"),
+            "black": headers.get("Black", "?"),
+            "result": headers.get("Result", "*"),
+            "plies": len(moves),
+            "opening": opening,
+            "accuracy": {side: round(value, 1) for side, value in accuracy.items()},
+            "counts": counts,
+            "engine_seconds": round(budget.spent, 2),
+            "seconds": round(time.perf_counter() - started, 2)
+        })
+        return records
+
+
+async def run_batch(pgn_path: str, output, engine_path, workers: int, depth: Optional[int],
+                    movetime: Optional[int], use_cache: bool = True, verbose: bool = False,
+                    store: bool = False, game_budget: float = REVIEW_GAME_BUDGET) -> int:
+    """Reviews every game of 'pgn_path' with 'workers' engines. Returns the number of games written."""
+    engine_id = engine_identity(engine_path)
+    # Bounded, so a huge PGN is read only as fast as the engines consume it
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    written = 0
+
+    def write(records):
+        nonlocal written
+        for record in records:
+            output.write(json.dumps(record) + "\n")
+        output.flush()
+        written += 1
+
+    async def worker(engine: UciClient):
+        try:
+            analyzer = BatchAnalyzer(engine, engine_id, depth, movetime, use_cache, verbose, store, game_budget)
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                index, game = item
+                try:
+                    records = await analyzer.review(index, game)
+                except EngineError as e:
+                    # Report the game and carry on with a fresh engine
+                    print(f"Game {index}: engine error ({e}), restarting engine", file=sys.stderr)
+                    write([{"type": "game", "game": index, "error": str(e)}])
+                    await engine.quit()
+                    engine = analyzer.engine = UciClient(engine_path, BATCH_ENGINE_OPTIONS)
+                    await engine.start()
+                    continue
+                write(records)
+                summary = records[-1]
+                print(f"Game {index}: {summary['plies']} plies in {summary['seconds']}s", file=sys.stderr)
+        finally:
+            await engine.quit()
+
+    # Start every engine up front: a missing engine fails here, before any game is read
+    engines = [UciClient(engine_path, BATCH_ENGINE_OPTIONS) for _ in range(workers)]
+    try:
+        await asyncio.gather(*(engine.start() for engine in engines))
+    except BaseException:
+        await asyncio.gather(*(engine.quit() for engine in engines), return_exceptions=True)
+        raise
+
+    tasks = [asyncio.create_task(worker(engine)) for engine in engines]
+    try:
+        for item in enumerate(read_games(pgn_path)):
+            # Stop reading if every worker died
+            if all(task.done() for task in tasks):
+                break
+            await queue.put(item)
+        for _ in tasks:
+            await queue.put(None)
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+    return written
+
+def parse_engine(value: str):
+    """An executable path, or a full command line (e.g. "python my_engine.py")."""
+    if os.path.exists(value):
+        return value
+    argv = shlex.split(value)
+    return argv if len(argv) > 1 else value
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.analysis.batch_analysis",
+        description="Classify every move of the games in a PGN file and write the review as JSON Lines."
+    )
+    parser.add_argument("pgn", help="PGN file to analyse")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help=f"engine processes (default: {BATCH_WORKERS})")
+    parser.add_argument("--depth", type=int, help=f"search depth of normal positions (default: {BATCH_DEPTH} unless --movetime is given)")
+    parser.add_argument("--movetime", type=int, help="search time limit per position in milliseconds")
+    parser.add_argument("--budget", type=float, default=REVIEW_GAME_BUDGET,
+                        help=f"engine seconds per game before deep searches stop (default: {REVIEW_GAME_BUDGET:.0f})")
+    parser.add_argument("--engine", default=ENGINE_PATH, help=f"UCI engine executable or command (default: {ENGINE_PATH})")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or fill the evaluation cache")
+    parser.add_argument("--store", action="store_true", help="save reviewed games to the local game store")
+    parser.add_argument("--verbose", action="store_true", help="show classifier traces on stderr")
+    args = parser.parse_args(argv)
+
+    depth = args.depth
+    if depth is None and args.movetime is None:
+        depth = BATCH_DEPTH
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    engine_path = parse_engine(args.engine)
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        count = asyncio.run(run_batch(args.pgn, output, engine_path, args.workers, depth, args.movetime,
+                                      use_cache=not args.no_cache, verbose=args.verbose, store=args.store,
+                                      game_budget=args.budget))
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"Analysed {count} games", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
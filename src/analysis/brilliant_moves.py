@@ -11,7 +11,8 @@ def consider_brilliant_classification(
     board_before: chess.Board,
     move: chess.Move,
     prev_eval: Dict[str, Any],  # WHITE-CENTRIC
-    curr_eval: Dict[str, Any]   # WHITE-CENTRIC
+    curr_eval: Dict[str, Any],  # WHITE-CENTRIC
+    context=None  # AnalysisContext memoizing board queries
 ) -> bool:
     """
     Check if a move is Brilliant (Sacrifice + Good).
@@ -34,11 +35,11 @@ def consider_brilliant_classification(
         return False
     
     # 3. Unsafe Pieces Comparison (Sacrifice Check)
-    prev_unsafe = get_unsafe_pieces(board_before, color)
+    prev_unsafe = get_unsafe_pieces(board_before, color, context=context)
     
-    board_after = board_before.copy()
+    board_after = board_before.copy(stack=False) # The simulations below push/pop on it; no history needed
     board_after.push(move)
-    curr_unsafe = get_unsafe_pieces(board_after, color, move)
+    curr_unsafe = get_unsafe_pieces(board_after, color, move, context=context)
     
     print(f"    BRILLIANT: prev_unsafe={[chess.square_name(sq) for sq in prev_unsafe]}, curr_unsafe={[chess.square_name(sq) for sq in curr_unsafe]}")
     
@@ -50,8 +51,8 @@ def consider_brilliant_classification(
     # 4. Danger Levels (Counter-threats)
     danger_protected = True
     for sq in curr_unsafe:
-        attackers = get_attacking_moves(board_after, sq, color, False)
-        if not has_danger_levels(board_after, sq, attackers):
+        attackers = get_attacking_moves(board_after, sq, color, False, context)
+        if not has_danger_levels(board_after, sq, attackers, context=context):
             danger_protected = False
             break
             
@@ -62,7 +63,7 @@ def consider_brilliant_classification(
     # 5. Trapped Pieces logic
     # Only block brilliant if we're freeing an already-trapped piece (not a real sacrifice)
     # OR if the piece being moved was trapped before (escape, not sacrifice)
-    prev_trapped = [sq for sq in prev_unsafe if is_piece_trapped(board_before, sq)]
+    prev_trapped = [sq for sq in prev_unsafe if is_piece_trapped(board_before, sq, context=context)]
     
     moved_piece_trapped = any(sq == move.from_square for sq in prev_trapped)
     
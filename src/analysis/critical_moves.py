@@ -62,7 +62,8 @@ def consider_critical_classification(
     move: chess.Move,
     prev_eval: Dict[str, Any],  # WHITE-CENTRIC
     curr_eval: Dict[str, Any],  # WHITE-CENTRIC
-    second_best_eval: Optional[Dict[str, Any]]  # WHITE-CENTRIC
+    second_best_eval: Optional[Dict[str, Any]],  # WHITE-CENTRIC
+    context=None  # AnalysisContext memoizing board queries
 ) -> bool:
     """
     Critical = The only good move.
@@ -93,7 +94,7 @@ def consider_critical_classification(
         # Was this piece safe? (Defended)
         # isPieceSafe(board, square, color)
         # Note: TS calls isPieceSafe with `flipPieceColour` because it checks if the CAPTURED piece was safe.
-        if not is_piece_safe(board_before, move.to_square, captured_piece.color):
+        if not is_piece_safe(board_before, move.to_square, captured_piece.color, context=context):
              # It was hanging (unsafe). Taking a hanging piece is not Critical.
              return False
              
@@ -1,10 +1,12 @@
 import chess
-from typing import List
+from typing import List, Optional
 from chess import Square, PieceType
 from src.analysis.attackers import RawMove, get_attacking_moves, flip_color
 from src.analysis.piece_safety import get_unsafe_pieces, get_piece_value
+from src.analysis.mate_search import find_mate_in_one
 
-def relative_unsafe_piece_attacks(action_board: chess.Board, threatened_piece_square: Square, color: chess.Color, played_move: chess.Move = None) -> List[RawMove]:
+def relative_unsafe_piece_attacks(action_board: chess.Board, threatened_piece_square: Square, color: chess.Color, played_move: chess.Move = None,
+                                  mode: Optional[str] = None, context=None) -> List[RawMove]:
     """
     Returns attacking moves of unsafe pieces of 'color' that are higher/equal value to threatened piece.
     """
@@ -12,7 +14,7 @@ def relative_unsafe_piece_attacks(action_board: chess.Board, threatened_piece_sq
     if not threatened_piece: return []
     threat_val = get_piece_value(threatened_piece.piece_type)
     
-    unsafe_sqs = get_unsafe_pieces(action_board, color, played_move)
+    unsafe_sqs = get_unsafe_pieces(action_board, color, played_move, mode, context)
     
     result_moves = []
     for sq in unsafe_sqs:
@@ -90,32 +92,44 @@ def relative_unsafe_piece_attacks(action_board: chess.Board, threatened_piece_sq
             # So: `moveCreatesGreaterThreat` checks if the ACTOR (Opponent) exposes THEMSELVES to greater threats by playing the move.
             # i.e. "If you take my Rook, you hang your Queen." -> Danger Level.
             
-            attacks_on_unsafe = get_attacking_moves(action_board, sq, color, False)
+            attacks_on_unsafe = get_attacking_moves(action_board, sq, color, False, context)
             result_moves.extend(attacks_on_unsafe)
             
     return result_moves
 
-def move_creates_greater_threat(board: chess.Board, threatened_piece_square: Square, acting_move_raw: RawMove) -> bool:
+def move_creates_greater_threat(board: chess.Board, threatened_piece_square: Square, acting_move_raw: RawMove,
+                                mode: Optional[str] = None, context=None) -> bool:
     """
     Checks if 'acting_move_raw' (opponent capture) leads to bad consequences for them (Counter-threat).
+    'mode' selects the piece safety evaluation (see piece_safety.is_piece_safe),
+    'context' (AnalysisContext) memoizes the board queries.
     """
     # acting_move_raw is a move by Opponent.
     # acting_move_raw.color is Opponent.
     
     # 1. Existing threats to Opponent (before they move)
-    prev_attacks = relative_unsafe_piece_attacks(board, threatened_piece_square, acting_move_raw.color)
+    prev_attacks = relative_unsafe_piece_attacks(board, threatened_piece_square, acting_move_raw.color, mode=mode, context=context)
     
-    # 2. Make the move
-    game_board = board.copy()
+    # 2. Make the move (on 'board' itself, taken back before returning)
     move_obj = chess.Move(acting_move_raw.from_square, acting_move_raw.to_square)
     
-    if not game_board.is_legal(move_obj):
+    if not board.is_legal(move_obj):
         return False
         
-    game_board.push(move_obj)
-    
+    # `threatened_piece` is Protag's piece: read it before the acting move captures it
+    threatened_piece = board.piece_at(threatened_piece_square)
+    board.push(move_obj)
+    try:
+        return _threat_after_move(board, threatened_piece_square, threatened_piece, acting_move_raw.color,
+                                  prev_attacks, mode, context)
+    finally:
+        board.pop()
+
+def _threat_after_move(game_board: chess.Board, threatened_piece_square: Square, threatened_piece: Optional[chess.Piece],
+                       acting_color: chess.Color, prev_attacks: List[RawMove], mode: Optional[str], context) -> bool:
+    """Steps 3-5 of move_creates_greater_threat, on the board after the acting move."""
     # 3. New threats to Opponent (after they move)
-    curr_attacks = relative_unsafe_piece_attacks(game_board, threatened_piece_square, acting_move_raw.color)
+    curr_attacks = relative_unsafe_piece_attacks(game_board, threatened_piece_square, acting_color, mode=mode, context=context)
     
     # 4. Check if new threats exist that weren't there before
     # Simple diff: compare sets or lists
@@ -129,28 +143,22 @@ def move_creates_greater_threat(board: chess.Board, threatened_piece_square: Squ
     if new_threats:
         return True
         
-    # Check simple mate threats (low value sacrifice for mate)
+    # 5. Check simple mate threats (low value sacrifice for mate)
     # If the piece we (Protag) are losing is cheap, and opponent (Antag) gets mated...
-    # `threatened_piece` is Protag's piece.
-    # `acting_move` captures it.
-    
-    threatened_piece = board.piece_at(threatened_piece_square)
+    # `acting_move` captures `threatened_piece`.
     if not threatened_piece: return False
     
     if get_piece_value(threatened_piece.piece_type) < get_piece_value(chess.QUEEN):
         # check for mate in moves (next turn moves for Protag)
         # game_board turn is now Protag.
-        for m in game_board.legal_moves:
-             game_board.push(m)
-             if game_board.is_checkmate():
-                 game_board.pop()
-                 return True
-             game_board.pop()
+        if find_mate_in_one(game_board) is not None:
+            return True
              
     return False
 
-def has_danger_levels(board: chess.Board, threatened_piece_square: Square, acting_moves: List[RawMove]) -> bool:
+def has_danger_levels(board: chess.Board, threatened_piece_square: Square, acting_moves: List[RawMove],
+                      mode: Optional[str] = None, context=None) -> bool:
     """
     For every way the opponent can take my piece, do they suffer a greater counter-threat?
     """
-    return all(move_creates_greater_threat(board, threatened_piece_square, am) for am in acting_moves)
+    return all(move_creates_greater_threat(board, threatened_piece_square, am, mode, context) for am in acting_moves)
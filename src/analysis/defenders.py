@@ -3,13 +3,24 @@ from typing import List, Optional, Any
 from chess import Square, PieceType
 from src.analysis.attackers import get_attacking_moves, RawMove, flip_color, get_turn_fen
 
-def get_defending_moves(board: chess.Board, piece_square: Square, piece_color: chess.Color, transitive: bool = True) -> List[RawMove]:
+def get_defending_moves(board: chess.Board, piece_square: Square, piece_color: chess.Color, transitive: bool = True,
+                        context=None) -> List[RawMove]:
     """
     Get moves that defend a piece.
     Matches wintrchess/shared/src/lib/reporter/utils/defenders.ts
+    'context' (AnalysisContext) memoizes the result per position.
     """
-    # 1. Create defender board (copy of current)
-    defender_board = board.copy()
+    if context is not None:
+        key = (context.position_key(board), piece_square, piece_color, transitive)
+        defending_moves = context.get("defenders", key)
+        if defending_moves is None:
+            defending_moves = get_defending_moves(board, piece_square, piece_color, transitive)
+            context.put("defenders", key, defending_moves)
+        return list(defending_moves)
+    
+    # 1. The simulations below play on 'board' itself (push/pop, pieces put back),
+    # leaving it as it was on return instead of copying it with its move stack
+    defender_board = board
     
     # 2. Get attackers on the piece
     attacking_moves = get_attacking_moves(defender_board, piece_square, piece_color, transitive=False)
@@ -30,35 +41,39 @@ def get_defending_moves(board: chess.Board, piece_square: Square, piece_color: c
         for am in attacking_moves:
             # Create board where attacker HAS captured
             # We need to simulate the move 'am'.
-            capture_board = defender_board.copy()
+            capture_board = defender_board
             
             # The attacking move is 'am'. We need to make it on capture_board.
             # But 'capture_board' turn matches 'defender_board' (which is whatever passed in).
             # Attacking move is by 'am.color'.
             # We must force turn to am.color to make the move legally (or pseudo).
+            turn = capture_board.turn
             capture_board.turn = am.color # Force turn
-            
-            # Construct chess.Move
-            move_obj = chess.Move(am.from_square, am.to_square)
-            
-            if capture_board.is_legal(move_obj):
-                capture_board.push(move_obj)
-            else:
-                # If illegal (e.g. pinned), this attacker actually can't capture.
-                # TS: try { captureBoard.move(...) } catch { return }
-                continue
+            try:
+                # Construct chess.Move
+                move_obj = chess.Move(am.from_square, am.to_square)
                 
-            # Now we want "Recaptures" targeting the square (am.to_square).
-            # The piece there is now the Attacker.
-            # We want 'attacking_moves' on THIS new piece/square.
-            # "getAttackingMoves(captureBoard, {type: am.piece, color: am.color, square: am.to}, transitive)"
-            
-            recapturers = get_attacking_moves(
-                capture_board, 
-                am.to_square, 
-                am.color, 
-                transitive
-            )
+                if not capture_board.is_legal(move_obj):
+                    # If illegal (e.g. pinned), this attacker actually can't capture.
+                    # TS: try { captureBoard.move(...) } catch { return }
+                    continue
+                    
+                # Now we want "Recaptures" targeting the square (am.to_square).
+                # The piece there is now the Attacker.
+                # We want 'attacking_moves' on THIS new piece/square.
+                # "getAttackingMoves(captureBoard, {type: am.piece, color: am.color, square: am.to}, transitive)"
+                capture_board.push(move_obj)
+                try:
+                    recapturers = get_attacking_moves(
+                        capture_board, 
+                        am.to_square, 
+                        am.color, 
+                        transitive
+                    )
+                finally:
+                    capture_board.pop()
+            finally:
+                capture_board.turn = turn
             
             if len(recapturers) < min_len:
                 min_len = len(recapturers)
@@ -73,11 +88,15 @@ def get_defending_moves(board: chess.Board, piece_square: Square, piece_color: c
         
         # We need to manually place a piece of opposite color at 'piece_square'.
         flipped_color = flip_color(piece_color)
-        piece_type = defender_board.piece_at(piece_square).piece_type
-        
-        defender_board.remove_piece_at(piece_square) # Remove original
-        defender_board.set_piece_at(piece_square, chess.Piece(piece_type, flipped_color)) # Place flipped
+        piece = defender_board.piece_at(piece_square)
+        promoted = bool(defender_board.promoted & chess.BB_SQUARES[piece_square])
         
-        # Now get attackers on this flipped piece
-        # "getAttackingMoves(defenderBoard, flippedPiece, transitive)"
-        return get_attacking_moves(defender_board, piece_square, flipped_color, transitive)
+        # chess.Board.set_piece_at would clear the move stack: use the BaseBoard
+        # version, which only changes the piece placement
+        chess.BaseBoard.set_piece_at(defender_board, piece_square, chess.Piece(piece.piece_type, flipped_color)) # Place flipped
+        try:
+            # Now get attackers on this flipped piece
+            # "getAttackingMoves(defenderBoard, flippedPiece, transitive)"
+            return get_attacking_moves(defender_board, piece_square, flipped_color, transitive)
+        finally:
+            chess.BaseBoard.set_piece_at(defender_board, piece_square, piece, promoted) # Put the original back
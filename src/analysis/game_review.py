@@ -0,0 +1,122 @@
+# game_review.py
+# Post-game review steps shared by the GUI (GameController) and the batch CLI (batch_analysis).
+# Qt-free: turns engine results into stored evals, classifications and accuracy.
+
+from typing import Dict, Iterable, Optional, Tuple
+import chess
+from src.analysis.analysis_context import AnalysisContext
+from src.analysis.move_classifier import AdvancedMoveClassifier
+from src.model.uci_protocol import InfoRecord
+
+MATE_CP = 30000 # Centipawn value of a mate on the board
+
+# Accuracy of a move from its classification label.
+# Robust and consistent with the labels, without fragile CP math.
+CLASSIFICATION_ACCURACY = {
+    'brilliant': 100, 'great': 100, 'best': 100, 'book': 100,
+    'excellent': 98, 'good': 90, 'inaccuracy': 60, 'mistake': 30, 'blunder': 0, 'forced': 100
+}
+DEFAULT_ACCURACY = 90
+
+def validate_pvs(board: chess.Board, pvs: Dict) -> Dict:
+    """Returns 'pvs', or {} if its best move is illegal on 'board' (stale or garbled result)."""
+    if pvs and 1 in pvs:
+        best_move_uci = pvs[1].pv_move
+        if best_move_uci:
+            try:
+                move = chess.Move.from_uci(best_move_uci)
+            except ValueError:
+                return pvs
+            if move not in board.legal_moves:
+                return {}
+    return pvs
+
+def terminal_pvs(board: chess.Board) -> Dict:
+    """
+    Simulated engine result for a finished game: the engine might give weird
+    results or just "mate 0", so the score is set explicitly.
+    Side to move is mated -> -MATE_CP, stalemate/draw -> 0.
+    """
+    return {1: InfoRecord(cp=-MATE_CP if board.is_checkmate() else 0)}
+
+def position_entry(board: chess.Board, pvs: Optional[Dict]) -> Dict:
+    """
+    Stored evaluation of one position from its (validated) engine result.
+    'cp' is ALWAYS from White's perspective; 'second_best_cp' stays raw side-to-move.
+    pvs None: a book position, never searched -> 'cp' None (no eval, not a 0.00).
+    """
+    best_move_uci = ""
+    cp = 0
+    second_best_cp = None
+    if pvs is None:
+        cp = None
+    elif 1 in pvs:
+        info = pvs[1]
+        if info.mate is not None:
+            m = info.mate
+            # Normalized Mate Score (High value) - preserve sign
+            if m > 0: cp = MATE_CP - (m * 100)
+            else: cp = -MATE_CP - (m * 100)
+        else:
+            cp = info.cp
+        best_move_uci = info.pv_move
+
+    # Second Best (for Great Move detection)
+    if pvs and 2 in pvs and pvs[2].mate is None:
+        second_best_cp = pvs[2].cp
+
+    is_white_turn = board.turn == chess.WHITE
+    return {
+        'cp': cp if is_white_turn or cp is None else -cp,
+        'best_move': best_move_uci,
+        'second_best_cp': second_best_cp,
+        'is_white_turn': is_white_turn,
+        'type': 'pending'
+    }
+
+def classify_move(classifier: AdvancedMoveClassifier, board_before: chess.Board, move: chess.Move,
+                  before: Dict, after: Dict, is_book: Optional[bool] = None,
+                  context: Optional[AnalysisContext] = None) -> str:
+    """
+    Classifies 'move' from the stored entries of the positions before and after it.
+    The classifier expects WHITE-CENTRIC evals and handles perspective internally.
+    'context' memoizes board queries across calls (one per game review).
+    """
+    played_uci = move.uci()
+    # A book position has no eval ('cp' None); the moves around it are book,
+    # classified BOOK (or FORCED) before the classifier reads any eval
+    top_moves = {
+        1: {'pv_move': before['best_move'], 'cp': int(before['cp'] or 0)}
+    }
+
+    # second_best_cp is side-to-move, convert to white-centric
+    if before.get('second_best_cp') is not None:
+        second_cp = before['second_best_cp']
+        if board_before.turn == chess.BLACK:
+            second_cp = -second_cp
+        top_moves[2] = {'cp': int(second_cp)}
+
+    # Played move as a "fake" rank, scored by the position it leads to
+    if played_uci != before['best_move']:
+        top_moves[99] = {'pv_move': played_uci, 'cp': int(after['cp'] or 0)}
+
+    return classifier.classify_move(board_before, move, top_moves, is_book=is_book, context=context)
+
+def game_accuracy(moves: Iterable[Tuple[str, bool]]) -> Tuple[Dict[str, int], Dict[str, float]]:
+    """
+    Classification counts and per-side accuracy from (classification, is_white_move) pairs.
+    Returns (counts, {'white': %, 'black': %}).
+    """
+    counts: Dict[str, int] = {}
+    sums = {True: 0, False: 0}
+    totals = {True: 0, False: 0}
+    for classification, is_white in moves:
+        counts[classification] = counts.get(classification, 0) + 1
+        sums[is_white] += CLASSIFICATION_ACCURACY.get(classification, DEFAULT_ACCURACY)
+        totals[is_white] += 1
+
+    accuracy = {
+        'white': (sums[True] / totals[True]) if totals[True] > 0 else 0,
+        'black': (sums[False] / totals[False]) if totals[False] > 0 else 0
+    }
+    return counts, accuracy
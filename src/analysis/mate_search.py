@@ -0,0 +1,91 @@
+# mate_search.py
+# Mate-in-one search, for the danger-level mate check and any tactics feature.
+#
+# Mate needs check, so only moves that can give check are played: moves onto
+# a square from which the piece attacks the enemy king, moves of a piece
+# standing between one of our sliders and that king (discovered check),
+# promotions, en passant and castling. Each is then proven with the legal
+# replies, which python-chess generates as check evasions only.
+
+from typing import Iterator, Optional
+
+import chess
+from chess import Square, PieceType
+
+def check_squares(board: chess.Board, piece_type: PieceType, king: Square) -> chess.Bitboard:
+    """Squares from which a 'piece_type' of the side to move would attack the enemy 'king'."""
+    occupied = board.occupied
+    if piece_type == chess.PAWN:
+        # Our pawns attack the king from where an enemy pawn on the king square attacks
+        return chess.BB_PAWN_ATTACKS[not board.turn][king]
+    if piece_type == chess.KNIGHT:
+        return chess.BB_KNIGHT_ATTACKS[king]
+    diagonal = chess.BB_DIAG_ATTACKS[king][chess.BB_DIAG_MASKS[king] & occupied]
+    straight = (chess.BB_RANK_ATTACKS[king][chess.BB_RANK_MASKS[king] & occupied] |
+                chess.BB_FILE_ATTACKS[king][chess.BB_FILE_MASKS[king] & occupied])
+    if piece_type == chess.BISHOP:
+        return diagonal
+    if piece_type == chess.ROOK:
+        return straight
+    if piece_type == chess.QUEEN:
+        return diagonal | straight
+    return chess.BB_EMPTY # The king only gives discovered checks
+
+def discovered_check_blockers(board: chess.Board, king: Square) -> chess.Bitboard:
+    """Pieces of the side to move that are alone between one of its sliders and the enemy 'king'."""
+    us = board.occupied_co[board.turn]
+    # Our sliders seeing the king on an empty board
+    snipers = ((chess.BB_DIAG_ATTACKS[king][0] & (board.bishops | board.queens)) |
+               (chess.BB_RANK_ATTACKS[king][0] & (board.rooks | board.queens)) |
+               (chess.BB_FILE_ATTACKS[king][0] & (board.rooks | board.queens))) & us
+    blockers = chess.BB_EMPTY
+    for sniper in chess.scan_forward(snipers):
+        between = chess.between(sniper, king) & board.occupied
+        if chess.popcount(between) == 1:
+            blockers |= between & us
+    return blockers
+
+def checking_move_candidates(board: chess.Board) -> Iterator[chess.Move]:
+    """
+    Legal moves of the side to move that may give check: every checking move is
+    among them, along with a few that don't (a discovering piece staying on the
+    line, promotions, en passant, castling). A move may be yielded twice.
+    """
+    king = board.king(not board.turn)
+    if king is None:
+        return
+    us = board.occupied_co[board.turn]
+    blockers = discovered_check_blockers(board, king)
+    # Promotions check as the new piece, so all of them are tried
+    promoting = board.pawns & us & (chess.BB_RANK_7 if board.turn == chess.WHITE else chess.BB_RANK_2)
+
+    # Pseudo-legal generation per group, legality checked on the few moves it
+    # yields: cheaper than generate_legal_moves, which works out pins and
+    # checkers again on every call
+    groups = [(blockers, chess.BB_ALL), (promoting & ~blockers, chess.BB_ALL)]
+    for piece_type in (chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN):
+        from_mask = board.pieces_mask(piece_type, board.turn) & ~blockers & ~promoting
+        if from_mask:
+            groups.append((from_mask, check_squares(board, piece_type, king)))
+    if board.ep_square is not None:
+        # Removing the captured pawn may open a line to the king
+        groups.append((board.pawns & us, chess.BB_SQUARES[board.ep_square]))
+    for from_mask, to_mask in groups:
+        if from_mask and to_mask:
+            for move in board.generate_pseudo_legal_moves(from_mask, to_mask):
+                if not board.is_castling(move) and not board.is_into_check(move):
+                    yield move
+    if board.has_castling_rights(board.turn):
+        yield from board.generate_castling_moves()
+
+def find_mate_in_one(board: chess.Board) -> Optional[chess.Move]:
+    """A move of the side to move that checkmates at once, or None. 'board' is left as it was."""
+    for move in checking_move_candidates(board):
+        board.push(move)
+        try:
+            # In check, the legal replies are generated as evasions only
+            if board.is_checkmate():
+                return move
+        finally:
+            board.pop()
+    return None
@@ -1,20 +1,30 @@
 import chess
 from typing import Dict, Any, List, Optional
 from src.analysis.analysis_config import CLASSIFICATION_THRESHOLDS, Classification
+from src.analysis.analysis_context import AnalysisContext
 from src.analysis.expected_points import get_expected_points_loss
-from src.analysis.opening_book import get_opening_name
+from src.analysis.opening_book import get_theory_source
 from src.analysis.brilliant_moves import consider_brilliant_classification
 from src.analysis.critical_moves import consider_critical_classification
 
 class AdvancedMoveClassifier:
-    def __init__(self):
-        pass
+    def __init__(self, theory_source=None):
+        # Theory backend (see opening_book); None uses the shared theory source
+        self.theory_source = theory_source
 
     def classify_move(self, board_before: chess.Board, move: chess.Move, 
-                     top_moves: Dict[int, Any]) -> str:
+                     top_moves: Dict[int, Any], is_book: Optional[bool] = None,
+                     context: Optional[AnalysisContext] = None) -> str:
         """
         Classify move using wintrchess logic.
+        is_book: precomputed theory answer (e.g. BookLine.is_book(ply)).
+                 If None, the theory source is asked about this move.
+        context: memo of board queries, e.g. shared by every move of a game.
+                 If None, a fresh one is used for this move.
         """
+        if context is None:
+            context = AnalysisContext()
+        
         # Data preparation
         best_eval_info = top_moves.get(1)
         if not best_eval_info:
@@ -50,9 +60,12 @@ class AdvancedMoveClassifier:
         # 2. Theory (Book) Check
         # TS: if (opts.includeTheory && getOpeningName(current.fen)) -> THEORY
         # We check if the resulting position is a known opening.
-        board_after = board_before.copy()
+        board_after = board_before.copy(stack=False) # The simulations below push/pop on it; no history needed
         board_after.push(move)
-        if get_opening_name(board_after.fen()):
+        if is_book is None:
+            theory = self.theory_source or get_theory_source()
+            is_book = theory.is_theory(board_before, move)
+        if is_book:
              return Classification.BOOK
              
         # 3. Checkmate (Best) Check
@@ -81,7 +94,7 @@ class AdvancedMoveClassifier:
             print(f"  DEBUG Critical: second_best_info={second_best_info}, second_eval={second_eval}")
             
             is_critical = consider_critical_classification(
-                board_before, move, prev_eval, curr_eval, second_eval
+                board_before, move, prev_eval, curr_eval, second_eval, context
             )
             print(f"  DEBUG Critical: is_critical={is_critical}")
             if is_critical:
@@ -94,7 +107,7 @@ class AdvancedMoveClassifier:
         
         if classification in [Classification.BEST, Classification.CRITICAL]:
             print(f"  DEBUG Brilliant: Checking for classification={classification}")
-            is_brilliant = consider_brilliant_classification(board_before, move, prev_eval, curr_eval)
+            is_brilliant = consider_brilliant_classification(board_before, move, prev_eval, curr_eval, context)
             print(f"  DEBUG Brilliant: is_brilliant={is_brilliant}")
             if is_brilliant:
                  return Classification.BRILLIANT
@@ -1,34 +1,374 @@
+import hashlib
 import json
+import mmap
 import os
-from typing import Optional, Dict
+import struct
+import sys
+import threading
+from typing import Optional, Dict, List, Sequence
+
+import chess
+import chess.polyglot
+
+# Construct path to resources/openings.json from src/analysis/opening_book.py
+# src/analysis/../resources/openings.json
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OPENINGS_PATH = os.path.join(BASE_DIR, "resources", "openings.json")
+# Compiled form of openings.json, produced by `python -m src.analysis.opening_book build`
+OPENINGS_BIN_PATH = os.path.join(BASE_DIR, "resources", "openings.bin")
+
+# Binary layout (little endian):
+#   header: magic, version, entry count
+#   entries: (placement hash, name offset, name length), sorted by hash
+#   name table: UTF-8 names, offsets relative to the start of the table
+BIN_MAGIC = b"OPBK"
+BIN_VERSION = 1
+BIN_HEADER = struct.Struct("<4sII")
+BIN_ENTRY = struct.Struct("<QII")
+
+# A game is considered out of book after this many consecutive unnamed plies.
+# Named lines in openings.json often skip intermediate positions, so a strict
+# "next position must be named" rule would drop most deep variations.
+MAX_BOOK_GAP = 8
+# Hard bound on OpeningTrie nodes; past it, walks still work but stop growing the trie
+OPENING_TRIE_MAX_NODES = 50000
+
+def placement_hash(placement: str) -> int:
+    """Stable 64-bit key for a piece placement string (same in every process)."""
+    return int.from_bytes(hashlib.blake2b(placement.encode('ascii'), digest_size=8).digest(), 'little')
+
+
+class OpeningIndex:
+    """
+    In-memory opening table: piece placement (first FEN field) -> opening name.
+    """
+    def __init__(self, path: str = OPENINGS_PATH):
+        self.path = path
+        self.openings: Dict[str, str] = {}
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.openings = json.load(f)
+        except FileNotFoundError:
+            pass
+        except json.JSONDecodeError:
+            pass
+
+    def get(self, placement: str) -> Optional[str]:
+        return self.openings.get(placement)
+
+    def __len__(self):
+        return len(self.openings)
+
+
+class BinaryOpeningIndex:
+    """
+    Memory-mapped view of a compiled openings.bin.
+    Lookups binary-search the mapped entry table, so no per-opening Python objects
+    are created and the pages are shared between every process mapping the file.
+    """
+    def __init__(self, path: str = OPENINGS_BIN_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.count = BIN_HEADER.unpack_from(self.data, 0)
+        if magic != BIN_MAGIC or version != BIN_VERSION:
+            self.data.close()
+            raise ValueError(f"Not a compiled opening book: {path}")
+
+        self.names_start = BIN_HEADER.size + self.count * BIN_ENTRY.size
+
+    def get(self, placement: str) -> Optional[str]:
+        key = placement_hash(placement)
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry_key, offset, length = BIN_ENTRY.unpack_from(self.data, BIN_HEADER.size + mid * BIN_ENTRY.size)
+            if entry_key < key:
+                lo = mid + 1
+            elif entry_key > key:
+                hi = mid
+            else:
+                start = self.names_start + offset
+                return self.data[start:start + length].decode('utf-8')
+        return None
+
+    def __len__(self):
+        return self.count
+
+
+def compile_opening_book(json_path: str = OPENINGS_PATH, bin_path: str = OPENINGS_BIN_PATH) -> int:
+    """
+    Build step: compiles openings.json into the sorted, hash-keyed binary format
+    read by BinaryOpeningIndex. Returns the number of entries written.
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        openings: Dict[str, str] = json.load(f)
+
+    entries = []
+    names = bytearray()
+    for placement, name in openings.items():
+        encoded = name.encode('utf-8')
+        entries.append((placement_hash(placement), len(names), len(encoded)))
+        names += encoded
+    entries.sort()
+
+    for (key_a, _, _), (key_b, _, _) in zip(entries, entries[1:]):
+        if key_a == key_b:
+            raise ValueError(f"Placement hash collision (0x{key_a:016x}) in {json_path}")
+
+    # Write to a temp file and swap it in, so running processes keep their old mapping
+    tmp_path = bin_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(BIN_HEADER.pack(BIN_MAGIC, BIN_VERSION, len(entries)))
+        for entry in entries:
+            f.write(BIN_ENTRY.pack(*entry))
+        f.write(names)
+    os.replace(tmp_path, bin_path)
+
+    return len(entries)
+
+def load_opening_index():
+    """
+    Opens the compiled book when it is present and up to date,
+    otherwise falls back to parsing openings.json.
+    """
+    try:
+        if os.path.getmtime(OPENINGS_BIN_PATH) >= os.path.getmtime(OPENINGS_PATH):
+            return BinaryOpeningIndex(OPENINGS_BIN_PATH)
+    except (OSError, ValueError):
+        pass
+    return OpeningIndex(OPENINGS_PATH)
+
+
+# Process-wide index, loaded on first lookup and shared by every caller
+_index: Optional[OpeningIndex] = None
+_index_lock = threading.Lock()
+
+def get_opening_index():
+    """Returns the shared opening index, loading it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_opening_index()
+    return _index
+
+class OpeningTrieNode:
+    __slots__ = ("name", "children")
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name
+        self.children: Dict[chess.Move, "OpeningTrieNode"] = {}
+
+
+class BookLine:
+    """
+    Result of walking one game through a theory source.
+    names[i] is the opening name of the position after move i (or None),
+    book[i] whether move i is theory (defaults to "has a name").
+    Plies at or beyond book_depth are out of book without any lookup.
+    """
+    def __init__(self, names: List[Optional[str]], book: Optional[List[bool]] = None):
+        self.names = names
+        self.book = book if book is not None else [name is not None for name in names]
+        self.book_depth = 0
+        self.last_opening: Optional[str] = None
+        for ply, in_book in enumerate(self.book):
+            if in_book:
+                self.book_depth = ply + 1
+        for name in names:
+            if name:
+                self.last_opening = name
+
+    def is_book(self, ply: int) -> bool:
+        """True if move 'ply' (0-based) is theory."""
+        return ply < self.book_depth and self.book[ply]
+
+    def opening_at(self, ply: int) -> Optional[str]:
+        return self.names[ply] if ply < self.book_depth else None
+
+
+class OpeningTrie:
+    """
+    Move-sequence trie over the opening index, grown lazily from the games walked.
+    Known move prefixes are answered from the trie without generating FENs; unknown
+    moves fall back to a position lookup (which also catches transpositions).
+    Only move sequences that reach a named position are kept, so the trie doesn't
+    grow with the out-of-book moves of every game walked (batch imports).
+    """
+    def __init__(self, index, max_nodes: int = OPENING_TRIE_MAX_NODES):
+        self.index = index
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.roots: Dict[str, OpeningTrieNode] = {}
+        self.lock = threading.Lock()
+
+    def walk(self, moves: Sequence[chess.Move], start_fen: str = chess.STARTING_FEN) -> BookLine:
+        names: List[Optional[str]] = []
+        board = chess.Board(start_fen)
+        applied = 0 # Moves pushed onto 'board' so far (only needed on trie misses)
+        gap = 0
+
+        with self.lock:
+            # New nodes stay detached until the walk reaches a named position:
+            # (dict to link the first one into, its key, first node, nodes created)
+            detached = None
+            node = self.roots.get(start_fen)
+            if node is None:
+                node = OpeningTrieNode(self.index.get(board.board_fen()))
+                detached = (self.roots, start_fen, node, 1)
+                if node.name:
+                    self.attach(*detached)
+                    detached = None
+
+            for ply, move in enumerate(moves):
+                child = node.children.get(move)
+                if child is None:
+                    # Trie miss: catch the board up and look the position up
+                    while applied <= ply:
+                        board.push(moves[applied])
+                        applied += 1
+                    child = OpeningTrieNode(self.index.get(board.board_fen()))
+                    if detached is None:
+                        detached = (node.children, move, child, 1)
+                    else:
+                        node.children[move] = child
+                        detached = detached[:3] + (detached[3] + 1,)
+
+                if child.name and detached is not None:
+                    self.attach(*detached)
+                    detached = None
+
+                names.append(child.name)
+                node = child
+
+                gap = 0 if child.name else gap + 1
+                if gap > MAX_BOOK_GAP:
+                    break
+
+        return BookLine(names)
+
+    def attach(self, children: Dict, key, node: OpeningTrieNode, count: int):
+        # Links a detached chain of 'count' new nodes into the trie (caller holds the lock)
+        if self.nodes + count <= self.max_nodes:
+            children[key] = node
+            self.nodes += count
+
+    def is_theory(self, board: chess.Board, move: chess.Move) -> bool:
+        """True if playing 'move' on 'board' reaches a named opening position."""
+        board_after = board.copy(stack=False)
+        board_after.push(move)
+        return self.index.get(board_after.board_fen()) is not None
+
+
+class PolyglotBook:
+    """
+    Theory source backed by a Polyglot .bin book.
+    The book is memory-mapped and binary-searched on the Zobrist key by
+    chess.polyglot, so even large books are never loaded into Python dicts.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.reader = chess.polyglot.open_reader(path)
+
+    def weights(self, board: chess.Board) -> Dict[chess.Move, int]:
+        """Book moves for the position and their Polyglot weights."""
+        return {entry.move: entry.weight for entry in self.reader.find_all(board)}
+
+    def is_theory(self, board: chess.Board, move: chess.Move) -> bool:
+        return any(entry.move == move for entry in self.reader.find_all(board))
+
+    def walk(self, moves: Sequence[chess.Move], start_fen: str = chess.STARTING_FEN) -> BookLine:
+        # Polyglot books are move trees: the first move missing from the book ends theory
+        board = chess.Board(start_fen)
+        book: List[bool] = []
+        for move in moves:
+            if not self.is_theory(board, move):
+                break
+            book.append(True)
+            board.push(move)
+        return BookLine([None] * len(book), book)
+
+    def close(self):
+        self.reader.close()
+
+
+# Process-wide trie, rebuilt together with the index
+_trie: Optional[OpeningTrie] = None
+
+def get_opening_trie() -> OpeningTrie:
+    """Returns the shared opening trie, bound to the current opening index."""
+    global _trie
+    index = get_opening_index()
+    if _trie is None or _trie.index is not index:
+        with _index_lock:
+            if _trie is None or _trie.index is not index:
+                _trie = OpeningTrie(index)
+    return _trie
+
+# Pluggable theory source used to classify book moves.
+# Any object with walk(moves, start_fen) -> BookLine and is_theory(board, move) -> bool.
+_theory_source = None
+
+def set_theory_source(source) -> None:
+    """Installs a theory source (e.g. PolyglotBook); None restores the named-opening trie."""
+    global _theory_source
+    _theory_source = source
+
+def get_theory_source():
+    """
+    Returns the installed theory source. A Polyglot book configured through
+    analysis_config.THEORY_BOOK_PATH is opened on first use, otherwise the
+    named-opening trie is used.
+    """
+    global _theory_source
+    if _theory_source is None:
+        from src.analysis.analysis_config import THEORY_BOOK_PATH
+        if THEORY_BOOK_PATH:
+            with _index_lock:
+                if _theory_source is None:
+                    _theory_source = PolyglotBook(THEORY_BOOK_PATH)
+        else:
+            return get_opening_trie()
+    return _theory_source
+
+def reload_openings(path: Optional[str] = None):
+    """
+    Rebuilds the shared opening index from disk (e.g. after openings.json changed).
+    'path' may point at either a JSON table or a compiled .bin book.
+    """
+    global _index
+    with _index_lock:
+        if path is None:
+            _index = load_opening_index()
+        elif path.endswith(".bin"):
+            _index = BinaryOpeningIndex(path)
+        else:
+            _index = OpeningIndex(path)
+    return _index
 
 def get_opening_name(fen: str) -> Optional[str]:
     """
     Get the opening name for a given FEN string from the openings database.
     Matches logic from wintrchess/shared/src/lib/reporter/utils/opening.ts
     """
-    # Load openings database
-    # Assuming openings.json is in src/resources/openings.json relative to project root
-    # or relative to this file? Let's try relative to this file for robustness if possible,
-    # or absolute path based on project structure.
-    
-    # Construct path to resources/openings.json from src/analysis/opening_book.py
-    # src/analysis/../resources/openings.json
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    resource_path = os.path.join(base_dir, "resources", "openings.json")
-    
-    try:
-        with open(resource_path, 'r', encoding='utf-8') as f:
-            openings_db: Dict[str, str] = json.load(f)
-    except FileNotFoundError:
-        return None
-    except json.JSONDecodeError:
-        return None
-
     # Extract piece placement part of FEN (first field)
     fen_pieces = fen.split(" ")[0]
-    
+
     if not fen_pieces:
         return None
-        
-    return openings_db.get(fen_pieces)
+
+    return get_opening_index().get(fen_pieces)
+
+
+if __name__ == "__main__":
+    # python -m src.analysis.opening_book build [openings.json] [openings.bin]
+    if len(sys.argv) >= 2 and sys.argv[1] == "build":
+        json_path = sys.argv[2] if len(sys.argv) > 2 else OPENINGS_PATH
+        bin_path = sys.argv[3] if len(sys.argv) > 3 else OPENINGS_BIN_PATH
+        count = compile_opening_book(json_path, bin_path)
+        print(f"Wrote {count} openings to {bin_path}")
+    else:
+        print("Usage: python -m src.analysis.opening_book build [openings.json] [openings.bin]")
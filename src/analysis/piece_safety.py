@@ -3,7 +3,9 @@ from chess import Square, PieceType
 from typing import List, Optional
 from src.analysis.attackers import get_attacking_moves, RawMove
 from src.analysis.defenders import get_defending_moves
+from src.analysis import analysis_config
 from src.analysis.analysis_config import PIECE_VALUES
+from src.analysis.see import static_exchange
 
 def get_piece_value(piece_type: PieceType) -> int:
     return PIECE_VALUES.get(piece_type, 0)
@@ -22,15 +24,32 @@ def to_board_piece(board: chess.Board, square: Square) -> Optional[BoardPiece]:
     if not p: return None
     return BoardPiece(p.piece_type, p.color, square)
 
-def is_piece_safe(board: chess.Board, square: Square, piece_color: chess.Color, played_move: Optional[chess.Move] = None) -> bool:
+def is_piece_safe(board: chess.Board, square: Square, piece_color: chess.Color, played_move: Optional[chess.Move] = None,
+                  mode: Optional[str] = None, context=None) -> bool:
     """
     Check if a piece at a square is safe.
-    Matches wintrchess pieceSafety.ts
+    mode "see": the opponent wins no material by capturing on the square (static exchange).
+    mode "reference": matches wintrchess pieceSafety.ts.
+    Default: analysis_config.PIECE_SAFETY_MODE.
+    'context' (AnalysisContext) memoizes the result per position.
     """
+    mode = mode or analysis_config.PIECE_SAFETY_MODE
+    if context is not None:
+        # 'played_move' is not part of the key: it does not change the result
+        key = (context.position_key(board), square, piece_color, mode)
+        safe = context.get("safety", key)
+        if safe is None:
+            safe = is_piece_safe(board, square, piece_color, played_move, mode)
+            context.put("safety", key, safe)
+        return safe
+    
     piece = board.piece_at(square)
     if not piece or piece.color != piece_color:
         return True # Empty or wrong color logic? TS takes 'piece' object.
         # If square is empty, safe? TS: "getAttackingMoves(piece)..." implies piece exists.
+    
+    if mode == "see":
+        return static_exchange(board, square, not piece_color) <= 0
         
     # Get attackers/defenders
     attacking_moves = get_attacking_moves(board, square, piece_color, transitive=True)
@@ -100,10 +119,18 @@ def is_piece_safe(board: chess.Board, square: Square, piece_color: chess.Color,
     return False
 
 
-def get_unsafe_pieces(board: chess.Board, color: chess.Color, played_move: Optional[chess.Move] = None) -> List[Square]:
+def get_unsafe_pieces(board: chess.Board, color: chess.Color, played_move: Optional[chess.Move] = None,
+                      mode: Optional[str] = None, context=None) -> List[Square]:
     """
     Get all unsafe pieces for a color.
+    'context' (AnalysisContext) memoizes the result per position.
     """
+    if context is not None:
+        key = (context.position_key(board), color, mode or analysis_config.PIECE_SAFETY_MODE)
+        unsafe = context.get("unsafe", key)
+        if unsafe is not None:
+            return list(unsafe)
+    
     unsafe_squares = []
     
     # We need 'captured' value context if possible.
@@ -124,7 +151,10 @@ def get_unsafe_pieces(board: chess.Board, color: chess.Color, played_move: Optio
                 
             # Filter value > captured (Skipped)
             
-            if not is_piece_safe(board, sq, color, played_move):
+            if not is_piece_safe(board, sq, color, played_move, mode, context):
                 unsafe_squares.append(sq)
-                
+    
+    if context is not None:
+        context.put("unsafe", key, unsafe_squares)
+        return list(unsafe_squares)
     return unsafe_squares
@@ -1,18 +1,22 @@
 import chess
+from typing import Optional
 from chess import Square, PieceType
 from src.analysis.piece_safety import is_piece_safe, to_board_piece
 from src.analysis.danger_levels import move_creates_greater_threat
 from src.analysis.attackers import RawMove
 
-def is_piece_trapped(board: chess.Board, square: Square, danger_levels: bool = True) -> bool:
+def is_piece_trapped(board: chess.Board, square: Square, danger_levels: bool = True, mode: Optional[str] = None,
+                     context=None) -> bool:
     """
     A piece is trapped if it is currently unsafe, and ALL its legal moves lead to unsafe squares.
+    'mode' selects the piece safety evaluation (see piece_safety.is_piece_safe),
+    'context' (AnalysisContext) memoizes the board queries.
     """
     piece = board.piece_at(square)
     if not piece: return False
     
     # 1. Current safety
-    if is_piece_safe(board, square, piece.color):
+    if is_piece_safe(board, square, piece.color, mode=mode, context=context):
         return False # Not trapped if currently safe?
         # TS: "If a piece is unsafe on its current square ... return !standingPieceSafety && allMovesUnsafe"
         
@@ -44,19 +48,22 @@ def is_piece_trapped(board: chess.Board, square: Square, danger_levels: bool = T
         # If I move my Queen (escape), do I expose my Rook?
         # Yes, that's the logic.
         
-        if danger_levels and move_creates_greater_threat(board, square, raw_move):
+        # Simulate move (on 'board' itself: push/pop instead of a copy with the whole move stack)
+        board.push(move)
+        try:
+            # Check safety on new square first: it is far cheaper than the counter-threat search
+            escape_safe = is_piece_safe(board, move.to_square, piece.color, move, mode, context)
+        finally:
+            board.pop()
+        if not escape_safe:
+            continue
+        
+        if danger_levels and move_creates_greater_threat(board, square, raw_move, mode, context):
             # If escaping creates a BIGGER threat elsewhere (e.g. unblocks a mate), then it's not a valid escape.
             # So this move counts as "unsafe".
             continue
-            
-        # Simulate move
-        escape_board = board.copy()
-        escape_board.push(move)
         
-        # Check safety on new square
-        # We need piece object on new square
-        if is_piece_safe(escape_board, move.to_square, piece.color, move):
-            all_escapes_fail = False
-            break
+        all_escapes_fail = False
+        break
             
     return all_escapes_fail
@@ -5,7 +5,7 @@
 import chess
 from typing import Dict, Any, List, Optional
 from src.analysis.move_classifier import AdvancedMoveClassifier
-from src.analysis.opening_book import get_opening_name
+from src.analysis.opening_book import get_opening_trie, get_theory_source
 from src.analysis.accuracy_calculator import get_move_accuracy, get_game_accuracy
 
 class GameReport:
@@ -31,7 +31,17 @@ class GameReport:
         white_accuracies = []
         black_accuracies = []
         
-        for move_data in moves_with_evals:
+        # Walk the game through the theory source and the opening names once;
+        # plies past the end of book need no lookup
+        book_line = name_line = None
+        if moves_with_evals:
+            moves = [chess.Move.from_uci(m.get('move_uci')) for m in moves_with_evals]
+            start_fen = moves_with_evals[0].get('fen_before')
+            theory = self.classifier.theory_source or get_theory_source()
+            name_line = get_opening_trie().walk(moves, start_fen=start_fen)
+            book_line = name_line if theory is get_opening_trie() else theory.walk(moves, start_fen=start_fen)
+        
+        for ply, move_data in enumerate(moves_with_evals):
             fen_before = move_data.get('fen_before')
             move_uci = move_data.get('move_uci')
             top_moves = move_data.get('top_moves', {})
@@ -40,12 +50,10 @@ class GameReport:
             move = chess.Move.from_uci(move_uci)
             
             # 1. Classification
-            classification = self.classifier.classify_move(board, move, top_moves)
+            classification = self.classifier.classify_move(board, move, top_moves, book_line.is_book(ply))
             
             # 2. Opening Name
-            board_after = board.copy()
-            board_after.push(move)
-            opening = get_opening_name(board_after.fen())
+            opening = name_line.opening_at(ply)
             
             # 3. Accuracy
             # We need prev_eval and curr_eval in standard format.
@@ -0,0 +1,65 @@
+# see.py
+# Static Exchange Evaluation: the material result of the capture sequence on one
+# square, both sides capturing with their least valuable piece first and free to
+# stop whenever continuing would lose material.
+#
+# Works on attack bitboards only: captured pieces are taken out of an occupancy
+# mask, so sliders lined up behind them (batteries, x-rays) join the exchange
+# without any board copies or move generation.
+
+from typing import Optional
+
+import chess
+from chess import Square
+
+from src.analysis.analysis_config import PIECE_VALUES
+
+# PIECE_VALUES without the infinite king, so gains stay finite
+SEE_VALUES = {**PIECE_VALUES, chess.KING: 100}
+SEE_ORDER = (chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN, chess.KING)
+
+def least_valuable_attacker(board: chess.Board, attackers: chess.Bitboard, color: chess.Color, square: Square):
+    """(square, piece type) of the cheapest piece in 'attackers' allowed to capture on 'square', or None."""
+    target = chess.BB_SQUARES[square]
+    for piece_type in SEE_ORDER:
+        for from_square in chess.scan_forward(attackers & board.pieces_mask(piece_type, color)):
+            # A piece pinned to its king may only capture along the pin
+            if piece_type == chess.KING or board.pin_mask(color, from_square) & target:
+                return from_square, piece_type
+    return None
+
+def static_exchange(board: chess.Board, square: Square, attacker_color: Optional[chess.Color] = None) -> int:
+    """
+    What 'attacker_color' wins (in PIECE_VALUES units, >= 0) by starting captures
+    on 'square'; 0 if the piece there is safe from it. Defaults to the opponent
+    of the piece on 'square'.
+    Pins are taken from the starting position; promotions and en passant are ignored.
+    """
+    piece_type = board.piece_type_at(square)
+    if piece_type is None:
+        return 0
+    color = not board.color_at(square) if attacker_color is None else attacker_color
+
+    occupied = board.occupied
+    gains = [] # Material taken by each capture of the sequence
+    captured = SEE_VALUES[piece_type]
+    while True:
+        # Recomputed from the shrinking occupancy: reveals x-ray attackers
+        attackers = board.attackers_mask(color, square, occupied) & occupied
+        capture = least_valuable_attacker(board, attackers, color, square) if attackers else None
+        if capture is None:
+            break
+        from_square, capturer = capture
+        occupied ^= chess.BB_SQUARES[from_square]
+        # The king only takes on a square the other side no longer covers
+        if capturer == chess.KING and board.attackers_mask(not color, square, occupied) & occupied:
+            break
+        gains.append(captured)
+        captured = SEE_VALUES[capturer]
+        color = not color
+
+    # Back from the end: each side keeps a capture only if it pays
+    score = 0
+    for gain in reversed(gains):
+        score = max(0, gain - score)
+    return score
@@ -1,12 +1,29 @@
+import time
 import chess
-import chess.pgn
 from PyQt6.QtCore import QObject, QTimer, pyqtSlot, Qt
 from PyQt6.QtWidgets import QInputDialog
 
 from src.model.chess_model import ChessModel
 from src.model.engine_thread import EngineThread
+from src.model.engine_pool import EnginePool
+from src.model.eval_cache import LiveEvalCache, get_eval_cache
+from src.model.game_store import get_game_store, prefix_hashes
 from src.view.main_window import MainWindow
 from src.analysis.move_classifier import AdvancedMoveClassifier
+from src.analysis.opening_book import get_opening_trie, get_theory_source
+from src.analysis.analysis_budget import AnalysisBudget
+from src.analysis.analysis_context import AnalysisContext
+from src.analysis.game_review import classify_move, game_accuracy, position_entry, validate_pvs
+
+# Target depth of the live eval / best-move arrow
+LIVE_ANALYSIS_DEPTH = 20
+# Engine lines computed (and shown in the info panel) by live analysis
+LIVE_ANALYSIS_MULTIPV = 3
+# Review played positions during the game while the engine is idle (default of the setting).
+# Off unless the user ticks "Background Review": it runs an extra engine process.
+BACKGROUND_ANALYSIS = False
+# Print the per-ply engine time report and the board query hit rates to stdout after each review (diagnostics)
+PRINT_ANALYSIS_REPORT = False
 
 class GameController(QObject):
     def __init__(self):
@@ -17,6 +34,9 @@ class GameController(QObject):
         # Engine
         self.engine = EngineThread()
         self.engine.start_engine()
+        self.eval_cache = get_eval_cache() # Persistent engine results (None if disabled)
+        self.live_cache = LiveEvalCache() # Recent live analysis results, incl. unfinished ones
+        self.game_store = get_game_store() # Reviewed games (None if disabled)
         
         # Game State
         self.mode = "PvP" # PvP, PvE, EvE
@@ -38,8 +58,19 @@ class GameController(QObject):
         self.classifier = AdvancedMoveClassifier()
         self.analysis_results = {} # { move_index (int): classification_type (str) }
         self.is_analyzing_game = False
-        self.analysis_index = 0
-        self.current_analysis_board = None
+        self.analysis_index = 0 # Positions analysed so far
+        self.analysis_positions = [] # [(board after i moves, is_game_over)]
+        self.analysis_jobs = {} # { pool job id: (position index, depth, submit time) }
+        self.analysis_budget = None # AnalysisBudget of the running review
+        self.analysis_context = None # AnalysisContext of the review (hit counters; tables cleared per move)
+        self.analysis_pool = None # EnginePool, started on first analysis
+        self.analysis_book_line = None # BookLine of the game under analysis
+        self.analysis_prefix_hashes = [] # Checkpoint key of each position (see game_store.prefix_hashes)
+        self.analysis_restored = False # Review loaded from the game store (nothing to save)
+        
+        # Background Review State (fills the post-game checkpoints during play)
+        self.background_enabled = BACKGROUND_ANALYSIS
+        self.background_job = None # (pool job id, prefix hash, board) in flight
         
         # Connect Signals
         self.connect_signals()
@@ -79,6 +110,8 @@ class GameController(QObject):
         self.view.info_panel.toggle_eval_clicked.connect(self.view.toggle_eval_visibility)
         self.view.info_panel.toggle_arrows_clicked.connect(self.toggle_arrows)
         self.view.info_panel.toggle_auto_rotate_clicked.connect(self.toggle_auto_rotate)
+        self.view.info_panel.toggle_background_clicked.connect(self.toggle_background_analysis)
+        self.view.info_panel.chk_background.setChecked(self.background_enabled)
 
         # Main Menu Actions
         self.view.main_menu.pvp_clicked.connect(lambda: self.start_new_game("PvP"))
@@ -89,7 +122,8 @@ class GameController(QObject):
         # Engine -> Controller
         self.engine.best_move_found.connect(self.handle_engine_move)
         self.engine.eval_updated.connect(self.handle_eval_update)
-        self.engine.analysis_complete.connect(self.handle_analysis_complete)
+        self.engine.search_finished.connect(self.handle_search_finished)
+        self.engine.lines_updated.connect(self.handle_lines_update)
 
     @pyqtSlot(str, str)
     def handle_eval_update(self, score, pv_move):
@@ -211,9 +245,11 @@ class GameController(QObject):
         self.seeking_move = False
         self.is_analyzing_only = False
         self.history_index = None
+        self.cancel_post_game_analysis()
         self.analysis_results = {} # Clear previous analysis
         
         # Reset View
+        self.view.info_panel.clear_lines()
         self.view.board_widget.set_flipped(False)
         self.update_view()
         self.view.info_panel.set_status(f"Mode: {mode}")
@@ -256,22 +292,20 @@ class GameController(QObject):
         board_to_show = self.model.board
         
         if self.history_index is not None:
-            board_to_show = chess.Board()
-            stack = self.model.board.move_stack
-            limit = min(len(stack), self.history_index)
-            for i in range(limit):
-                board_to_show.push(stack[i])
+            board_to_show = self.model.board_at(self.history_index)
         
         # Update Board & Annotations
         self.update_board_visuals(board_to_show)
         
-        # Update Move List
-        self.view.info_panel.update_moves(str(chess.pgn.Game.from_board(self.model.board).mainline_moves()))
+        # Update Move List (only the plies that changed)
+        self.view.info_panel.update_moves(self.model.san_history)
 
         # Status update & Game Over Check
         if self.model.is_game_over():
              self.view.info_panel.set_status(f"Game Over: {self.model.get_outcome().result()}")
              self.view.info_panel.btn_analyze.setVisible(True)
+             # No live analysis of a finished game: use the idle engine time right away
+             self.schedule_background_analysis()
         else:
              self.view.info_panel.btn_analyze.setVisible(False)
         
@@ -289,7 +323,9 @@ class GameController(QObject):
             
             # Convert to text
             text_score = ""
-            if abs(cp_val) > 29000: # Mate
+            if cp_val is None: # Book position, never searched
+                text_score = "Book"
+            elif abs(cp_val) > 29000: # Mate
                 moves_to_mate = int((30000 - abs(cp_val)) / 100)
                 
                 if moves_to_mate == 0:
@@ -347,6 +383,8 @@ class GameController(QObject):
             
         # CRITICAL: Stop any existing search (e.g. analysis) before starting turn
         self.engine.stop_search()
+        # The bot search needs the CPU: the background review resumes once it is idle
+        self.stop_background_analysis()
             
         if self.mode == "EvE":
             if self.model.get_turn() == chess.WHITE:
@@ -361,6 +399,7 @@ class GameController(QObject):
         self.engine.set_position(self.model.get_fen())
         self.seeking_move = True
         self.is_analyzing_only = False 
+        self.view.info_panel.clear_lines() # Bot searches are not shown as lines
         
         import time
         self.engine_start_time = time.time()
@@ -432,13 +471,55 @@ class GameController(QObject):
     def analyze_position(self):
         if not self.model.is_game_over():
              self.engine.stop_search() 
+             
+             # Position seen before: show the stored result immediately
+             cached = self.live_cache.get(self.model.board)
+             if cached is None and self.eval_cache is not None:
+                 pvs = self.eval_cache.get(self.model.board, LIVE_ANALYSIS_DEPTH, LIVE_ANALYSIS_MULTIPV, self.engine.engine_id)
+                 if pvs and 1 in pvs:
+                     self.live_cache.put(self.model.board, pvs)
+                     cached = self.live_cache.get(self.model.board)
+             if cached is not None:
+                 depth, pvs = cached
+                 self.seeking_move = False
+                 self.is_analyzing_only = False
+                 self.handle_eval_update(pvs[1].score_str, pvs[1].pv_move)
+                 self.view.info_panel.update_lines(self.model.get_fen(), pvs)
+                 # Only search again if the stored result is shallower than the target
+                 if depth >= LIVE_ANALYSIS_DEPTH:
+                     return
+             
+             self.stop_background_analysis()
              self.engine.set_position(self.model.get_fen())
              self.seeking_move = True 
              self.is_analyzing_only = True 
              # Force Engine to Max Strength for Analysis
              # This ensures arrows/eval are accurate even if Bot is Level 1.
              self.engine.send_command("setoption name Skill Level value 20")
-             self.engine.go(depth=20) 
+             if cached is None:
+                 self.view.info_panel.clear_lines()
+             self.engine.go(depth=LIVE_ANALYSIS_DEPTH, multipv=LIVE_ANALYSIS_MULTIPV) 
+
+    @pyqtSlot(str, object)
+    def handle_lines_update(self, fen, pvs):
+        # Lines of live analysis only (bot searches run at reduced strength),
+        # and only while they still describe the position on the board
+        if not self.is_analyzing_only or fen != self.model.get_fen():
+            return
+        self.view.info_panel.update_lines(fen, pvs)
+
+    @pyqtSlot(object)
+    def handle_search_finished(self, search):
+        # Only full-strength analysis searches are cached; bot moves run with a
+        # reduced skill level and no explicit depth.
+        if search.depth is None or search.fen is None or not search.pvs:
+            return
+        board = chess.Board(search.fen)
+        self.live_cache.put(board, search.pvs)
+        if self.eval_cache is not None:
+            self.eval_cache.put(board, search.multipv, search.pvs, self.engine.engine_id)
+        # Live analysis done: the engine is idle until the next move
+        self.schedule_background_analysis()
 
     def navigate_history(self, direction):
         # Hide promotion dialog when navigating
@@ -466,6 +547,10 @@ class GameController(QObject):
             self.history_index = current
             
         self.update_view()
+        
+        # Back on the live position: resume live analysis (instant if it is cached)
+        if self.history_index is None and self.mode == "PvP" and not self.is_analyzing_game:
+            self.analyze_position()
 
     def undo_move(self):
         if self.mode == "EvE": return
@@ -475,7 +560,7 @@ class GameController(QObject):
         
         # Stop Analysis if running
         if self.is_analyzing_game:
-            self.is_analyzing_game = False
+            self.cancel_post_game_analysis()
             self.view.info_panel.btn_analyze.setText("Analyze Game")
             self.view.info_panel.btn_analyze.setEnabled(True)
             self.view.info_panel.set_status("Analysis Cancelled")
@@ -505,6 +590,10 @@ class GameController(QObject):
         self.view.board_widget.show_arrows = checked
         self.view.board_widget.update()
 
+    def toggle_background_analysis(self, checked):
+        self.background_enabled = checked
+        self.schedule_background_analysis()
+
     def toggle_auto_rotate(self, checked):
         self.auto_rotate = checked
         self.update_view()
@@ -535,6 +624,7 @@ class GameController(QObject):
             
         # Stop any background analysis first
         self.engine.stop_search()
+        self.stop_background_analysis()
         self.seeking_move = False
         self.is_analyzing_only = False
         
@@ -549,304 +639,339 @@ class GameController(QObject):
         # Critical: Delay setting state to TRUE until we are sure previous engine output is flushed.
         QTimer.singleShot(200, self.begin_analysis_loop)
 
+    def get_analysis_pool(self, engines=None):
+        """
+        Engine pool for analysis, started on first use with 'engines' processes
+        (default: the full pool, as post-game analysis wants).
+        """
+        if self.analysis_pool is None:
+            self.analysis_pool = EnginePool()
+            self.analysis_pool.job_finished.connect(self.handle_analysis_complete)
+        if len(self.analysis_pool.engines) < (engines or self.analysis_pool.size):
+            self.analysis_pool.start(engines)
+        return self.analysis_pool
+
+    def cancel_post_game_analysis(self):
+        """Stops a running post-game analysis and discards its pending results."""
+        self.is_analyzing_game = False
+        self.analysis_jobs = {}
+        self.analysis_budget = None
+        self.background_job = None # Cancelled along with the rest
+        if self.analysis_pool is not None:
+            self.analysis_pool.cancel_all()
+
     def begin_analysis_loop(self):
         self.is_analyzing_game = True
         self.analysis_results = {}
         self.analysis_index = 0
-        self.view.info_panel.set_status("Analyzing game...")
-        self.analyze_next_step()
-
-    def analyze_next_step(self):
-        # Check if done
-        # We need to go up to index == len(history) (State after last move)
-        if self.analysis_index > len(self.model.move_history):
-            self.finish_analysis()
+        self.analysis_restored = False
+        self.analysis_budget = None
+        
+        # A game reviewed before is reopened from the game store, with no engine time
+        if self.restore_stored_analysis():
             return
-
-        # Update progress text
-        self.view.info_panel.btn_analyze.setText(f"Analyzing {self.analysis_index + 1}/{len(self.model.move_history) + 1}")
         
-        # Get board state BEFORE the move (Wait, Board State FOR step i)
+        self.analysis_book_line = get_theory_source().walk(self.model.move_history)
+        self.analysis_context = AnalysisContext()
+        self.view.info_panel.set_status("Analyzing game...")
+        
+        # Every position of the game, computed once with a single cursor board.
         # Step i corresponds to board *after* i moves.
         # i=0: Start. i=N: End.
         board = chess.Board()
-        for i in range(self.analysis_index):
-            board.push(self.model.move_history[i])
-            
-        self.current_analysis_board = board 
-        
-        # TERMINAL STATE HANDLING:
-        # If the game is over, the engine might give weird results or just "mate 0".
-        # We handle it explicitly to ensure correct "Loss" calculation for the final move.
-        if board.is_game_over():
-            # Determine Score from Side-To-Move perspective
-            # If Checked -> Checkmate -> -30000 (We lost)
-            # Else -> Stalemate/Draw -> 0
-            
-            cp = 0
-            if board.is_checkmate():
-                 cp = -30000 # Side to move is mated
-            
-            # Simulate Engine Result
-            # pvs[1] = {'cp': cp, 'pv_move': ''}
-            pvs = { 1: {'cp': cp, 'pv_move': ''} }
+        self.analysis_positions = []
+        for i in range(len(self.model.move_history) + 1):
+            if i > 0:
+                board.push(self.model.move_history[i - 1])
+            self.analysis_positions.append((board.copy(stack=False), board.is_game_over()))
+        
+        # Positions finished by an earlier (interrupted) run of this game, or of
+        # any game sharing its opening moves, resume from their checkpoints
+        self.analysis_prefix_hashes = prefix_hashes(self.model.move_history)
+        checkpoints = self.game_store.load_checkpoints(self.analysis_prefix_hashes) if self.game_store is not None else {}
+        
+        # Decide what each position needs: book plies skip the engine, forced and
+        # decided ones stop at a shallow search, swings get extra depth
+        self.analysis_budget = AnalysisBudget([position for position, _ in self.analysis_positions],
+                                              self.analysis_book_line, known=checkpoints)
+        
+        # Fan the searches out over the engine pool; results come back by job id
+        self.analysis_jobs = {}
+        if self.analysis_budget.needs_engine():
+            pool = self.get_analysis_pool()
+            if not pool.engines:
+                self.is_analyzing_game = False
+                self.view.info_panel.btn_analyze.setText("Analyze Game")
+                self.view.info_panel.btn_analyze.setEnabled(True)
+                self.view.info_panel.set_status("Error: Engine not available")
+                return
+        
+        self.update_analysis_progress()
+        
+        # Checkpointed positions are already evaluated; their moves are reclassified
+        for i in sorted(checkpoints):
+            if self.is_analyzing_game and i < len(self.analysis_positions):
+                self.store_analysis_entry(i, checkpoints[i])
+        
+        # Terminal and book positions are recorded right away, the rest is searched
+        self.pump_analysis()
+
+    def pump_analysis(self):
+        """
+        Records every position whose search is over and starts the searches the
+        analysis budget allows, one per idle pool engine (so a job's time from
+        submit to result is its engine time).
+        """
+        budget = self.analysis_budget
+        while self.is_analyzing_game and budget is self.analysis_budget:
+            for step, pvs in budget.pop_final():
+                if not self.is_analyzing_game:
+                    return
+                self.record_analysis_step(step, pvs)
             
-            # Proceed immediately
-            self.handle_analysis_complete(pvs)
-            return
+            pool = self.analysis_pool
+            free = len(pool.engines) - len(self.analysis_jobs) if pool is not None else 0
+            jobs = budget.next_jobs(max(free, 0))
+            if not jobs:
+                if budget.finished:
+                    continue # Over budget: the remaining positions were just finalized
+                return
+            for step, depth, timeout in jobs:
+                position = self.analysis_positions[step][0]
+                # Positions analysed in an earlier review (or another game) skip the engine
+                cached = self.eval_cache.get(position, depth, 3, pool.engine_id) if self.eval_cache is not None else None
+                if cached:
+                    budget.add_result(step, cached, 0.0, depth)
+                    continue
+                # Enable MultiPV to allow "Great Move" detection (comparing best vs second best)
+                job_id = pool.submit(position.fen(), depth=depth, multipv=3, timeout=timeout)
+                self.analysis_jobs[job_id] = (step, depth, time.monotonic())
 
-        # Send position to engine
-        self.engine.set_position(board.fen())
-        
-        # Start Analysis
-        # Enable MultiPV to allow "Great Move" detection (comparing best vs second best)
-        self.engine.go(depth=20, multipv=3) 
+    def restore_stored_analysis(self) -> bool:
+        """Loads the stored review of the current game, if there is a complete one."""
+        if self.game_store is None:
+            return False
+        game_id = self.game_store.find_game(self.model.move_history)
+        stored = self.game_store.load_game(game_id) if game_id is not None else None
+        if stored is None or not stored.is_reviewed():
+            return False
+        self.analysis_results = stored.results
+        self.analysis_restored = True
+        self.finish_analysis()
+        self.view.info_panel.set_status("Analysis loaded from game store")
+        return True
+
+    def game_headers(self):
+        """PGN-style tags describing the current game for the game store."""
+        if self.mode == "PvE":
+            engine = f"Stockfish (Level {self.engine_level})"
+            white, black = ("Player", engine) if self.player_color == chess.WHITE else (engine, "Player")
+        elif self.mode == "EvE":
+            white = f"Stockfish (Level {getattr(self, 'eve_level_white', '?')})"
+            black = f"Stockfish (Level {getattr(self, 'eve_level_black', '?')})"
+        else:
+            white, black = "White", "Black"
+        return {
+            "Event": f"Local {self.mode} game",
+            "Date": time.strftime("%Y.%m.%d"),
+            "White": white,
+            "Black": black,
+            "Result": self.model.board.result()
+        }
+
+    def schedule_background_analysis(self):
+        """
+        Background Review: while the engine is idle during a game, sends the next
+        played position that has no checkpoint yet to the analysis pool (at
+        review depth, one at a time). Results become post-game checkpoints, so
+        "Analyze Game" only has to classify the moves.
+        """
+        if not self.background_enabled or self.background_job is not None or self.is_analyzing_game:
+            return
+        if self.game_store is None or not self.model.move_history:
+            return
+        # Idle: no bot move being searched and live analysis finished
+        if self.seeking_move or self.engine.active_searches:
+            return
         
-        # Safety Timeout: If engine hangs for > 10 seconds, force next step
-        QTimer.singleShot(10000, lambda: self.force_next_analysis_step(self.analysis_index))
+        moves = self.model.move_history
+        hashes = prefix_hashes(moves)
+        done = self.game_store.load_checkpoints(hashes)
+        board = chess.Board()
+        for step, digest in enumerate(hashes):
+            if step > 0:
+                board.push(moves[step - 1])
+            if step in done or board.is_game_over():
+                continue # Terminal positions are scored without the engine
+            # Already searched (e.g. by live analysis): checkpoint it without the engine
+            pool_id = self.analysis_pool.engine_id if self.analysis_pool is not None else self.engine.engine_id
+            cached = self.eval_cache.get(board, 20, 3, pool_id) if self.eval_cache is not None else None
+            if cached:
+                self.game_store.save_checkpoint(digest, position_entry(board, validate_pvs(board, cached)))
+                continue
+            # One position at a time: a single engine process is enough
+            pool = self.get_analysis_pool(1)
+            if not pool.engines:
+                return
+            job_id = pool.submit(board.fen(), depth=20, multipv=3)
+            self.background_job = (job_id, digest, board.copy(stack=False))
+            return
 
-    def force_next_analysis_step(self, expected_index):
-        if self.is_analyzing_game and self.analysis_index == expected_index:
-            # Engine stuck? Stop it to force output flush (which we'll ignore/handle)
-            # print(f"DEBUG: Timeout at step {expected_index}. Sending STOP to force progress.")
-            self.engine.stop_search()
-            # Do NOT call handle_analysis_complete manually. 
-            # The 'stop' command will trigger 'bestmove' from engine, 
-            # which will trigger handle_analysis_complete via signal. 
+    def stop_background_analysis(self):
+        """Cancels the background job in flight (the engine is needed for play)."""
+        if self.background_job is not None:
+            if self.analysis_pool is not None:
+                self.analysis_pool.cancel(self.background_job[0])
+            self.background_job = None
 
-    def handle_analysis_complete(self, pvs):
+    def handle_background_result(self, pvs):
+        _, digest, board = self.background_job
+        self.background_job = None
+        if pvs:
+            if self.eval_cache is not None:
+                self.eval_cache.put(board, 3, pvs, self.analysis_pool.engine_id)
+            self.game_store.save_checkpoint(digest, position_entry(board, validate_pvs(board, pvs)))
+        self.schedule_background_analysis()
+
+    def update_analysis_progress(self):
+        total = len(self.model.move_history) + 1
+        self.view.info_panel.btn_analyze.setText(f"Analyzing {min(self.analysis_index + 1, total)}/{total}")
+
+    def handle_analysis_complete(self, job_id, pvs):
         """
-        Called when engine finishes analyzing a step during Post-Game Analysis.
+        Called when a pool engine finishes analyzing a step during Post-Game Analysis.
         """
+        if self.background_job is not None and job_id == self.background_job[0]:
+            self.handle_background_result(pvs)
+            return
+        
         if not self.is_analyzing_game:
             return
-            
+        
+        # Results of cancelled / previous analyses are not in the job table
+        job = self.analysis_jobs.pop(job_id, None)
+        if job is None:
+            return
+        step, depth, submitted = job
+        
+        if self.eval_cache is not None and pvs:
+            self.eval_cache.put(self.analysis_positions[step][0], 3, pvs, self.analysis_pool.engine_id)
+        
+        self.analysis_budget.add_result(step, pvs, time.monotonic() - submitted, depth)
+        self.pump_analysis()
+
+    def record_analysis_step(self, step, pvs):
+        """Turns the engine result for position 'step' into its analysis entry and stores it."""
         try:
-            # 0. Sync Check: Validate Move against Current Analysis Board
-            # Reconstruct board state for current index to verify move legality
-            # self.current_analysis_board SHOULD match self.analysis_index
-            # But let's rely on reconstruction to be 100% safe
-            check_board = chess.Board()
-            for i in range(self.analysis_index):
-                check_board.push(self.model.move_history[i])
-            
-            # Extract Best Move
-            best_move_uci = ""
-            cp = 0.0
-            second_best_cp = None
-            
-            if pvs and 1 in pvs:
-                info = pvs[1]
-                best_move_uci = info.get('pv_move', '')
-                
-                # VALIDATION: Check if move is legal
-                if best_move_uci:
-                    try:
-                        move = chess.Move.from_uci(best_move_uci)
-                        if move not in check_board.legal_moves:
-                            print(f"WARNING: Illegal move {best_move_uci} suggested for step {self.analysis_index}. Discarding.")
-                            # Discard this result? Or just the move? 
-                            # If move is illegal, result is probably garbage.
-                            pvs = {} 
-                            best_move_uci = ""
-                    except:
-                        best_move_uci = ""
-            
-            # Extract Score / Second Best Score (from validated pvs)
-            if pvs:
+            # 0. Sync Check: Validate the best move against the position of this step
+            check_board = self.analysis_positions[step][0]
+            valid_pvs = validate_pvs(check_board, pvs)
+            if pvs and not valid_pvs:
+                print(f"WARNING: Illegal move {pvs[1].pv_move} suggested for step {step}. Discarding.")
+            if valid_pvs:
                 # DEBUG: Check what PVs we have
-                print(f"DEBUG Engine PVs: keys={list(pvs.keys())}, content={pvs}")
-                
-                # Top Move (re-extract)
-                if 1 in pvs:
-                    info = pvs[1]
-                    if info.get('mate') is not None:
-                        m = info['mate']
-                        # Normalized Mate Score (High value) - preserve sign later
-                        if m > 0: cp = 30000 - (m * 100)
-                        else: cp = -30000 - (m * 100)
-                    else:
-                        cp = info.get('cp', 0)
-                    best_move_uci = info.get('pv_move', '')
-                
-                # Second Best (for Great Move detection)
-                if 2 in pvs:
-                    info2 = pvs[2]
-                    if info2.get('mate') is None:
-                        second_best_cp = info2.get('cp', 0)
+                print(f"DEBUG Engine PVs: keys={list(valid_pvs.keys())}, content={valid_pvs}")
             
-            # NORMALIZE to White Perspective
-            # analysis_index 0 = Start (White to move). cp is White's eval.
-            # analysis_index 1 = After White Move (Black to move). cp is Black's eval.
-            is_white_turn = (self.analysis_index % 2 == 0)
-            white_cp = cp if is_white_turn else -cp
+            # Store data for Current State (cp ALWAYS from White's perspective)
+            entry = position_entry(check_board, valid_pvs)
             
-            # Store data for Current State
-            self.analysis_results[self.analysis_index] = {
-                'cp': white_cp, # Store ALWAYS as White Perspective
-                'best_move': best_move_uci,
-                'second_best_cp': second_best_cp, # Note: this is raw side-to-move, careful
-                'is_white_turn': is_white_turn,
-                'type': 'pending' 
-            }
+            # Checkpoint the finished ply so an interrupted review can resume here
+            if self.game_store is not None:
+                self.game_store.save_checkpoint(self.analysis_prefix_hashes[step], entry)
+        except Exception as e:
+            self.abort_analysis(e)
+            return
+        
+        self.store_analysis_entry(step, entry)
+
+    def store_analysis_entry(self, step, entry):
+        """
+        Adds the evaluation of position 'step' and classifies every move
+        whose two neighbouring positions are now both analysed.
+        """
+        try:
+            self.analysis_results[step] = entry
             
-            # --- DELAYED CLASSIFICATION (Classify Move index-1) ---
-            if self.analysis_index > 0:
-                prev_idx = self.analysis_index - 1
-                prev_data = self.analysis_results[prev_idx]
-                
-                # Identify Move Played
-                played_move_obj = self.model.move_history[prev_idx]
-                played_uci = played_move_obj.uci()
-                
-                # Reconstruct Board State BEFORE the move
-                prev_board = chess.Board()
-                for i in range(prev_idx):
-                    prev_board.push(self.model.move_history[i])
-                    
-                # Construct top_moves for classifier
-                # IMPORTANT: Classifier expects WHITE-CENTRIC evals and handles perspective internally
-                turn_color = prev_board.turn # Side that moved
-                
-                # 1. Best Move Eval (from prev_data) - WHITE-CENTRIC as stored
-                best_cp = prev_data['cp']  # Already white-centric
-                
-                # 2. Played Move Eval (from white_cp - which is eval of position AFTER move)
-                # white_cp is already white-centric
-                played_cp = white_cp  # Already white-centric
-                
-                fake_top_moves = {
-                    1: {'pv_move': prev_data['best_move'], 'cp': int(best_cp)}
-                }
-                
-                # Add Second Best if available
-                # second_best_cp is stored as RAW side-to-move from engine
-                # We need to convert it to white-centric
-                if prev_data.get('second_best_cp') is not None:
-                    second_cp = prev_data['second_best_cp']
-                    # second_best_cp is side-to-move, convert to white-centric
-                    if turn_color == chess.BLACK:
-                        second_cp = -second_cp  # Flip to white-centric
-                    fake_top_moves[2] = {'cp': int(second_cp)}
-                     
-                # Add Played Move as a "fake" rank
-                if played_uci != prev_data['best_move']:
-                    fake_top_moves[99] = {'pv_move': played_uci, 'cp': int(played_cp)}
-                else:
-                    pass
-                    
-                # Call Classifier
-                classification = self.classifier.classify_move(prev_board, played_move_obj, fake_top_moves)
-                prev_data['type'] = classification
-                
-                # Update Storage
-                self.analysis_results[prev_idx] = prev_data
+            # --- DELAYED CLASSIFICATION ---
+            # Move i needs positions i and i+1; classify whichever neighbour just became complete
+            for move_idx in (step - 1, step):
+                if 0 <= move_idx < len(self.model.move_history) \
+                        and move_idx in self.analysis_results and move_idx + 1 in self.analysis_results:
+                    self.classify_analysis_move(move_idx)
             
             # Next Step
             self.analysis_index += 1
-            self.analyze_next_step()
+            if len(self.analysis_results) > len(self.model.move_history):
+                self.finish_analysis()
+            else:
+                self.update_analysis_progress()
             
         except Exception as e:
-            print(f"Error in Analysis Loop: {e}")
-            self.view.info_panel.set_status(f"Error: {str(e)}")
-            self.finish_analysis()
+            self.abort_analysis(e)
+
+    def abort_analysis(self, error):
+        print(f"Error in Analysis Loop: {error}")
+        self.view.info_panel.set_status(f"Error: {str(error)}")
+        self.cancel_post_game_analysis()
+        self.finish_analysis()
+
+    def classify_analysis_move(self, prev_idx):
+        """Classifies move 'prev_idx' from the analysis of the positions before and after it."""
+        prev_data = self.analysis_results[prev_idx]
+        classification = classify_move(
+            self.classifier,
+            self.analysis_positions[prev_idx][0], # Board BEFORE the move
+            self.model.move_history[prev_idx],
+            prev_data, self.analysis_results[prev_idx + 1],
+            is_book=self.analysis_book_line.is_book(prev_idx),
+            context=self.analysis_context
+        )
+        self.analysis_context.clear() # Keeps the counters for the report
+        prev_data['type'] = classification
+        
+        # Update Storage
+        self.analysis_results[prev_idx] = prev_data
 
     def finish_analysis(self):
-        from src.analysis.accuracy_calculator import winning_chances_percent, move_accuracy_percent
-        import chess
-        
         self.is_analyzing_game = False
         self.view.info_panel.btn_analyze.setText("Analyze Game") 
         self.view.info_panel.btn_analyze.setEnabled(True)
         self.view.info_panel.set_status("Analysis Complete")
+        if self.analysis_budget is not None:
+            if PRINT_ANALYSIS_REPORT:
+                # Where the engine time went, ply by ply, and how often board queries were reused
+                print(self.analysis_budget.report())
+                if self.analysis_context is not None:
+                    print(self.analysis_context.report())
+            self.view.info_panel.set_status(f"Analysis Complete ({self.analysis_budget.spent:.1f} s engine time)",
+                                            self.analysis_budget.summary())
         
         # Calculate Stats & Accuracy
-        counts = {}
-        white_acc_sum = 0
-        white_moves = 0
-        black_acc_sum = 0
-        black_moves = 0
-        
-        # We need an initial evaluation for the start of the game (0.0 usually)
-        prev_cp = 0.0 # Start position
-        
         # Only iterate up to the number of actual moves played
         # analysis_results contains N+1 entries (0 to N). Entry N is the final position eval.
+        reviewed = []
         for idx in range(len(self.model.move_history)):
             if idx not in self.analysis_results:
                 continue
-                
             data = self.analysis_results[idx]
             if data['type'] == 'pending':
                 data['type'] = 'excellent' # Assume innocence
-                
-            classification = data['type']
-            
-            # 1. Counts
-            counts[classification] = counts.get(classification, 0) + 1
-            
-            # 2. Accuracy
-            current_cp = data['cp'] # This is eval from Engine side (Side to move)
-            
-            # Win chances before move (previous position eval)
-            # Note: stored 'cp' is from perspective of side to move at that step.
-            # So prev_cp (from step i-1) was for Opponent.
-            # We need to flip prev_cp to current side's perspective.
-            
-            if idx == 0:
-                win_before = winning_chances_percent(0) # Standard start
-            else:
-                # Previous step stored eval for Opponent.
-                # So for us, it is -prev_cp.
-                # BUT wait. `finish_analysis` loop:
-                # Let's say White moves (idx 0). Engine says +50 (White adv).
-                # Next Black moves (idx 1). Engine says -50 (Black disadv, i.e. White +50).
-                # Accuracy is how much did we drop from Best Eval?
-                pass
-
-            # SIMPLIFIED ACCURACY:
-            # We reuse the logic that 'Accuracy' is determined by how close we are to Best Move.
-            # If classification is 'best'/'great'/'brilliant' -> 100%.
-            # 'excellent' -> 95%.
-            # 'good' -> 80%.
-            # 'inaccuracy' -> 60%.
-            # 'mistake' -> 30%.
-            # 'blunder' -> 0%.
-            # This is robust and consistent with labels without fragile CP math.
-            
-            acc_map = {
-                'brilliant': 100, 'great': 100, 'best': 100, 'book': 100,
-                'excellent': 98, 'good': 90, 'inaccuracy': 60, 'mistake': 30, 'blunder': 0, 'forced': 100
-            }
-            score = acc_map.get(classification, 90)
-            
-            is_white = (idx % 2 == 0) # 0 is White's first move
-            if is_white:
-                white_acc_sum += score
-                white_moves += 1
-            else:
-                black_acc_sum += score
-                black_moves += 1
-
-        accuracy = {
-            'white': (white_acc_sum / white_moves) if white_moves > 0 else 0,
-            'black': (black_acc_sum / black_moves) if black_moves > 0 else 0
-        }
+            reviewed.append((data['type'], data['is_white_turn']))
+        counts, accuracy = game_accuracy(reviewed)
         
         # Switch to New Interface
         self.view.info_panel.show_analysis()
         self.view.info_panel.analysis_dashboard.update_stats(counts, accuracy)
         
-        # Find and display the opening name
-        from src.analysis.opening_book import get_opening_name
-        last_opening = None
-        temp_board = chess.Board()
-        for move in self.model.move_history:
-            temp_board.push(move)
-            opening = get_opening_name(temp_board.fen())
-            if opening:
-                last_opening = opening
-        self.view.info_panel.analysis_dashboard.set_opening(last_opening)
+        # Find and display the opening name (deepest named position of the game)
+        name_line = get_opening_trie().walk(self.model.move_history)
+        self.view.info_panel.analysis_dashboard.set_opening(name_line.last_opening)
+        
+        # Persist completed reviews so the game reopens instantly next time
+        if self.game_store is not None and not self.analysis_restored \
+                and len(self.analysis_results) > len(self.model.move_history):
+            self.game_store.save_game(self.model.move_history, self.analysis_results, self.game_headers(),
+                                      opening=name_line.last_opening, accuracy=accuracy)
         
         # Reset to first move so user starts from beginning
         self.history_index = 0
@@ -856,6 +981,7 @@ class GameController(QObject):
 
     def exit_post_game_analysis(self):
         print("DEBUG: exit_post_game_analysis triggered")
+        self.cancel_post_game_analysis()
         # 1. Transition to Main Menu immediately (Starts Fade Out)
         self.view.show_menu()
         print("DEBUG: show_menu called (Transition Start)")
@@ -876,9 +1002,7 @@ class GameController(QObject):
         if board_to_show is None:
             # Determine which board we are showing
             if self.history_index is not None:
-                board_to_show = chess.Board()
-                for i in range(self.history_index):
-                    board_to_show.push(self.model.move_history[i])
+                board_to_show = self.model.board_at(self.history_index)
             else:
                 board_to_show = self.model.board
 
@@ -903,9 +1027,11 @@ class GameController(QObject):
             try:
                 cp = data['cp']
                 score_str = ""
+                if cp is None: # Book position, never searched
+                    score_str = "Book"
                 # MATE DETECTION
                 # CP > 20000 means White winning. < -20000 means Black winning.
-                if abs(cp) > 20000:
+                elif abs(cp) > 20000:
                     mate_dist = (30000 - abs(cp)) / 100
                     # If CP positive -> +M3. If negative -> -M3.
                     sign = "+" if cp > 0 else "-"
@@ -971,3 +1097,9 @@ class GameController(QObject):
 
     def close(self):
         self.engine.stop_engine()
+        if self.analysis_pool is not None:
+            self.analysis_pool.shutdown()
+        if self.eval_cache is not None:
+            self.eval_cache.close()
+        if self.game_store is not None:
+            self.game_store.close()
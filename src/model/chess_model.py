@@ -1,18 +1,27 @@
 import chess
 
+# History navigation keeps a board snapshot every SNAPSHOT_INTERVAL plies;
+# any earlier position is rebuilt from the nearest snapshot (at most K-1 pushes).
+SNAPSHOT_INTERVAL = 8
+
 class ChessModel:
     """
     Wraps the chess.Board object and provides methods for game interaction.
     """
     def __init__(self):
         self.board = chess.Board()
+        self.san_history = [] # SAN of every move played, kept in step with the move stack
+        self._snapshots = [chess.Board()] # _snapshots[j] = position after j * SNAPSHOT_INTERVAL moves
 
     def reset_game(self):
         self.board.reset()
+        self.san_history = []
+        self._snapshots = [chess.Board()]
 
     def make_move(self, move: chess.Move) -> bool:
         """Attempts to make a move. Returns True if legal and made."""
         if move in self.board.legal_moves:
+            self.san_history.append(self.board.san(move))
             self.board.push(move)
             return True
         return False
@@ -20,6 +29,34 @@ class ChessModel:
     def undo_move(self):
         if len(self.board.move_stack) > 0:
             self.board.pop()
+            self.san_history.pop()
+            # Drop snapshots past the new end of the game
+            del self._snapshots[len(self.board.move_stack) // SNAPSHOT_INTERVAL + 1:]
+
+    def board_at(self, index: int) -> chess.Board:
+        """
+        Returns the position after 'index' moves of the current game.
+        The live board is returned for the last index; earlier positions are
+        fresh boards rebuilt from the nearest snapshot, keeping the last move
+        on their stack for highlighting.
+        """
+        stack = self.board.move_stack
+        index = max(0, min(index, len(stack)))
+        if index == len(stack):
+            return self.board
+
+        slot = index // SNAPSHOT_INTERVAL
+        while len(self._snapshots) <= slot:
+            start = (len(self._snapshots) - 1) * SNAPSHOT_INTERVAL
+            snapshot = self._snapshots[-1].copy(stack=1)
+            for move in stack[start:start + SNAPSHOT_INTERVAL]:
+                snapshot.push(move)
+            self._snapshots.append(snapshot)
+
+        board = self._snapshots[slot].copy(stack=1)
+        for move in stack[slot * SNAPSHOT_INTERVAL:index]:
+            board.push(move)
+        return board
 
     def get_legal_destinations(self, square: chess.Square) -> list[chess.Square]:
         """Returns a list of legal destination squares for a piece at the given square."""
@@ -0,0 +1,231 @@
+import os
+import subprocess
+import threading
+import time
+from collections import deque
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from src.model.uci_protocol import ENGINE_PATH, POPEN_CREATIONFLAGS, engine_identity, go_command, parse_info_line
+
+# Pool configuration (post-game analysis)
+ANALYSIS_POOL_SIZE = max(1, (os.cpu_count() or 2) // 2) # Engine processes
+ANALYSIS_ENGINE_THREADS = 1 # UCI "Threads" per engine
+ANALYSIS_ENGINE_HASH_MB = 64 # UCI "Hash" per engine
+ANALYSIS_JOB_TIMEOUT = 10.0 # Seconds before a search is forced to stop
+
+class AnalysisJob:
+    """One position to analyse. 'pvs' collects { multipv_id: InfoRecord } like EngineThread.current_pvs."""
+    def __init__(self, job_id, fen, depth=None, movetime=None, multipv=1, timeout=None):
+        self.job_id = job_id
+        self.fen = fen
+        self.depth = depth
+        self.movetime = movetime
+        self.multipv = multipv
+        self.timeout = timeout # Watchdog limit in seconds (None: the pool's job_timeout)
+        self.pvs = {}
+        self.started = None
+        self.stop_sent = False
+        self.cancelled = False
+
+
+class PoolEngine:
+    """
+    A single UCI engine process of the pool, with its own reader thread.
+    Runs one job at a time; a job ends when its 'bestmove' arrives.
+    """
+    def __init__(self, pool, engine_path, threads, hash_mb):
+        self.pool = pool
+        self.engine_path = engine_path
+        self.threads = threads
+        self.hash_mb = hash_mb
+        self.process = None
+        self.job = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        self.process = subprocess.Popen(
+            self.engine_path,
+            universal_newlines=True,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            creationflags=POPEN_CREATIONFLAGS
+        )
+        self.send_command("uci")
+        self.send_command(f"setoption name Threads value {self.threads}")
+        self.send_command(f"setoption name Hash value {self.hash_mb}")
+        self.send_command("isready")
+        threading.Thread(target=self.read_loop, daemon=True).start()
+
+    def send_command(self, command):
+        if self.process and self.process.stdin:
+            try:
+                with self.lock:
+                    self.process.stdin.write(f"{command}\n")
+                    self.process.stdin.flush()
+            except OSError as e:
+                print(f"Error sending command: {e}")
+
+    def run_job(self, job):
+        job.started = time.monotonic()
+        self.send_command(f"setoption name MultiPV value {job.multipv}")
+        self.send_command(f"position fen {job.fen}")
+        self.send_command(go_command(job.depth, job.movetime))
+
+    def stop_search(self):
+        self.send_command("stop")
+
+    def quit(self):
+        self.send_command("quit")
+        if self.process:
+            try:
+                self.process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+
+    def read_loop(self):
+        try:
+            for line in self.process.stdout:
+                line = line.strip()
+                job = self.job
+                if line.startswith("bestmove"):
+                    if job is not None:
+                        self.pool.job_done(self, job)
+                elif job is not None and line.startswith("info"):
+                    try:
+                        info = parse_info_line(line)
+                    except Exception:
+                        info = None # Ignore parsing errors in the loop
+                    if info is not None:
+                        job.pvs[info.multipv] = info
+        except (OSError, ValueError, AttributeError):
+            pass
+        self.pool.engine_exited(self)
+
+
+class EnginePool(QObject):
+    """
+    Runs N UCI engine processes and spreads analysis jobs across them.
+    Results are emitted by job id as each search finishes (in any order).
+    """
+    job_finished = pyqtSignal(int, object) # job_id, pvs dict
+
+    def __init__(self, engine_path=ENGINE_PATH, size=ANALYSIS_POOL_SIZE,
+                 threads=ANALYSIS_ENGINE_THREADS, hash_mb=ANALYSIS_ENGINE_HASH_MB,
+                 job_timeout=ANALYSIS_JOB_TIMEOUT):
+        super().__init__()
+        self.engine_path = engine_path
+        self.engine_id = engine_identity(engine_path) # Cache key of this engine build
+        self.size = size
+        self.threads = threads
+        self.hash_mb = hash_mb
+        self.job_timeout = job_timeout
+        self.engines = []
+        self.queue = deque()
+        self.lock = threading.Lock()
+        self.next_job_id = 0
+
+        # Watchdog: stop searches that exceed the timeout (forces 'bestmove')
+        self.watchdog = QTimer(self)
+        self.watchdog.setInterval(250)
+        self.watchdog.timeout.connect(self.check_timeouts)
+
+    def start(self, count=None) -> int:
+        """Spawns engine processes up to 'count' (default: the pool size). Returns how many are running."""
+        target = self.size if count is None else min(count, self.size)
+        for _ in range(target - len(self.engines)):
+            engine = PoolEngine(self, self.engine_path, self.threads, self.hash_mb)
+            try:
+                engine.start()
+            except FileNotFoundError:
+                print(f"Error: Engine not found at {self.engine_path}")
+                break
+            self.engines.append(engine)
+        if self.engines:
+            self.watchdog.start()
+        return len(self.engines)
+
+    def submit(self, fen, depth=None, movetime=None, multipv=1, timeout=None) -> int:
+        """Queues a position for analysis. Returns the job id used by job_finished."""
+        with self.lock:
+            job_id = self.next_job_id
+            self.next_job_id += 1
+            self.queue.append(AnalysisJob(job_id, fen, depth, movetime, multipv, timeout))
+        self.dispatch()
+        return job_id
+
+    def dispatch(self):
+        """Hands queued jobs to idle engines."""
+        assignments = []
+        with self.lock:
+            for engine in self.engines:
+                if not self.queue:
+                    break
+                if engine.job is None:
+                    engine.job = self.queue.popleft()
+                    assignments.append(engine)
+        for engine in assignments:
+            engine.run_job(engine.job)
+
+    def job_done(self, engine, job):
+        # Called from the engine's reader thread
+        with self.lock:
+            engine.job = None
+        self.dispatch()
+        if not job.cancelled:
+            self.job_finished.emit(job.job_id, job.pvs)
+
+    def engine_exited(self, engine):
+        # Reader hit EOF: engine crashed or quit. Requeue its job on the others.
+        with self.lock:
+            if engine in self.engines:
+                self.engines.remove(engine)
+            job, engine.job = engine.job, None
+            if job is not None and not job.cancelled:
+                self.queue.appendleft(job)
+        self.dispatch()
+
+    def cancel_all(self):
+        """Drops queued jobs and stops running ones; their results are discarded."""
+        with self.lock:
+            self.queue.clear()
+            running = [engine for engine in self.engines if engine.job is not None]
+            for engine in running:
+                engine.job.cancelled = True
+        for engine in running:
+            engine.stop_search()
+
+    def cancel(self, job_id):
+        """Drops one queued or running job; its result is discarded."""
+        with self.lock:
+            for job in self.queue:
+                if job.job_id == job_id:
+                    self.queue.remove(job)
+                    return
+            running = [engine for engine in self.engines
+                       if engine.job is not None and engine.job.job_id == job_id]
+            for engine in running:
+                engine.job.cancelled = True
+        for engine in running:
+            engine.stop_search()
+
+    def check_timeouts(self):
+        now = time.monotonic()
+        for engine in list(self.engines):
+            job = engine.job
+            if job is not None and job.started is not None and not job.stop_sent \
+                    and now - job.started > (job.timeout or self.job_timeout):
+                job.stop_sent = True
+                engine.stop_search()
+
+    def pending_count(self) -> int:
+        """Jobs queued or running."""
+        with self.lock:
+            return len(self.queue) + sum(1 for engine in self.engines if engine.job is not None)
+
+    def shutdown(self):
+        self.watchdog.stop()
+        self.cancel_all()
+        for engine in list(self.engines):
+            engine.quit()
+        self.engines = []
@@ -1,26 +1,63 @@
-import subprocess
+import asyncio
 import threading
 import time
-from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtCore import QThread, QTimer, pyqtSignal
+from src.model.uci_client import EngineError, UciClient
+from src.model.uci_protocol import ENGINE_PATH, engine_identity
+
+# Live eval updates delivered to the GUI per second (0 = one per engine info line).
+# Updates in between are coalesced: the GUI always receives the latest one.
+EVAL_UPDATE_HZ = 20
+
+class EngineSearch:
+    """One 'go' command: the position and limits it was sent with, and the PV lines it produced."""
+    def __init__(self, fen, depth, movetime, multipv):
+        self.fen = fen
+        self.depth = depth
+        self.movetime = movetime
+        self.multipv = multipv
+        self.pvs = {}
+        self.go_limits = (depth, movetime) # Limits actually sent (difficulty settings if none given)
+        self.stopped = False # Stopped before the engine started it: never sent
 
 class EngineThread(QThread):
     """
-    Handles communication with the Stockfish engine in a separate thread.
+    Qt adapter around UciClient: runs the client's asyncio loop in this thread
+    and turns its results into signals for the GUI.
     """
     best_move_found = pyqtSignal(str)
     eval_updated = pyqtSignal(str, str) # evaluation (e.g. "+1.5", "#-3"), best_move
     analysis_complete = pyqtSignal(object) # Emit dict of PVs when bestmove received
+    search_finished = pyqtSignal(object) # EngineSearch, when its bestmove is received
+    lines_updated = pyqtSignal(str, object) # fen, { multipv_id: InfoRecord } (full PVs), same rate as eval_updated
+    _eval_pending = pyqtSignal() # Engine thread -> GUI thread: an undelivered eval is waiting
     
-    def __init__(self, engine_path="engine/stockfish.exe"):
+    def __init__(self, engine_path=ENGINE_PATH):
         super().__init__()
         self.engine_path = engine_path
-        self.process = None
+        self.engine_id = engine_identity(engine_path) # Cache key of this engine build
+        self.client = None # UciClient, owned by this thread's event loop
+        self.loop = None
+        self.closing = None # asyncio.Event ending the loop
+        self.search_order = None # asyncio.Lock: searches start one at a time, in call order
+        self.ready = threading.Event() # Set once the engine answered (or failed to start)
         self.running = False
-        self.command_queue = []
         self.lock = threading.Lock()
         
         # Analysis State
-        self.current_pvs = {} # { multipv_id: { 'score': ..., 'pv': ... } }
+        self.current_pvs = {} # { multipv_id: InfoRecord }
+        self.position_fen = None # Last position set
+        self.latest_search = None # Only the newest search reports live evals
+        self.active_searches = [] # Sent to the loop and not finished yet
+        
+        # Eval throttling (see EVAL_UPDATE_HZ). pending_eval is written by the engine
+        # thread and taken by the GUI thread, both under self.lock.
+        self.pending_eval = None # (fen, { multipv_id: InfoRecord }) not yet delivered
+        self.last_eval_emit = 0.0
+        self.eval_timer = QTimer()
+        self.eval_timer.setSingleShot(True)
+        self.eval_timer.timeout.connect(self.flush_eval)
+        self._eval_pending.connect(self.schedule_eval_flush)
         
         # Difficulty Settings
         self.difficulty_skill = 20
@@ -28,74 +65,122 @@ class EngineThread(QThread):
         self.difficulty_movetime = 1000
 
     def start_engine(self):
-        try:
-            # Create subprocess with pipes
-            self.process = subprocess.Popen(
-                self.engine_path,
-                universal_newlines=True,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            self.send_command("uci")
-            self.send_command("isready")
-            self.running = True
-            self.start() # Start the QThread run loop for reading output
-        except FileNotFoundError:
+        self.start() # Runs the asyncio loop (see run)
+        self.ready.wait(15)
+        if self.client is None:
             print(f"Error: Engine not found at {self.engine_path}")
+            return
+        self.running = True
+
+    def run(self):
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        self.loop = asyncio.get_running_loop()
+        self.closing = asyncio.Event()
+        self.search_order = asyncio.Lock()
+        client = UciClient(self.engine_path)
+        try:
+            await client.start()
+        except (OSError, EngineError, asyncio.TimeoutError):
+            self.ready.set()
+            return
+        self.client = client
+        self.ready.set()
+        
+        await self.closing.wait()
+        await client.quit()
+
+    def call(self, callback, *args):
+        """Runs 'callback' on the engine loop (calls keep their order)."""
+        if self.running:
+            self.loop.call_soon_threadsafe(callback, *args)
 
     def stop_search(self):
         """Stops the current search without quitting the engine."""
-        if self.process:
-            self.send_command("stop")
-            self.send_command("isready") # Sync
+        # Searches still waiting for their turn are dropped instead of started
+        for search in list(self.active_searches):
+            search.stopped = True
+        if self.client is not None:
+            self.call(self.client.stop)
 
     def stop_engine(self):
-        self.running = False
-        if self.process:
-            self.send_command("stop") # Ensure search stops
-            self.send_command("quit")
-            self.process.communicate() # Wait for it to exit
-            self.process = None
-        self.quit() # Stop QThread
+        if self.running:
+            self.stop_search()
+            self.call(self.closing.set)
+            self.running = False
         self.wait()
 
     def send_command(self, command):
-        if self.process and self.process.stdin:
-            try:
-                self.process.stdin.write(f"{command}\n")
-                self.process.stdin.flush()
-                
-                # Reset PVs on new search command
-                if command.startswith("go") or command.startswith("position"):
-                    # We accept that analysis accumulates until a new command or completion.
-                    pass 
-            except OSError as e:
-                print(f"Error sending command: {e}")
+        self.call(self.write_command, command)
+
+    def write_command(self, command):
+        try:
+            self.client.send(command)
+        except EngineError as e:
+            print(f"Error sending command: {e}")
 
     def set_position(self, fen):
-        self.send_command(f"position fen {fen}")
+        self.position_fen = fen
 
     def go(self, depth=None, movetime=None, multipv=1):
+        """Starts a search on the last position set. Returns its EngineSearch (None without an engine)."""
+        if not self.running:
+            return None
+        search = EngineSearch(self.position_fen, depth, movetime, multipv)
+        if depth is None and movetime is None:
+             # Use difficulty settings
+             # Combine both as requested
+             search.go_limits = (self.difficulty_depth, self.difficulty_movetime)
+        self.latest_search = search
+        self.active_searches.append(search)
+        # An eval still waiting for delivery belongs to the previous search
+        with self.lock:
+            self.pending_eval = None
+        
         # Reset analysis data for new search
-        self.current_pvs = {}
+        self.current_pvs = search.pvs
         
-        # Ensure multipv option is set
-        self.send_command(f"setoption name MultiPV value {multipv}")
+        asyncio.run_coroutine_threadsafe(self.run_search(search), self.loop)
+        return search
+
+    async def run_search(self, search):
+        # Engine thread. Searches wait for the previous one to finish; one that was
+        # stopped while waiting is dropped without ever reaching the engine.
+        try:
+            async with self.search_order:
+                if search.stopped:
+                    return
+                depth, movetime = search.go_limits
+                result = await self.client.search(
+                    search.fen, depth, movetime, search.multipv,
+                    on_info=lambda info: self.handle_info(search, info)
+                )
+        except EngineError as e:
+            print(f"Engine thread error: {e}")
+            return
+        finally:
+            self.active_searches.remove(search)
         
-        cmd = "go"
+        # The final eval is delivered right away (ahead of best_move_found),
+        # unless a newer search has already started.
+        with self.lock:
+            pending, self.pending_eval = self.pending_eval, None
+        if pending is not None and search is self.latest_search:
+            self.emit_eval(*pending)
         
-        # If arguments provided, use them (overrides difficulty)
-        if depth is not None or movetime is not None:
-             if depth: cmd += f" depth {depth}"
-             if movetime: cmd += f" movetime {movetime}"
-        else:
-             # Use difficulty settings
-             # Combine both as requested
-             cmd += f" depth {self.difficulty_depth} movetime {self.difficulty_movetime}"
-             
-        self.send_command(cmd)
+        if result.bestmove:
+            self.best_move_found.emit(result.bestmove)
+            # Analysis done, emit FULL results
+            self.analysis_complete.emit(search.pvs)
+        self.search_finished.emit(search)
+
+    def handle_info(self, search, info):
+        search.pvs[info.multipv] = info
+        # UI Live Eval / lines, only while this is the newest search
+        # (no stale evals after 'stop')
+        if search is self.latest_search:
+            self.post_eval(search.fen, search.pvs)
 
     def set_difficulty(self, level):
         """
@@ -126,86 +211,36 @@ class EngineThread(QThread):
         self.send_command(f"setoption name Skill Level value {self.difficulty_skill}")
 
 
-    def run(self):
-        """
-        Thread loop to read engine output.
-        """
-        while self.running and self.process:
-            try:
-                line = self.process.stdout.readline()
-                if not line:
-                    break
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Parse output
-                if line.startswith("bestmove"):
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        best_move = parts[1]
-                        self.best_move_found.emit(best_move)
-                        # Analysis done, emit FULL results
-                        self.analysis_complete.emit(self.current_pvs)
-                
-                elif "info" in line and "score" in line:
-                    # Provide eval updates
-                    try:
-                        parts = line.split()
-                        
-                        score_val = ""
-                        pv_move = ""
-                        multipv_id = 1
-                        
-                        # Extract MultiPV ID
-                        if "multipv" in parts:
-                            idx = parts.index("multipv")
-                            multipv_id = int(parts[idx+1])
-                        
-                        # Extract Score
-                        # We store raw Centipawn value for analysis usage too
-                        cp = 0
-                        mate = None
-                        
-                        if "score cp" in line:
-                            try:
-                                idx = parts.index("cp")
-                                val = int(parts[idx+1])
-                                cp = val
-                                score_val = f"{val/100.0:+.2f}"
-                            except: pass
-                        elif "score mate" in line:
-                            try:
-                                idx = parts.index("mate")
-                                val = int(parts[idx+1])
-                                mate = val
-                                score_val = f"#{val}"
-                            except: pass
-                            
-                        # Extract PV (Principal Variation - Best Move)
-                        if " pv " in line:
-                            try:
-                                idx = parts.index("pv")
-                                if idx + 1 < len(parts):
-                                    pv_move = parts[idx+1] # First move of PV
-                            except: pass
-                        
-                        # Store in current_pvs
-                        self.current_pvs[multipv_id] = {
-                            "score_str": score_val,
-                            "cp": cp,
-                            "mate": mate,
-                            "pv_move": pv_move,
-                            "full_line": line
-                        }
-                        
-                        # Emit regular update ONLY for primary line (MultiPV 1) for UI Live Eval
-                        if multipv_id == 1 and (score_val or pv_move):
-                             self.eval_updated.emit(score_val, pv_move)
-                            
-                    except Exception as e:
-                        pass # Ignore parsing errors in the loop
-
-            except Exception as e:
-                print(f"Engine thread error: {e}")
-                break
+    def post_eval(self, fen, pvs):
+        """Engine thread: hands the latest lines to the GUI, coalescing bursts."""
+        if EVAL_UPDATE_HZ <= 0:
+            self.emit_eval(fen, dict(pvs))
+            return
+        with self.lock:
+            was_empty = self.pending_eval is None
+            self.pending_eval = (fen, dict(pvs))
+        # Only the first update of a burst wakes the GUI thread; later ones just replace it
+        if was_empty:
+            self._eval_pending.emit()
+
+    def schedule_eval_flush(self):
+        # GUI thread: deliver now, or once the rate limit allows it
+        if self.eval_timer.isActive():
+            return
+        wait = self.last_eval_emit + 1.0 / EVAL_UPDATE_HZ - time.monotonic()
+        if wait <= 0:
+            self.flush_eval()
+        else:
+            self.eval_timer.start(int(wait * 1000) + 1)
+
+    def flush_eval(self):
+        with self.lock:
+            pending, self.pending_eval = self.pending_eval, None
+        if pending is not None:
+            self.last_eval_emit = time.monotonic()
+            self.emit_eval(*pending)
+
+    def emit_eval(self, fen, pvs):
+        if 1 in pvs:
+            self.eval_updated.emit(pvs[1].score_str, pvs[1].pv_move)
+        self.lines_updated.emit(fen or "", pvs)
@@ -0,0 +1,197 @@
+# eval_cache.py
+# Persistent engine evaluation cache (SQLite), shared by live analysis and post-game analysis.
+
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import chess
+import chess.polyglot
+
+from src.model.uci_protocol import InfoRecord
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Set to None to disable the cache
+EVAL_CACHE_PATH = os.path.join(BASE_DIR, "resources", "eval_cache.sqlite")
+EVAL_CACHE_MAX_ENTRIES = 200000 # Least recently used entries beyond this are evicted
+EVAL_CACHE_TRIM_EVERY = 500 # Writes between size checks
+LIVE_CACHE_SIZE = 256 # Positions kept by the in-memory cache of live analysis
+# Seconds a connection waits for another one's write lock (GUI, pool, batch CLI
+# share the file); past it the hit's touch or the new result is dropped
+EVAL_CACHE_BUSY_TIMEOUT = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS evals (
+    zobrist INTEGER NOT NULL,
+    engine TEXT NOT NULL,
+    multipv INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    pvs TEXT NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (zobrist, engine, multipv, depth)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS evals_last_used ON evals (last_used);
+"""
+
+def position_key(board: chess.Board) -> int:
+    """Polyglot Zobrist hash of the position, folded into SQLite's signed 64-bit range."""
+    key = chess.polyglot.zobrist_hash(board)
+    return key - (1 << 64) if key >= (1 << 63) else key
+
+def reached_depth(pvs: Dict[int, InfoRecord]) -> int:
+    """Depth every PV line of a search result was completed at (0 if unknown)."""
+    depths = [info.depth for info in pvs.values()]
+    return min(depths) if depths else 0
+
+
+class EvalCache:
+    """
+    Engine results keyed by (Zobrist hash, engine id, MultiPV, depth).
+    A lookup is answered by any entry searched at least as deep with at least
+    as many lines. Entries carry a use counter; once the table grows past
+    'max_entries' the least recently used ones are deleted.
+    Every statement is committed at once, so no connection holds the write lock
+    between calls. While another process keeps the file locked past the busy
+    timeout, hits are served without their touch and results aren't stored.
+    """
+    def __init__(self, path: str = EVAL_CACHE_PATH, max_entries: int = EVAL_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=EVAL_CACHE_BUSY_TIMEOUT, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.clock = self.conn.execute("SELECT COALESCE(MAX(last_used), 0) FROM evals").fetchone()[0]
+        self.writes = 0
+
+    def tick(self) -> int:
+        self.clock += 1
+        return self.clock
+
+    def get(self, board: chess.Board, depth: int, multipv: int, engine_id: str) -> Optional[Dict[int, InfoRecord]]:
+        """Cached { multipv_id: InfoRecord } for the position, or None on a miss."""
+        key = position_key(board)
+        with self.lock:
+            try:
+                row = self.conn.execute(
+                    "SELECT multipv, depth, pvs FROM evals"
+                    " WHERE zobrist = ? AND engine = ? AND multipv >= ? AND depth >= ?"
+                    " ORDER BY depth DESC, multipv LIMIT 1",
+                    (key, engine_id, multipv, depth)
+                ).fetchone()
+            except sqlite3.OperationalError:
+                return None # Unreadable right now (e.g. locked past the busy timeout): a miss
+            if row is None:
+                return None
+            try:
+                # Touch the entry, committed now: an open transaction would keep
+                # the write lock from the other processes sharing the cache
+                self.conn.execute(
+                    "UPDATE evals SET last_used = ? WHERE zobrist = ? AND engine = ? AND multipv = ? AND depth = ?",
+                    (self.tick(), key, engine_id, row[0], row[1])
+                )
+                self.conn.commit()
+            except sqlite3.OperationalError:
+                self.conn.rollback() # Another process is writing: the hit is served untouched
+
+        # A deeper MultiPV entry may hold more lines than were asked for
+        lines = (InfoRecord.from_dict(data) for data in json.loads(row[2]))
+        return {info.multipv: info for info in lines if info.multipv <= multipv}
+
+    def put(self, board: chess.Board, multipv: int, pvs: Dict[int, InfoRecord], engine_id: str):
+        """
+        Stores a search result under the depth it actually reached, so searches
+        cut short by 'stop' never answer lookups for deeper ones.
+        """
+        depth = reached_depth(pvs)
+        if depth <= 0:
+            return
+        data = json.dumps([info.to_dict() for info in pvs.values()])
+        with self.lock:
+            try:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO evals (zobrist, engine, multipv, depth, pvs, last_used)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (position_key(board), engine_id, multipv, depth, data, self.tick())
+                )
+                self.writes += 1
+                if self.writes % EVAL_CACHE_TRIM_EVERY == 0:
+                    self.trim()
+                self.conn.commit()
+            except sqlite3.OperationalError:
+                # Locked for longer than the busy timeout: the result is just not cached
+                self.conn.rollback()
+
+    def trim(self):
+        # Keep the 'max_entries' most recently used rows (caller holds the lock)
+        self.conn.execute(
+            "DELETE FROM evals WHERE last_used < ("
+            " SELECT last_used FROM evals ORDER BY last_used DESC LIMIT 1 OFFSET ?)",
+            (self.max_entries - 1,)
+        )
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM evals").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
+
+
+class LiveEvalCache:
+    """
+    Bounded in-memory LRU of live analysis results: Zobrist hash -> (depth, pvs).
+    Unlike EvalCache it also keeps searches that were stopped early, so a
+    revisited position can be shown at once while a deeper search catches up.
+    """
+    def __init__(self, size: int = LIVE_CACHE_SIZE):
+        self.size = size
+        self.entries: "OrderedDict[int, tuple]" = OrderedDict()
+
+    def get(self, board: chess.Board):
+        """(depth, pvs) of the deepest result seen for the position, or None."""
+        key = position_key(board)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, board: chess.Board, pvs: Dict[int, InfoRecord]):
+        depth = reached_depth(pvs)
+        if depth <= 0 or 1 not in pvs:
+            return
+        key = position_key(board)
+        entry = self.entries.get(key)
+        # Never replace a deeper result with a shallower one
+        if entry is None or depth >= entry[0]:
+            self.entries[key] = (depth, pvs)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# Process-wide cache, opened on first use
+_cache: Optional[EvalCache] = None
+_cache_lock = threading.Lock()
+
+def get_eval_cache() -> Optional[EvalCache]:
+    """Returns the shared evaluation cache, or None if it is disabled or cannot be opened."""
+    global _cache
+    if _cache is None and EVAL_CACHE_PATH:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    _cache = EvalCache(EVAL_CACHE_PATH)
+                except sqlite3.Error as e:
+                    print(f"Evaluation cache disabled: {e}")
+                    return None
+    return _cache
@@ -0,0 +1,307 @@
+# game_store.py
+# Local game database (SQLite): reviewed games with their per-ply analysis,
+# indexed by position so every stored game reaching a position is found at once.
+#
+#   python -m src.model.game_store find "<fen>"   # games that reached a position
+#   python -m src.model.game_store list           # most recently stored games
+
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+import chess
+
+from src.analysis.analysis_config import Classification
+from src.model.eval_cache import position_key
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Set to None to disable the store
+GAME_STORE_PATH = os.path.join(BASE_DIR, "resources", "games.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    line_hash TEXT NOT NULL UNIQUE,
+    start_fen TEXT NOT NULL,
+    moves TEXT NOT NULL,
+    white TEXT, black TEXT, event TEXT, date TEXT, result TEXT,
+    opening TEXT,
+    white_accuracy REAL, black_accuracy REAL,
+    stored INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS plies (
+    game_id INTEGER NOT NULL REFERENCES games (id) ON DELETE CASCADE,
+    ply INTEGER NOT NULL,
+    zobrist INTEGER NOT NULL,
+    cp INTEGER,
+    best_move TEXT,
+    second_best_cp INTEGER,
+    classification TEXT,
+    PRIMARY KEY (game_id, ply)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS plies_zobrist ON plies (zobrist);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    prefix_hash TEXT PRIMARY KEY,
+    cp INTEGER NOT NULL,
+    best_move TEXT,
+    second_best_cp INTEGER,
+    stored INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+CHECKPOINT_QUERY_BATCH = 500 # Prefix hashes per SELECT (SQLite variable limit)
+
+def prefix_hashes(moves: Sequence[chess.Move], start_fen: str = chess.STARTING_FEN) -> List[str]:
+    """
+    Chained hashes of every move prefix: entry i identifies the start position
+    plus moves[:i]. Games sharing an opening share their leading hashes.
+    """
+    digest = hashlib.sha1(start_fen.encode()).hexdigest()
+    hashes = [digest]
+    for move in moves:
+        digest = hashlib.sha1(f"{digest} {move.uci()}".encode()).hexdigest()
+        hashes.append(digest)
+    return hashes
+
+def line_hash(moves: Sequence[chess.Move], start_fen: str = chess.STARTING_FEN) -> str:
+    """Identity of a game: its start position and move sequence."""
+    return prefix_hashes(moves, start_fen)[-1]
+
+
+class StoredGame:
+    """A game read back from the store, with analysis_results shaped like GameController's."""
+    def __init__(self, game_id: int, start_fen: str, moves: List[chess.Move], headers: Dict[str, str],
+                 opening: Optional[str], accuracy: Dict[str, float], results: Dict[int, Dict]):
+        self.game_id = game_id
+        self.start_fen = start_fen
+        self.moves = moves
+        self.headers = headers
+        self.opening = opening
+        self.accuracy = accuracy
+        self.results = results # { ply: {'cp', 'best_move', 'second_best_cp', 'is_white_turn', 'type'} }
+
+    def is_reviewed(self) -> bool:
+        """True if every position has its evaluation (the review finished)."""
+        return len(self.results) > len(self.moves)
+
+
+class GameStore:
+    """
+    Games keyed by (start position, moves); each ply row holds the Zobrist
+    hash of the position *before* that ply (the last row: the final position)
+    plus its evaluation and the classification of the move played from it.
+    """
+    def __init__(self, path: str = GAME_STORE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def save_game(self, moves: Sequence[chess.Move], results: Dict[int, Dict],
+                  headers: Optional[Dict[str, str]] = None, start_fen: str = chess.STARTING_FEN,
+                  opening: Optional[str] = None, accuracy: Optional[Dict[str, float]] = None) -> int:
+        """
+        Stores (or replaces) a game and its analysis. 'results' maps ply index
+        to an analysis entry (see game_review.position_entry); plies without
+        one are still indexed by position. Returns the game id.
+        """
+        headers = headers or {}
+        accuracy = accuracy or {}
+        board = chess.Board(start_fen)
+        rows = []
+        for ply in range(len(moves) + 1):
+            if ply > 0:
+                board.push(moves[ply - 1])
+            entry = results.get(ply)
+            if entry is None:
+                rows.append((ply, position_key(board), None, None, None, None))
+                continue
+            # The last position has no move, so no classification
+            classification = entry.get('type') if ply < len(moves) else None
+            # Book positions have no eval: 'cp' None, stored as NULL
+            cp = int(entry['cp']) if entry['cp'] is not None else None
+            rows.append((ply, position_key(board), cp, entry.get('best_move') or None,
+                         entry.get('second_best_cp'), classification))
+
+        with self.lock:
+            with self.conn:
+                self.conn.execute("DELETE FROM games WHERE line_hash = ?", (line_hash(moves, start_fen),))
+                cursor = self.conn.execute(
+                    "INSERT INTO games (line_hash, start_fen, moves, white, black, event, date, result,"
+                    " opening, white_accuracy, black_accuracy, stored) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (line_hash(moves, start_fen), start_fen, " ".join(move.uci() for move in moves),
+                     headers.get("White"), headers.get("Black"), headers.get("Event"), headers.get("Date"),
+                     headers.get("Result"), opening, accuracy.get('white'), accuracy.get('black'),
+                     int(time.time()))
+                )
+                game_id = cursor.lastrowid
+                self.conn.executemany(
+                    "INSERT INTO plies (game_id, ply, zobrist, cp, best_move, second_best_cp, classification)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(game_id,) + row for row in rows]
+                )
+        return game_id
+
+    def find_game(self, moves: Sequence[chess.Move], start_fen: str = chess.STARTING_FEN) -> Optional[int]:
+        """Id of the stored game with exactly these moves, or None."""
+        with self.lock:
+            row = self.conn.execute("SELECT id FROM games WHERE line_hash = ?",
+                                    (line_hash(moves, start_fen),)).fetchone()
+        return row[0] if row else None
+
+    def load_game(self, game_id: int) -> Optional[StoredGame]:
+        with self.lock:
+            game = self.conn.execute(
+                "SELECT start_fen, moves, white, black, event, date, result, opening,"
+                " white_accuracy, black_accuracy FROM games WHERE id = ?", (game_id,)
+            ).fetchone()
+            if game is None:
+                return None
+            plies = self.conn.execute(
+                "SELECT ply, cp, best_move, second_best_cp, classification FROM plies"
+                " WHERE game_id = ? ORDER BY ply", (game_id,)
+            ).fetchall()
+
+        start_fen, moves_text = game[0], game[1]
+        moves = [chess.Move.from_uci(uci) for uci in moves_text.split()]
+        white_first = chess.Board(start_fen).turn == chess.WHITE
+        results = {}
+        for ply, cp, best_move, second_best_cp, classification in plies:
+            # No eval: a book position if its move was classified (the final
+            # position: if the move into it was), otherwise a ply without entry
+            if cp is None and not classification and \
+                    not (ply == len(moves) and results.get(ply - 1, {}).get('type') in (Classification.BOOK,
+                                                                                        Classification.FORCED)):
+                continue
+            results[ply] = {
+                'cp': cp,
+                'best_move': best_move or "",
+                'second_best_cp': second_best_cp,
+                'is_white_turn': (ply % 2 == 0) == white_first,
+                'type': classification or 'pending'
+            }
+        headers = {name: value for name, value in zip(("White", "Black", "Event", "Date", "Result"), game[2:7])
+                   if value is not None}
+        accuracy = {'white': game[8] or 0, 'black': game[9] or 0}
+        return StoredGame(game_id, start_fen, moves, headers, game[7], accuracy, results)
+
+    def save_checkpoint(self, prefix_hash: str, entry: Dict):
+        """
+        Records the analysis entry of one position of a running review, keyed by
+        its move prefix (see prefix_hashes), as soon as it is known.
+        Only engine evaluations (with a best move) are kept: a book position has
+        no eval, and whether a position is book depends on the game's next move,
+        which the prefix doesn't cover. Terminal positions are scored for free.
+        """
+        if entry['cp'] is None or not entry.get('best_move'):
+            return
+        with self.lock:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints (prefix_hash, cp, best_move, second_best_cp, stored)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (prefix_hash, int(entry['cp']), entry.get('best_move') or None,
+                     entry.get('second_best_cp'), int(time.time()))
+                )
+
+    def load_checkpoints(self, hashes: Sequence[str], white_first: bool = True) -> Dict[int, Dict]:
+        """
+        Checkpointed entries for the positions of a game, given its prefix hashes:
+        { step: entry } with 'type' left 'pending' (moves are reclassified).
+        """
+        index = {digest: step for step, digest in enumerate(hashes)}
+        rows = []
+        with self.lock:
+            for start in range(0, len(hashes), CHECKPOINT_QUERY_BATCH):
+                batch = list(hashes[start:start + CHECKPOINT_QUERY_BATCH])
+                rows += self.conn.execute(
+                    "SELECT prefix_hash, cp, best_move, second_best_cp FROM checkpoints"
+                    f" WHERE prefix_hash IN ({','.join('?' * len(batch))})"
+                    # Rows without a best move are book placeholders of older versions
+                    " AND best_move IS NOT NULL", batch
+                ).fetchall()
+
+        results = {}
+        for digest, cp, best_move, second_best_cp in rows:
+            step = index[digest]
+            results[step] = {
+                'cp': cp,
+                'best_move': best_move or "",
+                'second_best_cp': second_best_cp,
+                'is_white_turn': (step % 2 == 0) == white_first,
+                'type': 'pending'
+            }
+        return results
+
+    def games_with_position(self, board: chess.Board, limit: int = 100) -> List[Dict]:
+        """
+        Stored games that reached the position, newest first:
+        [{'game_id', 'ply', 'white', 'black', 'result', 'opening'}]
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT g.id, MIN(p.ply), g.white, g.black, g.result, g.opening FROM plies p"
+                " JOIN games g ON g.id = p.game_id WHERE p.zobrist = ?"
+                " GROUP BY g.id ORDER BY g.stored DESC, g.id DESC LIMIT ?",
+                (position_key(board), limit)
+            ).fetchall()
+        keys = ('game_id', 'ply', 'white', 'black', 'result', 'opening')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def recent_games(self, limit: int = 20) -> List[Dict]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id, white, black, result, opening, white_accuracy, black_accuracy FROM games"
+                " ORDER BY stored DESC, id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        keys = ('game_id', 'white', 'black', 'result', 'opening', 'white_accuracy', 'black_accuracy')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
+
+
+# Process-wide store, opened on first use
+_store: Optional[GameStore] = None
+_store_lock = threading.Lock()
+
+def get_game_store() -> Optional[GameStore]:
+    """Returns the shared game store, or None if it is disabled or cannot be opened."""
+    global _store
+    if _store is None and GAME_STORE_PATH:
+        with _store_lock:
+            if _store is None:
+                try:
+                    _store = GameStore(GAME_STORE_PATH)
+                except sqlite3.Error as e:
+                    print(f"Game store disabled: {e}")
+                    return None
+    return _store
+
+
+if __name__ == "__main__":
+    store = get_game_store()
+    if store is None:
+        sys.exit(1)
+    if len(sys.argv) >= 3 and sys.argv[1] == "find":
+        for game in store.games_with_position(chess.Board(sys.argv[2])):
+            print(f"#{game['game_id']} ply {game['ply']}: {game['white'] or '?'} - {game['black'] or '?'} "
+                  f"{game['result'] or '*'} ({game['opening'] or 'unknown opening'})")
+    elif len(sys.argv) >= 2 and sys.argv[1] == "list":
+        for game in store.recent_games():
+            print(f"#{game['game_id']}: {game['white'] or '?'} - {game['black'] or '?'} {game['result'] or '*'}"
+                  f" accuracy {game['white_accuracy'] or 0:.1f}/{game['black_accuracy'] or 0:.1f}")
+    else:
+        print('Usage: python -m src.model.game_store find "<fen>" | list')
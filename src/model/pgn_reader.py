@@ -0,0 +1,249 @@
+# pgn_reader.py
+# Streaming PGN import for large game databases.
+#
+# Reads only what analysis needs: the tag pairs and the mainline SAN moves.
+# Comments, NAGs and variations are skipped without building a game tree, and
+# SAN is turned into moves only when a game is actually used (PgnGame.moves).
+#
+#   for game in read_games("games.pgn"):
+#       print(game.headers.get("White"), len(game.sans))
+#
+#   # Parallel import: one byte range per worker process
+#   for start, end in split_chunks("games.pgn", 4):
+#       pool.submit(worker, "games.pgn", start, end)
+
+import codecs
+import os
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import chess
+
+PGN_READ_BLOCK = 1 << 20 # Bytes per bulk read
+
+# One tag pair per line; the value runs to the last quote (like chess.pgn, which writes quotes unescaped)
+HEADER_RE = re.compile(rb'\[([A-Za-z0-9_]+)\s+"(.*)"\s*\]')
+# Brace comments and rest-of-line comments, matched in one left-to-right pass
+COMMENT_RE = re.compile(r"\{[^}]*\}?|;[^\n]*")
+ESCAPE_RE = re.compile(r"^%[^\n]*", re.MULTILINE) # "%" escape lines
+COMMENT_START_RE = re.compile(rb"[{;]")
+# Innermost variation; removed repeatedly to handle nesting
+VARIATION_RE = re.compile(r"\([^()]*\)")
+# SAN without annotation suffixes. Deliberately loose (move numbers, NAGs and
+# results never match); anything else that slips through fails in parse_san.
+SAN_RE = re.compile(r"[NBRQKa-h][^\s.$!?+#]*[1-8](?:=?[NBRQ])?|O-O(?:-O)?|0-0(?:-0)?")
+# Game termination; anything after it belongs to a game without tags, which is not split off
+RESULT_RE = re.compile(r"1-0|0-1|1/2-1/2|\*")
+GAME_START = b"\n[Event "
+
+
+class PgnGame:
+    """One game as read from the file: tag pairs and mainline SAN, nothing else."""
+    __slots__ = ("offset", "headers", "sans")
+
+    def __init__(self, offset: int, headers: Dict[str, str], sans: List[str]):
+        self.offset = offset # Byte offset of the game in the file
+        self.headers = headers
+        self.sans = sans
+
+    def board(self) -> chess.Board:
+        """Starting position (FEN tag for set-up games)."""
+        fen = self.headers.get("FEN")
+        chess960 = "960" in self.headers.get("Variant", "")
+        return chess.Board(fen, chess960=chess960) if fen else chess.Board(chess960=chess960)
+
+    def moves(self) -> List[chess.Move]:
+        """Mainline moves, up to the first SAN that is not legal in its position."""
+        board = self.board()
+        moves = []
+        for san in self.sans:
+            try:
+                move = board.parse_san(san)
+            except ValueError:
+                break
+            board.push(move)
+            moves.append(move)
+        return moves
+
+    def __repr__(self):
+        return f"PgnGame({self.headers.get('White', '?')} - {self.headers.get('Black', '?')}, {len(self.sans)} plies)"
+
+
+def parse_movetext(movetext: bytes) -> List[str]:
+    """Mainline SAN tokens of a game's movetext (comments, NAGs, variations dropped)."""
+    text = movetext.decode("utf-8", errors="replace")
+    if "%" in text and (text[0] == "%" or "\n%" in text):
+        text = ESCAPE_RE.sub(" ", text)
+    if "{" in text or ";" in text:
+        text = COMMENT_RE.sub(" ", text)
+    while "(" in text:
+        text, count = VARIATION_RE.subn(" ", text)
+        if not count:
+            break # Unbalanced parenthesis
+    result = RESULT_RE.search(text)
+    if result:
+        text = text[:result.start()]
+    return SAN_RE.findall(text)
+
+def ends_in_comment(text: bytes, in_comment: bool) -> bool:
+    """
+    Whether a { } comment is still open at the end of 'text', given whether one
+    was open at its start. Comments don't nest: a "{" inside one is plain text and
+    the first "}" closes it (like COMMENT_RE); a ";" comment runs to the line end.
+    """
+    position = 0
+    if in_comment:
+        position = text.find(b"}") + 1
+        if not position:
+            return True
+        in_comment = False
+    # Only the last "{" can leave a comment open: it is closed if any "}" follows
+    # it, and open otherwise, unless it sits in a ";" comment (full scan below)
+    last_open = text.rfind(b"{", position)
+    if last_open < 0 or text.find(b"}", last_open) >= 0:
+        return False
+    if text.find(b";", position, last_open) < 0:
+        return True
+    while True:
+        if in_comment:
+            close = text.find(b"}", position)
+            if close < 0:
+                return True
+            position = close + 1
+            in_comment = False
+        else:
+            match = COMMENT_START_RE.search(text, position)
+            if match is None:
+                return False
+            if match.group() == b";":
+                newline = text.find(b"\n", match.end())
+                if newline < 0:
+                    return False
+                position = newline + 1
+            else:
+                in_comment = True
+                position = match.end()
+
+def parse_headers(lines: List[bytes]) -> Dict[str, str]:
+    headers = {}
+    for line in lines:
+        match = HEADER_RE.match(line)
+        if match:
+            name, value = match.groups()
+            value = value.decode("utf-8", errors="replace")
+            if "\\" in value:
+                value = value.replace('\\"', '"').replace("\\\\", "\\")
+            headers[name.decode()] = value
+    return headers
+
+def iter_tag_pieces(handle, start: int, block_size: int = PGN_READ_BLOCK) -> Iterator[Tuple[int, bytes]]:
+    """
+    Splits the file at every line that starts with "[", using bulk reads.
+    Yields (byte offset, piece): a tag line plus the text after it up to the
+    next tag line. A piece of text before the first tag line has no tag.
+    """
+    pending = b"\n" # Virtual newline, so a tag right at 'start' is split off too
+    base = start - 1 # File offset of pending[0]
+    while True:
+        block = handle.read(block_size)
+        data = pending + block
+        pieces = data.split(b"\n[")
+        if block:
+            if len(pieces) == 1:
+                pending = data # No tag line in this block yet
+                continue
+            last = pieces.pop() # May continue in the next block
+
+        position = base
+        for index, piece in enumerate(pieces):
+            if index == 0:
+                if piece.strip():
+                    yield position, piece
+                position += len(piece)
+            else:
+                yield position + 1, b"[" + piece # The tag starts after the newline
+                position += len(piece) + 2
+
+        if not block:
+            return
+        pending = b"\n[" + last
+        base = position
+
+def read_games(path: str, start: int = 0, end: Optional[int] = None,
+               block_size: int = PGN_READ_BLOCK) -> Iterator[PgnGame]:
+    """
+    Yields the games of a PGN file one at a time. With 'start'/'end' only the
+    games beginning inside that byte range are read (see split_chunks); the
+    last one is finished even if it runs past 'end'. Games are separated by
+    their tag pairs, so only the first game of a file may come without tags.
+    """
+    with open(path, "rb") as handle:
+        if start == 0 and handle.read(3) == codecs.BOM_UTF8:
+            start = 3
+        handle.seek(start)
+        header_lines: List[bytes] = []
+        move_parts: List[bytes] = []
+        game_offset = None
+        in_comment = False # Inside a { } comment: a "[" line there is not a tag
+
+        for offset, piece in iter_tag_pieces(handle, start, block_size):
+            if piece[0] == 91 and not in_comment: # "[": tag line
+                if move_parts:
+                    # Tags after movetext begin the next game
+                    yield PgnGame(game_offset, parse_headers(header_lines), parse_movetext(b"\n".join(move_parts)))
+                    header_lines, move_parts, game_offset = [], [], None
+                if game_offset is None:
+                    if end is not None and offset >= end:
+                        return
+                    game_offset = offset
+                newline = piece.find(b"\n")
+                if newline < 0:
+                    header_lines.append(piece)
+                    continue
+                header_lines.append(piece[:newline])
+                text = piece[newline + 1:]
+            else:
+                text = piece
+
+            if text and not text.isspace():
+                if game_offset is None:
+                    if end is not None and offset >= end:
+                        return
+                    game_offset = offset # Game without tags
+                move_parts.append(text)
+                if in_comment or b"{" in text:
+                    in_comment = ends_in_comment(text, in_comment)
+
+        if header_lines or move_parts:
+            yield PgnGame(game_offset, parse_headers(header_lines), parse_movetext(b"\n".join(move_parts)))
+
+def split_chunks(path: str, parts: int) -> List[Tuple[int, int]]:
+    """
+    Splits a PGN file into up to 'parts' byte ranges, each starting at an
+    "[Event" tag, for read_games(path, start, end) in separate workers.
+    """
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as handle:
+        for part in range(1, parts):
+            target = max(size * part // parts, bounds[-1])
+            handle.seek(target)
+            # Scan forward to the next game (the newline before the tag is part of the match)
+            position = target
+            found = size
+            tail = b""
+            while True:
+                block = handle.read(PGN_READ_BLOCK)
+                if not block:
+                    break
+                data = tail + block
+                index = data.find(GAME_START)
+                if index >= 0:
+                    found = position - len(tail) + index + 1
+                    break
+                tail = data[-len(GAME_START):]
+                position += len(block)
+            if found > bounds[-1]:
+                bounds.append(found)
+    bounds.append(size)
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1) if bounds[i] < bounds[i + 1]]
@@ -0,0 +1,235 @@
+# uci_client.py
+# asyncio UCI engine client, usable without Qt (scripts, batch jobs, tests).
+#
+#   async with UciClient() as engine:
+#       pvs = await engine.analyse(fen, depth=18, multipv=3)
+#       move = await engine.play(fen, movetime=500)
+#       async for info in engine.stream(fen, depth=20):
+#           print(info.depth, info.score_str)
+
+import asyncio
+from typing import AsyncIterator, Callable, Dict, List, Optional, Union
+
+from src.model.uci_protocol import ENGINE_PATH, POPEN_CREATIONFLAGS, InfoRecord, go_command, parse_info_line
+
+class EngineError(Exception):
+    """The engine process is not running or stopped answering."""
+
+
+class SearchResult:
+    """Outcome of one 'go': the engine's move and the last line seen per MultiPV id."""
+    def __init__(self, bestmove: str, ponder: Optional[str], pvs: Dict[int, InfoRecord], stopped: bool):
+        self.bestmove = bestmove
+        self.ponder = ponder
+        self.pvs = pvs
+        self.stopped = stopped # Ended by stop()/timeout/cancellation rather than by its limit
+
+
+class UciClient:
+    """
+    One UCI engine process driven through asyncio.
+    Searches run one at a time (later calls wait their turn). Every search
+    ends with the engine's 'bestmove', even when stopped, timed out or
+    cancelled, so the protocol never gets out of step.
+    """
+    def __init__(self, engine_path: Union[str, List[str]] = ENGINE_PATH, options: Optional[Dict[str, object]] = None):
+        self.engine_path = engine_path
+        self.options = options or {}
+        self.name: Optional[str] = None # From 'id name'
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.reader_task: Optional[asyncio.Task] = None
+        self.search_lock = asyncio.Lock()
+        self.search_queue: Optional[asyncio.Queue] = None # Output of the running search
+        self.searching = False
+        self.stop_requested = False
+        self.waiters: Dict[str, asyncio.Future] = {} # "uciok" / "readyok" -> future
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.quit()
+
+    async def start(self, timeout: float = 10.0):
+        """Launches the engine and completes the UCI handshake. Raises FileNotFoundError if missing."""
+        argv = list(self.engine_path) if isinstance(self.engine_path, (list, tuple)) else [self.engine_path]
+        self.process = await asyncio.create_subprocess_exec(
+            *argv,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            creationflags=POPEN_CREATIONFLAGS
+        )
+        self.reader_task = asyncio.get_running_loop().create_task(self.read_loop())
+        await self.request("uci", "uciok", timeout)
+        for name, value in self.options.items():
+            self.send(f"setoption name {name} value {value}")
+        await self.isready(timeout)
+
+    def send(self, command: str):
+        """Writes one command line (buffered; flushed by the event loop)."""
+        if self.process is None or self.process.stdin is None or self.process.stdin.is_closing():
+            raise EngineError("Engine is not running")
+        self.process.stdin.write(f"{command}\n".encode())
+
+    async def request(self, command: str, answer: str, timeout: Optional[float] = None):
+        future = self.waiters[answer] = asyncio.get_running_loop().create_future()
+        self.send(command)
+        try:
+            await asyncio.wait_for(future, timeout)
+        finally:
+            self.waiters.pop(answer, None)
+
+    async def isready(self, timeout: Optional[float] = None):
+        await self.request("isready", "readyok", timeout)
+
+    async def set_option(self, name: str, value):
+        self.send(f"setoption name {name} value {value}")
+        await self.process.stdin.drain()
+
+    def stop(self):
+        """Asks the running search (if any) to finish now; its result is still delivered."""
+        if self.searching and not self.stop_requested:
+            self.stop_requested = True
+            self.send("stop")
+
+    async def read_loop(self):
+        while True:
+            raw = await self.process.stdout.readline()
+            if not raw:
+                break
+            line = raw.decode(errors="replace").strip()
+            if line.startswith("info"):
+                if self.search_queue is not None:
+                    try:
+                        info = parse_info_line(line)
+                    except ValueError:
+                        info = None # Malformed line
+                    if info is not None:
+                        self.search_queue.put_nowait(info)
+            elif line.startswith("bestmove"):
+                if self.search_queue is not None:
+                    self.search_queue.put_nowait(line.split())
+            elif line.startswith("id name "):
+                self.name = line[8:]
+            elif line in self.waiters:
+                future = self.waiters[line]
+                if not future.done():
+                    future.set_result(None)
+
+        # EOF: wake up everyone still waiting on the engine
+        if self.search_queue is not None:
+            self.search_queue.put_nowait(None)
+        for future in self.waiters.values():
+            if not future.done():
+                future.set_exception(EngineError("Engine exited"))
+
+    async def lines(self, fen: str, depth: Optional[int] = None, movetime: Optional[int] = None,
+                    multipv: int = 1, timeout: Optional[float] = None) -> AsyncIterator[Union[InfoRecord, SearchResult]]:
+        """
+        Core search generator: yields every scored info line, then the SearchResult.
+        'timeout' (seconds) stops the search and still yields its result. Closing
+        or cancelling the generator early stops the search and waits for its
+        'bestmove' before releasing the engine.
+        """
+        async with self.search_lock:
+            queue: asyncio.Queue = asyncio.Queue()
+            self.search_queue = queue
+            pvs: Dict[int, InfoRecord] = {}
+            finished = False
+            timer = None
+            try:
+                self.send(f"setoption name MultiPV value {multipv}")
+                self.send(f"position fen {fen}")
+                self.send(go_command(depth, movetime))
+                self.searching = True
+                self.stop_requested = False
+                await self.process.stdin.drain()
+                if timeout is not None:
+                    timer = asyncio.get_running_loop().call_later(timeout, self.stop)
+
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        raise EngineError("Engine exited during search")
+                    if isinstance(item, InfoRecord):
+                        pvs[item.multipv] = item
+                        yield item
+                        continue
+                    # ['bestmove', move, 'ponder', move]
+                    finished = True
+                    self.searching = False
+                    ponder = item[3] if len(item) > 3 else None
+                    yield SearchResult(item[1] if len(item) > 1 else "", ponder, pvs, self.stop_requested)
+                    return
+            finally:
+                if timer is not None:
+                    timer.cancel()
+                if not finished and self.searching and self.process.returncode is None:
+                    # Abandoned (cancelled / closed): keep the protocol in step
+                    self.stop()
+                    while True:
+                        item = await queue.get()
+                        if item is None or isinstance(item, list):
+                            break
+                self.searching = False
+                self.search_queue = None
+
+    async def search(self, fen: str, depth: Optional[int] = None, movetime: Optional[int] = None,
+                     multipv: int = 1, timeout: Optional[float] = None,
+                     on_info: Optional[Callable[[InfoRecord], None]] = None) -> SearchResult:
+        """Runs one search to completion; 'on_info' is called for every scored info line."""
+        generator = self.lines(fen, depth, movetime, multipv, timeout)
+        try:
+            async for item in generator:
+                if isinstance(item, SearchResult):
+                    return item
+                if on_info is not None:
+                    on_info(item)
+        finally:
+            # Releases the engine right away (not when the generator is collected)
+            await generator.aclose()
+        raise EngineError("Search ended without bestmove")
+
+    async def analyse(self, fen: str, depth: Optional[int] = None, movetime: Optional[int] = None,
+                      multipv: int = 1, timeout: Optional[float] = None) -> Dict[int, InfoRecord]:
+        """Final { multipv_id: InfoRecord } of a search."""
+        result = await self.search(fen, depth, movetime, multipv, timeout)
+        return result.pvs
+
+    async def play(self, fen: str, depth: Optional[int] = None, movetime: Optional[int] = None,
+                   timeout: Optional[float] = None) -> str:
+        """The engine's move (UCI) for the position."""
+        result = await self.search(fen, depth, movetime, 1, timeout)
+        return result.bestmove
+
+    async def stream(self, fen: str, depth: Optional[int] = None, movetime: Optional[int] = None,
+                     multipv: int = 1, timeout: Optional[float] = None) -> AsyncIterator[InfoRecord]:
+        """Info lines as they arrive; breaking out of the loop stops the search."""
+        generator = self.lines(fen, depth, movetime, multipv, timeout)
+        try:
+            async for item in generator:
+                if isinstance(item, InfoRecord):
+                    yield item
+        finally:
+            await generator.aclose()
+
+    async def quit(self, timeout: float = 2.0):
+        if self.process is None:
+            return
+        if self.process.returncode is None:
+            try:
+                self.stop()
+                self.send("quit")
+                await self.process.stdin.drain()
+            except (EngineError, ConnectionError):
+                pass
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        if self.reader_task is not None:
+            await self.reader_task
+        self.process = None
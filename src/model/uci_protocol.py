@@ -0,0 +1,156 @@
+# uci_protocol.py
+# Qt-free pieces of the UCI protocol shared by every engine front-end.
+
+import os
+import subprocess
+from typing import Any, Dict, List, Optional, Union
+
+import chess
+
+# Default engine executable (relative to the project root)
+ENGINE_PATH = "engine/stockfish.exe"
+
+# Hide the engine console window on Windows (flag does not exist elsewhere)
+POPEN_CREATIONFLAGS = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+def engine_identity(engine_path) -> str:
+    """
+    Identifies an engine build for caching: file name, size and mtime of the
+    executable, so replacing the engine invalidates its cached evaluations.
+    An argv list (engine started through an interpreter) is identified by its text.
+    """
+    if isinstance(engine_path, (list, tuple)):
+        return " ".join(engine_path)
+    try:
+        stat = os.stat(engine_path)
+        return f"{os.path.basename(engine_path)}:{stat.st_size}:{int(stat.st_mtime)}"
+    except OSError:
+        return os.path.basename(engine_path)
+
+def go_command(depth: Optional[int] = None, movetime: Optional[int] = None) -> str:
+    cmd = "go"
+    if depth: cmd += f" depth {depth}"
+    if movetime: cmd += f" movetime {movetime}"
+    return cmd
+
+# UCI text -> chess.Move. Moves are immutable, so every PV shares one object
+# per distinct move (at most a few thousand exist) instead of parsing each token.
+_moves: Dict[str, chess.Move] = {}
+
+def uci_move(uci: str) -> chess.Move:
+    move = _moves.get(uci)
+    if move is None:
+        move = _moves[uci] = chess.Move.from_uci(uci)
+    return move
+
+# Integer fields of an info line that map 1:1 onto InfoRecord attributes
+INFO_INT_FIELDS = frozenset(("depth", "seldepth", "multipv", "nodes", "nps", "tbhits"))
+
+class InfoRecord:
+    """
+    One parsed 'info' line. Only typed values are kept, never the raw line; the
+    PV is kept as its text until first read (most lines are superseded unread).
+    Score is side-to-move: 'mate' is set for mate scores, otherwise 'cp';
+    'bound' is "lower"/"upper" for fail-high/fail-low lines.
+    """
+    __slots__ = ("depth", "seldepth", "multipv", "cp", "mate", "bound",
+                 "nodes", "nps", "tbhits", "_pv")
+
+    def __init__(self, cp=0, mate=None, pv=None, depth=0, multipv=1):
+        self.depth = depth
+        self.seldepth = 0
+        self.multipv = multipv
+        self.cp = cp
+        self.mate = mate
+        self.bound = None
+        self.nodes = 0
+        self.nps = 0
+        self.tbhits = 0
+        self._pv: Union[str, List[chess.Move]] = pv if pv is not None else []
+
+    @property
+    def pv(self) -> List[chess.Move]:
+        """Principal variation as moves, parsed from the engine's text on first access."""
+        pv = self._pv
+        if isinstance(pv, str):
+            moves = _moves
+            pv = self._pv = [moves.get(uci) or uci_move(uci) for uci in pv.split()]
+        return pv
+
+    @pv.setter
+    def pv(self, pv: List[chess.Move]):
+        self._pv = pv
+
+    @property
+    def score_str(self) -> str:
+        """Display form of the score, e.g. "+0.35" or "#-3"."""
+        if self.mate is not None:
+            return f"#{self.mate}"
+        return f"{self.cp / 100.0:+.2f}"
+
+    @property
+    def pv_move(self) -> str:
+        """First move of the PV (the engine's choice), or ""."""
+        pv = self._pv
+        if isinstance(pv, str):
+            # No need to parse the whole PV for its first move
+            first = pv.split(None, 1)
+            return first[0] if first else ""
+        return pv[0].uci() if pv else ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"depth": self.depth, "multipv": self.multipv, "cp": self.cp,
+                "mate": self.mate, "bound": self.bound, "pv": [move.uci() for move in self.pv]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "InfoRecord":
+        pv = [uci_move(uci) for uci in data.get("pv", [])]
+        record = cls(data.get("cp", 0), data.get("mate"), pv,
+                     data.get("depth", 0), data.get("multipv", 1))
+        record.bound = data.get("bound")
+        return record
+
+    def __repr__(self):
+        return f"InfoRecord(depth={self.depth}, multipv={self.multipv}, score={self.score_str}, pv={' '.join(move.uci() for move in self.pv[:4])})"
+
+
+def parse_info_line(line: str) -> Optional[InfoRecord]:
+    """
+    Parses an 'info' line in a single pass over its tokens.
+    Returns None for lines without a score (currmove, hashfull, strings...).
+    """
+    # Most lines during a search are currmove chatter: reject them before tokenizing
+    if not line.startswith("info") or " score " not in line:
+        return None
+
+    # The PV runs to the end of the line; only the part before it needs a token loop
+    head, _, pv = line.partition(" pv ")
+    tokens = iter(head.split())
+    next(tokens) # "info"
+
+    record = InfoRecord()
+    has_score = False
+    try:
+        for token in tokens:
+            if token in INFO_INT_FIELDS:
+                setattr(record, token, int(next(tokens)))
+            elif token == "score":
+                kind = next(tokens)
+                if kind == "cp":
+                    record.cp = int(next(tokens))
+                elif kind == "mate":
+                    record.mate = int(next(tokens))
+                has_score = True
+            elif token == "lowerbound" or token == "upperbound":
+                record.bound = token[:5]
+            elif token == "string":
+                break
+            # Anything else (time, hashfull, wdl, ...) is skipped token by token
+    except StopIteration:
+        return None # Truncated line
+
+    if not has_score:
+        return None
+    if pv:
+        record._pv = pv # Converted to moves by InfoRecord.pv when first read
+    return record
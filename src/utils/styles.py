@@ -26,7 +26,7 @@ class Styles:
     QLabel {
         color: #f0f0f0;
     }
-    QTextEdit {
+    QTextEdit, QListView {
         background-color: #1e1e1e;
         border: 1px solid #3e3e42;
         color: #d4d4d4;
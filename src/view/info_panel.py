@@ -1,10 +1,12 @@
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTextEdit, 
+    QWidget, QVBoxLayout, QHBoxLayout, 
     QPushButton, QLabel, QFrame, QGridLayout, QCheckBox, QGroupBox, QStackedLayout
 )
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QIcon
 from src.view.fading_widget import FadingStackedWidget
+from src.view.move_list import MoveListView
+from src.view.pv_lines import PvLinesView
 
 class AnalysisDashboard(QWidget):
     exit_clicked = pyqtSignal()
@@ -192,6 +194,7 @@ class InfoPanel(QWidget):
     toggle_eval_clicked = pyqtSignal(bool)
     toggle_arrows_clicked = pyqtSignal(bool)
     toggle_auto_rotate_clicked = pyqtSignal(bool)
+    toggle_background_clicked = pyqtSignal(bool)
     
     # Analysis Signals
     exit_analysis_clicked = pyqtSignal()
@@ -256,9 +259,7 @@ class InfoPanel(QWidget):
         layout.addLayout(header_layout)
 
         # --- Move List ---
-        self.move_list = QTextEdit()
-        self.move_list.setReadOnly(True)
-        self.move_list.setPlaceholderText("Moves...")
+        self.move_list = MoveListView()
         layout.addWidget(self.move_list)
         
         # --- Eval Label ---
@@ -266,6 +267,10 @@ class InfoPanel(QWidget):
         self.eval_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.eval_label.setStyleSheet("font-family: Monospace; font-size: 14px; color: #4a90e2;")
         layout.addWidget(self.eval_label)
+        
+        # --- Engine Lines (full PVs in SAN) ---
+        self.pv_lines = PvLinesView()
+        layout.addWidget(self.pv_lines)
 
         # --- Controls Area ---
         controls_group = QGroupBox("Controls")
@@ -333,7 +338,9 @@ class InfoPanel(QWidget):
         self.chk_eval.toggled.connect(self.toggle_eval_clicked)
         # Hide Eval Label if Bar is hidden (User Request)
         self.chk_eval.toggled.connect(self.eval_label.setVisible)
+        self.chk_eval.toggled.connect(self.pv_lines.setVisible)
         self.eval_label.setVisible(False) # Initial state off
+        self.pv_lines.setVisible(False)
         
         self.chk_arrows = QCheckBox("Show Best Move Arrow")
         self.chk_arrows.setChecked(False) 
@@ -343,16 +350,21 @@ class InfoPanel(QWidget):
         self.chk_auto_rotate.setChecked(False)
         self.chk_auto_rotate.toggled.connect(self.toggle_auto_rotate_clicked)
         
+        # Reviews played moves while the engine is idle, so "Analyze Game" is near-instant
+        self.chk_background = QCheckBox("Background Review")
+        self.chk_background.setChecked(False)
+        self.chk_background.toggled.connect(self.toggle_background_clicked)
+        
         settings_layout.addWidget(self.chk_eval)
         settings_layout.addWidget(self.chk_arrows)
         settings_layout.addWidget(self.chk_auto_rotate)
+        settings_layout.addWidget(self.chk_background)
         
         layout.addWidget(settings_group)
 
-    def update_moves(self, pgn_text):
-        self.move_list.setText(pgn_text)
-        sb = self.move_list.verticalScrollBar()
-        sb.setValue(sb.maximum())
+    def update_moves(self, sans):
+        """Syncs the move list with the game's SAN history (appends/truncates only)."""
+        self.move_list.sync_moves(sans)
 
     def update_eval(self, score_str, pv_move=""):
         text = f"Eval: {score_str}"
@@ -360,8 +372,16 @@ class InfoPanel(QWidget):
              text += f" (Best: {pv_move})"
         self.eval_label.setText(text)
 
-    def set_status(self, text):
+    def update_lines(self, fen, pvs):
+        """Shows the engine's principal variations for position 'fen'."""
+        self.pv_lines.set_lines(fen, pvs)
+
+    def clear_lines(self):
+        self.pv_lines.clear()
+
+    def set_status(self, text, details=""):
         self.status_label.setText(text)
+        self.status_label.setToolTip(details) # e.g. the engine time summary of a review
         
     def show_analysis(self):
         self.analysis_dashboard.chk_best_move.setChecked(self.chk_arrows.isChecked())
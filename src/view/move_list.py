@@ -0,0 +1,94 @@
+from typing import List
+from PyQt6.QtWidgets import QListView, QAbstractItemView
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+
+class MoveListModel(QAbstractListModel):
+    """
+    Game moves as SAN, one row per full move ("12. Nf3 Nc6").
+    Rows are appended and truncated incrementally instead of regenerating the PGN.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.sans: List[str] = []
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return (len(self.sans) + 1) // 2
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        row = index.row()
+        white = self.sans[2 * row]
+        black = self.sans[2 * row + 1] if 2 * row + 1 < len(self.sans) else ""
+        return f"{row + 1}. {white} {black}".rstrip()
+
+    def sync(self, sans: List[str]) -> bool:
+        """
+        Brings the model in line with 'sans' (the full SAN history), touching
+        only the plies that changed. Returns True if moves were appended.
+        """
+        if sans[:len(self.sans)] == self.sans:
+            keep = len(self.sans) # Moves only added (the usual case)
+        else:
+            # Longest common prefix: a different game may share SANs further on
+            keep = 0
+            limit = min(len(self.sans), len(sans))
+            while keep < limit and self.sans[keep] == sans[keep]:
+                keep += 1
+
+        if keep < len(self.sans):
+            self.truncate(keep)
+        if keep < len(sans):
+            self.append(sans[keep:])
+            return True
+        return False
+
+    def append(self, sans: List[str]):
+        old_rows = self.rowCount()
+        # Black move completing the last row
+        if len(self.sans) % 2 == 1:
+            self.sans.append(sans[0])
+            sans = sans[1:]
+            index = self.index(old_rows - 1)
+            self.dataChanged.emit(index, index)
+        if not sans:
+            return
+
+        new_rows = (len(self.sans) + len(sans) + 1) // 2
+        self.beginInsertRows(QModelIndex(), old_rows, new_rows - 1)
+        self.sans.extend(sans)
+        self.endInsertRows()
+
+    def truncate(self, count: int):
+        old_rows = self.rowCount()
+        new_rows = (count + 1) // 2
+        if new_rows < old_rows:
+            self.beginRemoveRows(QModelIndex(), new_rows, old_rows - 1)
+            del self.sans[2 * new_rows:]
+            self.endRemoveRows()
+        # Last remaining row lost its black move
+        if len(self.sans) > count:
+            del self.sans[count:]
+            index = self.index(new_rows - 1)
+            self.dataChanged.emit(index, index)
+
+
+class MoveListView(QListView):
+    """
+    Virtualised move list: only visible rows are laid out and painted,
+    so long games stay smooth.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.move_model = MoveListModel(self)
+        self.setModel(self.move_model)
+        self.setUniformItemSizes(True)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+
+    def sync_moves(self, sans: List[str]):
+        if self.move_model.sync(sans):
+            self.scrollToBottom()
@@ -0,0 +1,119 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+import chess
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel
+from PyQt6.QtCore import Qt
+
+PV_DISPLAY_PLIES = 12 # Moves shown per engine line
+SAN_CACHE_POSITIONS = 16 # Root positions whose SAN trees are kept
+
+class SanNode:
+    __slots__ = ("san", "children")
+
+    def __init__(self, san: str = ""):
+        self.san = san
+        self.children: Dict[chess.Move, "SanNode"] = {}
+
+
+class SanLineCache:
+    """
+    SAN rendering of engine lines, cached per PV prefix.
+    Every root position owns a move tree; lines that share a prefix with an
+    earlier line (the normal case while an engine deepens) reuse its SAN, and
+    a board is only built for the part of the line that was never seen.
+    """
+    def __init__(self, positions: int = SAN_CACHE_POSITIONS):
+        self.positions = positions
+        self.roots: "OrderedDict[str, SanNode]" = OrderedDict()
+
+    def sans(self, fen: str, moves: Sequence[chess.Move]) -> List[str]:
+        root = self.roots.get(fen)
+        if root is None:
+            root = self.roots[fen] = SanNode()
+            while len(self.roots) > self.positions:
+                self.roots.popitem(last=False)
+        else:
+            self.roots.move_to_end(fen)
+
+        sans = []
+        node = root
+        board: Optional[chess.Board] = None
+        for ply, move in enumerate(moves):
+            child = node.children.get(move)
+            if child is None:
+                # Cache miss: catch a board up to this ply once, then keep pushing
+                if board is None:
+                    board = chess.Board(fen)
+                    for earlier in moves[:ply]:
+                        board.push(earlier)
+                if not board.is_legal(move):
+                    break
+                child = node.children[move] = SanNode(board.san(move))
+            if board is not None:
+                board.push(move)
+            sans.append(child.san)
+            node = child
+        return sans
+
+    def line_text(self, fen: str, moves: Sequence[chess.Move]) -> str:
+        """Numbered SAN line, e.g. "12... Nf6 13. Bg5 Be7"."""
+        fields = fen.split()
+        white_to_move = len(fields) < 2 or fields[1] == "w"
+        number = int(fields[5]) if len(fields) > 5 else 1
+
+        parts = []
+        for ply, san in enumerate(self.sans(fen, moves)):
+            if white_to_move:
+                parts.append(f"{number}. {san}")
+            elif ply == 0:
+                parts.append(f"{number}... {san}")
+            else:
+                parts.append(san)
+            if not white_to_move:
+                number += 1
+            white_to_move = not white_to_move
+        return " ".join(parts)
+
+
+class PvLinesView(QWidget):
+    """Engine lines (one per MultiPV id): score and SAN principal variation."""
+    def __init__(self, lines: int = 3, parent=None):
+        super().__init__(parent)
+        self.cache = SanLineCache()
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(2)
+
+        self.labels = []
+        for _ in range(lines):
+            label = QLabel("")
+            label.setStyleSheet("font-family: Monospace; font-size: 12px; color: #BDC3C7;")
+            label.setTextInteractionFlags(Qt.TextInteractionFlag.NoTextInteraction)
+            label.setWordWrap(False)
+            label.setVisible(False)
+            layout.addWidget(label)
+            self.labels.append(label)
+
+    def set_lines(self, fen: str, pvs):
+        """pvs: { multipv_id: InfoRecord }. Scores are shown from White's point of view."""
+        white_to_move = " w " in fen
+        for multipv_id, label in enumerate(self.labels, start=1):
+            info = pvs.get(multipv_id)
+            if info is None or not info.pv:
+                label.setVisible(False)
+                continue
+            if info.mate is not None:
+                mate = info.mate if white_to_move else -info.mate
+                score = f"#{mate}"
+            else:
+                cp = info.cp if white_to_move else -info.cp
+                score = f"{cp / 100.0:+.2f}"
+            text = f"{score:>6}  {self.cache.line_text(fen, info.pv[:PV_DISPLAY_PLIES])}"
+            # Skip the repaint when a throttled update did not change this line
+            if label.text() != text:
+                label.setText(text)
+            label.setVisible(True)
+
+    def clear(self):
+        for label in self.labels:
+            label.setVisible(False)